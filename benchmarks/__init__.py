@@ -0,0 +1,7 @@
+"""
+Offline end-to-end benchmarks of the task pipeline.
+
+Run with `python -m benchmarks --scale 24x5`. Every stage runs against local stand-ins
+(temporary SQLite file, in-memory RabbitMQ channel and queue, synthetic resolver, offline
+PostgreSQL cursor) so results are reproducible without network services.
+"""
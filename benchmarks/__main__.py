@@ -0,0 +1,202 @@
+import gc
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import tracemalloc
+from utils import runtime
+from utils.display import console
+from benchmarks.stages import SCALES, STAGES, BenchContext
+from benchmarks.standins import bench_config
+
+BASELINES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+DEFAULT_THRESHOLDS = {"throughput_drop": 0.25, "memory_growth": 0.30, "memory_slack_mib": 2.0,
+                      "min_seconds": 0.25, "min_repeat": 3}
+
+
+def run_stage(function, context, trace_memory):
+    gc.collect()
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        items = function(context)
+        seconds = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    return {
+        "items": items,
+        "seconds": round(seconds, 4),
+        "items_per_s": round(items / seconds, 1) if seconds > 0 else 0.0,
+        "peak_mib": round(peak / 2 ** 20, 2) if peak is not None else None
+    }
+
+
+def run(scale, stages, trace_memory=True, workdir=None, loop="asyncio"):
+    """
+    Runs the stages in pipeline order at one scale, on the given event loop implementation.
+
+    Returns:
+        dict: Machine-readable results: environment and per-stage items, seconds,
+        items_per_s and peak_mib.
+    """
+    own_workdir = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix="dnsbl-bench-")
+    context = BenchContext(scale, bench_config(workdir, SCALES[scale]["zones"]), workdir)
+    context.config["runtime"] = {"loop": loop}
+    results = {}
+    # Konsol çıktısı ölçümü bozmasın
+    quiet, console.quiet = console.quiet, True
+    try:
+        for name in STAGES:
+            if name in stages:
+                results[name] = run_stage(STAGES[name], context, trace_memory)
+    finally:
+        console.quiet = quiet
+        context.close()
+        if own_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "scale": scale,
+        "loop": loop,
+        "tracemalloc": trace_memory,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "stages": results
+    }
+
+
+def run_best_of(scale, stages, repeat, trace_memory=True, loop="asyncio"):
+    """
+    Times the pipeline `repeat` times without tracing and keeps the fastest run per stage;
+    memory peaks come from one extra run under tracemalloc, whose overhead would
+    otherwise distort the throughput figures.
+    """
+    report = run(scale, stages, trace_memory=False, loop=loop)
+    for _ in range(repeat - 1):
+        for stage, result in run(scale, stages, trace_memory=False, loop=loop)["stages"].items():
+            if result["items_per_s"] > report["stages"][stage]["items_per_s"]:
+                report["stages"][stage] = result
+    if trace_memory:
+        for stage, result in run(scale, stages, trace_memory=True, loop=loop)["stages"].items():
+            report["stages"][stage]["peak_mib"] = result["peak_mib"]
+    report["tracemalloc"] = trace_memory
+    report["repeat"] = repeat
+    return report
+
+
+def load_baselines(path):
+    if not os.path.exists(path):
+        return {"version": 1, "thresholds": dict(DEFAULT_THRESHOLDS), "scales": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(report, baselines):
+    """
+    Throughput is only gated when the run was repeated at least `min_repeat` times and
+    the stage's timed run lasted at least `min_seconds`; a few milliseconds of work are
+    dominated by timer and scheduling noise. Peak memory is gated regardless.
+
+    Returns:
+        tuple[list[str], list[str]]: Regressions past the thresholds, and the stages whose
+        throughput was not gated (with the reason); stages without a baseline are skipped.
+    """
+    thresholds = {**DEFAULT_THRESHOLDS, **baselines.get("thresholds", {})}
+    scale_baselines = baselines.get("scales", {}).get(report["scale"], {})
+    regressions = []
+    ungated = []
+    for stage, result in report["stages"].items():
+        baseline = scale_baselines.get(stage)
+        if not baseline:
+            continue
+        stage_thresholds = {**thresholds, **baseline.get("thresholds", {})}
+        floor = baseline["items_per_s"] * (1 - stage_thresholds["throughput_drop"])
+        if report.get("repeat", 1) < stage_thresholds["min_repeat"]:
+            ungated.append(f"{stage}: throughput not gated, --repeat {report.get('repeat', 1)} "
+                           f"is below {stage_thresholds['min_repeat']}")
+        elif result["seconds"] < stage_thresholds["min_seconds"]:
+            ungated.append(f"{stage}: throughput not gated, {result['seconds']:.3f}s is below "
+                           f"{stage_thresholds['min_seconds']}s (use a larger --scale)")
+        elif result["items_per_s"] < floor:
+            regressions.append(
+                f"{stage}: throughput {result['items_per_s']:.0f}/s is below {floor:.0f}/s "
+                f"(baseline {baseline['items_per_s']:.0f}/s)"
+            )
+        if result["peak_mib"] is not None and baseline.get("peak_mib") is not None:
+            ceiling = baseline["peak_mib"] * (1 + stage_thresholds["memory_growth"]) + stage_thresholds["memory_slack_mib"]
+            if result["peak_mib"] > ceiling:
+                regressions.append(
+                    f"{stage}: peak memory {result['peak_mib']:.1f} MiB is above {ceiling:.1f} MiB "
+                    f"(baseline {baseline['peak_mib']:.1f} MiB)"
+                )
+    return regressions, ungated
+
+
+def update_baselines(report, baselines, path):
+    scale = baselines.setdefault("scales", {}).setdefault(report["scale"], {})
+    for stage, result in report["stages"].items():
+        entry = scale.setdefault(stage, {})
+        entry["items_per_s"] = result["items_per_s"]
+        if result["peak_mib"] is not None:
+            entry["peak_mib"] = result["peak_mib"]
+    baselines.setdefault("thresholds", dict(DEFAULT_THRESHOLDS))
+    with open(path, "w") as f:
+        json.dump(baselines, f, indent=2)
+        f.write("\n")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Offline pipeline benchmarks")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="24x5", help="Address block x zone count.")
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help="Comma separated stages; later stages use the output of earlier ones.")
+    parser.add_argument("--output", help="Write the JSON results here (default: stdout).")
+    parser.add_argument("--baselines", default=BASELINES_FILE)
+    parser.add_argument("--update-baselines", action="store_true", help="Store this run as the baseline.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs; the fastest one per stage is reported.")
+    parser.add_argument("--no-tracemalloc", action="store_true",
+                        help="Skip memory tracing (faster, but no memory figures or memory gate).")
+    parser.add_argument("--loop", choices=runtime.LOOP_IMPLEMENTATIONS[1:], default="asyncio",
+                        help="Event loop implementation; baselines are recorded with asyncio.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise SystemExit(f"Unknown stages: {', '.join(sorted(unknown))}")
+
+    report = run_best_of(args.scale, stages, max(args.repeat, 1), trace_memory=not args.no_tracemalloc, loop=args.loop)
+    baselines = load_baselines(args.baselines)
+    if args.update_baselines:
+        update_baselines(report, baselines, args.baselines)
+        report["regressions"] = []
+        report["ungated"] = []
+    else:
+        report["regressions"], report["ungated"] = compare(report, baselines)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    for note in report["ungated"]:
+        print(f"NOT GATED {note}", file=sys.stderr)
+    for regression in report["regressions"]:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if report["regressions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Event loop comparison: the pipeline's consume and resolve paths under every available
+loop implementation (asyncio, and uvloop when installed).
+
+Run with `python -m benchmarks.loops --scale 24x5`. The offline stages measure loop
+overhead per task (queue iteration, task switches, semaphores); the udp_resolve
+measurement sends real UDP queries through aiodns to the embedded stub DNS server,
+where the loop's socket handling is on the path.
+"""
+import sys
+import json
+import argparse
+import aiodns
+from rich.table import Table
+from utils import runtime
+from utils.display import console
+from utils.load_generator import generate_targets, run_load
+from utils.resolver import rdns_check, resolver_flags
+from utils.dns_stub_server import StubDNSServer, StubZone
+from benchmarks.__main__ import run_best_of
+from benchmarks.stages import SCALES
+
+LOOP_STAGES = ["generate", "synchronize", "consume", "memory_queue", "resolve"]
+# generate/synchronize only prepare the input of the loop-bound stages
+MEASURED_STAGES = ["consume", "memory_queue", "resolve"]
+
+
+async def udp_resolve(count, concurrency, zones=5):
+    """
+    rdns_check over UDP against an instant stub server sharing the loop.
+
+    Returns:
+        dict: run_load report (lookups, qps, latency).
+    """
+    zone_names = [f"zone{index}.bench.test" for index in range(zones)]
+    server = await StubDNSServer([StubZone(zone, listed_rate=0.05) for zone in zone_names], seed=1).start()
+    resolver = aiodns.DNSResolver(nameservers=[server.host], udp_port=server.port, tcp_port=server.port,
+                                  timeout=2.0, tries=1, flags=resolver_flags([server.host]))
+    try:
+        return await run_load(lambda ip, zone: rdns_check(resolver, ip, zone),
+                              generate_targets(zone_names, count, seed=1), concurrency=concurrency)
+    finally:
+        server.close()
+
+
+def compare_loops(scale, repeat, lookups, concurrency):
+    """
+    Returns:
+        dict: Per loop: items_per_s of each offline stage and udp_resolve qps (best of `repeat`).
+    """
+    report = {"scale": scale, "repeat": repeat, "loops": {}}
+    for loop in runtime.available_loops():
+        stages = run_best_of(scale, LOOP_STAGES, repeat, trace_memory=False, loop=loop)["stages"]
+        figures = {stage: stages[stage]["items_per_s"] for stage in MEASURED_STAGES}
+        figures["udp_resolve"] = max(
+            runtime.run(udp_resolve(lookups, concurrency), loop=loop)["qps"] for _ in range(repeat)
+        )
+        report["loops"][loop] = figures
+    return report
+
+
+def render(report):
+    loops = list(report["loops"])
+    table = Table(title=f"Event loops at {report['scale']} (items/s, best of {report['repeat']})")
+    table.add_column("Stage")
+    for loop in loops:
+        table.add_column(loop, justify="right")
+    if "uvloop" in loops:
+        table.add_column("uvloop / asyncio", justify="right")
+    for stage in report["loops"][loops[0]]:
+        row = [stage] + [f"{report['loops'][loop][stage]:,.0f}" for loop in loops]
+        if "uvloop" in loops:
+            baseline = report["loops"]["asyncio"][stage]
+            row.append(f"{report['loops']['uvloop'][stage] / baseline:.2f}x" if baseline else "-")
+        table.add_row(*row)
+    console.print(table)
+    if "uvloop" not in loops:
+        console.print("uvloop is not installed; only the asyncio loop was measured.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loops", description="Event loop comparison")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="24x5")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--lookups", type=int, default=5000, help="UDP lookups per udp_resolve run.")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--output", help="Write the JSON results here.")
+    args = parser.parse_args(argv)
+
+    report = compare_loops(args.scale, max(args.repeat, 1), args.lookups, args.concurrency)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    render(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+import json
+import asyncio
+import itertools
+import sqlite3
+from datetime import datetime, timezone
+import yaml
+from database.task_manager import TaskManager
+from utils import runtime
+from utils.display import Display
+from utils.process_manager import Worker
+from utils.resolver import rdns_check
+from utils.task_generator import TaskGenerator
+from utils.task_synchronizer import TaskSynchronizer
+from utils.work_queue import MemoryWorkQueue, SQLiteLeaseQueue
+from benchmarks.standins import (
+    OfflineRabbitMQ, OfflineQueue, OfflineAsyncRabbitMQ, SyntheticResolver, OfflinePostgreSQL
+)
+
+# prefix: CIDR of the generated address block, zones: DNSBL zones, limit: tasks carried past generation
+SCALES = {
+    "24x5": {"prefix": 24, "zones": 5, "limit": None},
+    "20x20": {"prefix": 20, "zones": 20, "limit": None},
+    "16x50": {"prefix": 16, "zones": 50, "limit": 1_000_000},
+    "12x50": {"prefix": 12, "zones": 50, "limit": 1_000_000},
+}
+
+
+class BenchContext:
+    """
+    State handed from one stage to the next within a run.
+    """
+
+    def __init__(self, scale, config, workdir):
+        self.scale = scale
+        self.config = config
+        self.workdir = workdir
+        self.tasks = []
+        self.published = []
+        self.consumed = []
+        self.results = []
+        self.conn = None
+        self.task_manager = None
+
+    def open_task_manager(self):
+        if self.task_manager is None:
+            self.conn = sqlite3.connect(self.config["sqlite"]["db_path"])
+            self.task_manager = TaskManager(self.conn, self.config)
+        return self.task_manager
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+
+
+def stage_generate(context):
+    """
+    TaskGenerator: CIDR expansion from a prefix file and the IP x zone product. Scales
+    with a limit build only the first `limit` tasks; the full product is still counted
+    (12x50 would be about 52 million task dicts).
+    """
+    prefix = SCALES[context.scale]["prefix"]
+    prefix_file = f"{context.workdir}/prefixes.yaml"
+    with open(prefix_file, "w") as f:
+        yaml.safe_dump([f"10.0.0.0/{prefix}"], f)
+    generator = TaskGenerator(context.config)
+    ip_list = generator.parse_ip_list(prefix_file)
+    blacklists = generator.get_blacklist_config()
+    limit = SCALES[context.scale]["limit"]
+    if limit:
+        context.tasks = list(itertools.islice(generator.iter_tasks(ip_list, blacklists), limit))
+        return len(ip_list) * len(blacklists)
+    context.tasks = generator.generate_task_list(ip_list, blacklists)
+    return len(context.tasks)
+
+
+def stage_synchronize(context):
+    """
+    TaskSynchronizer: SQLite diff and insert, pending fetch and publish through the real
+    pika publisher on an in-memory channel.
+    """
+    rabbitmq = OfflineRabbitMQ(context.config)
+    rabbitmq.connect()
+    synchronizer = TaskSynchronizer(context.open_task_manager(), rabbitmq, context.tasks, context.config, None)
+    runtime.run(synchronizer.synchronize(), context.config)
+    context.published = rabbitmq.channel.queues[rabbitmq.queue_name]
+    return len(context.published)
+
+
+def stage_consume(context):
+    """
+    Worker.run: queue iteration, decode and ack with the configured number of workers.
+    """
+    queue = OfflineQueue(context.config["rabbitmq"]["default_queue"], context.published)
+    rabbitmq = OfflineAsyncRabbitMQ(queue, Display())
+    consumed = context.consumed = []
+
+    async def process_task(message):
+        consumed.append(json.loads(message.body))
+
+    async def run():
+        lock = asyncio.Lock()
+        tracker = {"tasks_done": 0, "total_tasks": len(queue.messages) + 1}
+        workers = [Worker(worker_id=i + 1, work_queue=rabbitmq, process_task=process_task, task_tracker_lock=lock)
+                   for i in range(context.config["rabbitmq"]["RABBITMQ_CONCURRENCY_LIMIT"])]
+        await asyncio.gather(*(worker.run(queue.name, tracker) for worker in workers))
+
+    runtime.run(run(), context.config)
+    return queue.acked
+
+
+def stage_memory_queue(context):
+    """
+    QUEUE_BACKEND=memory: publish the generated task dicts to MemoryWorkQueue and consume
+    them with Worker.run, without serialisation.
+    """
+    work_queue = MemoryWorkQueue(context.config)
+    queue_name = work_queue.queue_name
+    tasks = context.tasks
+    consumed = []
+
+    async def process_task(message):
+        consumed.append(message.task)
+
+    async def run():
+        work_queue.clear_queue(queue_name)
+        work_queue.publish_task(queue_name, tasks)
+        await work_queue.connect()
+        lock = asyncio.Lock()
+        tracker = {"tasks_done": 0, "total_tasks": len(tasks) + 1}
+        workers = [Worker(worker_id=i + 1, work_queue=work_queue, process_task=process_task, task_tracker_lock=lock)
+                   for i in range(context.config["rabbitmq"]["RABBITMQ_CONCURRENCY_LIMIT"])]
+        await asyncio.gather(*(worker.run(queue_name, tracker) for worker in workers))
+        await work_queue.close_connection()
+
+    runtime.run(run(), context.config)
+    return len(consumed)
+
+
+def stage_lease_queue(context):
+    """
+    QUEUE_BACKEND=sqlite: Worker.run over leases claimed from the synchronized task rows;
+    the leases are released again so later stages see the rows unchanged.
+    """
+    work_queue = SQLiteLeaseQueue(context.open_task_manager(), context.config)
+    queue_name = work_queue.queue_name
+    consumed = []
+
+    async def process_task(message):
+        consumed.append(message.task)
+
+    async def run():
+        await work_queue.connect(prefetch_count=100)
+        lock = asyncio.Lock()
+        tracker = {"tasks_done": 0, "total_tasks": await work_queue.message_count(queue_name) + 1}
+        workers = [Worker(worker_id=i + 1, work_queue=work_queue, process_task=process_task, task_tracker_lock=lock)
+                   for i in range(context.config["rabbitmq"]["RABBITMQ_CONCURRENCY_LIMIT"])]
+        await asyncio.gather(*(worker.run(queue_name, tracker) for worker in workers))
+        await work_queue.close_connection()
+
+    runtime.run(run(), context.config)
+    return len(consumed)
+
+
+def stage_resolve(context):
+    """
+    The resolve path (rdns_check and result classification) against an instant resolver.
+    """
+    resolver = SyntheticResolver()
+    tasks = context.consumed or context.tasks
+
+    async def run():
+        semaphore = asyncio.Semaphore(context.config["rabbitmq"]["RABBITMQ_CONCURRENCY_LIMIT"])
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+        async def check(task):
+            async with semaphore:
+                result = await rdns_check(resolver, task["ip"], task["dns"])
+            return {"ip": task["ip"], "dns": task["dns"], "status": result["status"],
+                    "result": result["result"], "last_updated": now}
+
+        return await asyncio.gather(*(check(task) for task in tasks))
+
+    context.results = runtime.run(run(), context.config)
+    return len(context.results)
+
+
+def stage_sqlite_update(context):
+    """
+    TaskManager.bulk_update_tasks in the batch size the result sink uses.
+    """
+    task_manager = context.open_task_manager()
+    batch_size = context.config["sqlite"]["bulk_update_count"]
+    for start in range(0, len(context.results), batch_size):
+        task_manager.bulk_update_tasks(context.results[start:start + batch_size])
+    return len(context.results)
+
+
+def stage_postgres_export(context):
+    """
+    PostgreSQL.export_results_since_watermark: watermark paging over SQLite and
+    execute_values statement rendering on an offline cursor.
+    """
+    postgres = OfflinePostgreSQL(context.config)
+    postgres.connect()
+    task_manager = context.open_task_manager()
+    # Eşzamanlı yazan yok; sqlite_update'in son saniyesindeki satırlar da ölçüme girsin
+    task_manager.settled_cutoff = lambda: None
+    try:
+        return postgres.export_results_since_watermark(task_manager)
+    finally:
+        postgres.close_connection()
+
+
+STAGES = {
+    "generate": stage_generate,
+    "synchronize": stage_synchronize,
+    "consume": stage_consume,
+    "memory_queue": stage_memory_queue,
+    "lease_queue": stage_lease_queue,
+    "resolve": stage_resolve,
+    "sqlite_update": stage_sqlite_update,
+    "postgres_export": stage_postgres_export,
+}
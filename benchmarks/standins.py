@@ -0,0 +1,204 @@
+import asyncio
+import hashlib
+import os
+from collections import deque
+from contextlib import asynccontextmanager
+import aiodns
+import pycares
+import psycopg2.extensions
+from database.postgre import PostgreSQL
+from database.rabbitMQ import RabbitMQ
+from utils.dns_recorder import ReplayedA, ReplayedTXT
+
+
+def bench_config(workdir, zones):
+    """
+    Minimal application configuration pointing every file at the benchmark work directory.
+
+    Args:
+        workdir (str): Temporary directory of the run.
+        zones (int): Number of synthetic DNSBL zones.
+    """
+    return {
+        "logging": {
+            "app_log_path": os.path.join(workdir, "app.log"),
+            "error_log_path": os.path.join(workdir, "error.log")
+        },
+        "sqlite": {"db_path": os.path.join(workdir, "ip_check.db"), "bulk_update_count": 500},
+        "rabbitmq": {"host": "offline", "username": "bench", "password": "bench",
+                     "default_queue": "bench_queue", "RABBITMQ_CONCURRENCY_LIMIT": 50},
+        "postgresql": {"postgres_host": "offline", "postgres_db": "bench", "postgres_user": "bench",
+                       "sync_batch_size": 1000},
+        "blacklists": [
+            {"name": f"Zone {index}", "dns": f"zone{index}.bench.test",
+             "removal_link": f"https://zone{index}.bench.test/removal", "removal_method": "form"}
+            for index in range(zones)
+        ]
+    }
+
+
+class _DeclareOk:
+    class method:
+        message_count = 0
+
+
+class OfflineChannel:
+    """
+    pika BlockingChannel stand-in that keeps published message bodies in memory.
+    """
+
+    def __init__(self):
+        self.queues = {}
+
+    def queue_declare(self, queue, **kwargs):
+        self.queues.setdefault(queue, [])
+        return _DeclareOk()
+
+    def queue_purge(self, queue):
+        self.queues[queue] = []
+
+    def basic_publish(self, exchange, routing_key, body, properties=None):
+        self.queues.setdefault(routing_key, []).append(body)
+
+
+class OfflineRabbitMQ(RabbitMQ):
+    """
+    The real RabbitMQ publisher on top of OfflineChannel.
+    """
+
+    def connect(self):
+        self.channel = OfflineChannel()
+        self.ensure_queue_exists(self.queue_name)
+
+
+class OfflineMessage:
+    """
+    aio-pika IncomingMessage stand-in; process() acknowledges on exit.
+    """
+
+    __slots__ = ("body", "headers", "routing_key", "acked", "_queue")
+
+    def __init__(self, body, queue):
+        self.body = body.encode() if isinstance(body, str) else body
+        self.headers = {}
+        self.routing_key = queue.name
+        self.acked = False
+        self._queue = queue
+
+    @asynccontextmanager
+    async def process(self):
+        yield self
+        self.acked = True
+        self._queue.acked += 1
+
+
+class OfflineQueue:
+    """
+    aio-pika queue stand-in shared by all workers. Delivery yields to the loop between
+    messages, as a network delivery would; iteration ends when the queue is empty.
+    """
+
+    def __init__(self, name, bodies):
+        self.name = name
+        self.messages = deque(OfflineMessage(body, self) for body in bodies)
+        self.acked = 0
+
+    @asynccontextmanager
+    async def iterator(self):
+        yield self._iterate()
+
+    async def _iterate(self):
+        while self.messages:
+            await asyncio.sleep(0)
+            if not self.messages:
+                return
+            yield self.messages.popleft()
+
+
+class OfflineAsyncChannel:
+    def __init__(self, queue):
+        self.queue = queue
+
+    async def declare_queue(self, name=None, **kwargs):
+        return self.queue
+
+
+class OfflineAsyncRabbitMQ:
+    """
+    The parts of AsyncRabbitMQ that Worker.run uses.
+    """
+
+    def __init__(self, queue, display):
+        self.channel = OfflineAsyncChannel(queue)
+        self.display = display
+        self.process_manager = None
+
+    async def open_queue(self, queue_name):
+        return await self.channel.declare_queue(name=queue_name, durable=False)
+
+
+class SyntheticResolver:
+    """
+    aiodns-compatible resolver answering instantly: a stable hash of the query name
+    decides whether the address is listed, everything else is NXDOMAIN.
+    """
+
+    nameservers = ["synthetic"]
+
+    def __init__(self, listed_rate=0.05):
+        self.listed_rate = listed_rate
+
+    def _listed(self, name):
+        digest = hashlib.blake2b(name.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big") / 2 ** 64 < self.listed_rate
+
+    async def query(self, name, qtype):
+        if not self._listed(name):
+            raise aiodns.error.DNSError(pycares.errno.ARES_ENOTFOUND, "Domain name not found")
+        if qtype == "TXT":
+            return [ReplayedTXT("Listed by benchmark", 300)]
+        return [ReplayedA("127.0.0.2", 300)]
+
+
+class _OfflineConnection:
+    encoding = "UTF8"
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class _OfflineCursor:
+    """
+    Cursor that renders statements like psycopg2 (adapt/getquoted) but sends nothing.
+    """
+
+    def __init__(self):
+        self.connection = _OfflineConnection()
+        self.statements = 0
+        self.bytes_sent = 0
+
+    def mogrify(self, template, args):
+        quoted = tuple(psycopg2.extensions.adapt(arg).getquoted() for arg in args)
+        return template % quoted
+
+    def execute(self, query, params=None):
+        self.statements += 1
+        self.bytes_sent += len(query)
+
+
+class OfflinePostgreSQL(PostgreSQL):
+    """
+    The real export path (watermark paging, row building, execute_values rendering)
+    with an offline cursor instead of a server connection.
+    """
+
+    def connect(self):
+        self.cursor = _OfflineCursor()
+        self.connection = self.cursor.connection
+
+    def close_connection(self):
+        self.connection = None
+        self.cursor = None
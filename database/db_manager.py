@@ -58,17 +58,23 @@ class DBManager:
             self.display.print_error(f"\u274c Error connecting to SQLite: {e}")
             raise  # Hata mesajından sonra hatayı tekrar yükselt
 
-        # RabbitMQ
-        try:
-            self.rabbitmq = RabbitMQ(self.config)  # config parametresini ekle
-            self.rabbitmq.connect()
-            self.active_connections["RabbitMQ"] = self.rabbitmq
-            self.logger.info("Connected to RabbitMQ server.")
-            self.display.print_success("\u2714\ufe0f Connected to RabbitMQ server.")  # display.print_success kullan
-        except Exception as e:
-            self.logger.error(f"Error connecting to RabbitMQ: {e}", extra={"function": "connect_to_databases", "file": "db_manager.py"})
-            self.display.print_error(f"\u274c Error connecting to RabbitMQ: {e}")
-            raise  # Hata mesajından sonra hatayı tekrar yükselt
+        # RabbitMQ (broker'sız tek düğüm modunda süreç içi ya da SQLite kuyruğu kullanılır)
+        self.rabbitmq = None
+        queue_backend = self.config.get("queue", {}).get("backend", "rabbitmq")
+        if queue_backend != "rabbitmq":
+            self.logger.info(f"QUEUE_BACKEND={queue_backend}: skipping RabbitMQ connection.")
+            self.display.print_info(f"ℹ️ QUEUE_BACKEND={queue_backend}: RabbitMQ is not used.")
+        else:
+            try:
+                self.rabbitmq = RabbitMQ(self.config)  # config parametresini ekle
+                self.rabbitmq.connect()
+                self.active_connections["RabbitMQ"] = self.rabbitmq
+                self.logger.info("Connected to RabbitMQ server.")
+                self.display.print_success("\u2714\ufe0f Connected to RabbitMQ server.")  # display.print_success kullan
+            except Exception as e:
+                self.logger.error(f"Error connecting to RabbitMQ: {e}", extra={"function": "connect_to_databases", "file": "db_manager.py"})
+                self.display.print_error(f"\u274c Error connecting to RabbitMQ: {e}")
+                raise  # Hata mesajından sonra hatayı tekrar yükselt
 
         # Optional databases
         db_config = self.config.get("database", {}).get("recorded_dbs", {})
@@ -92,6 +98,7 @@ class DBManager:
             try:
                 self.mongodb = MongoDB(self.config)  # config parametresini ekle
                 self.mongodb.connect()  # db_name config dosyasından alınıyor
+                self.mongodb.ensure_results_collection()
                 self.active_connections["MongoDB"] = self.mongodb
                 self.logger.info("Connected to MongoDB database.")
                 self.display.print_success("\u2714\ufe0f Connected to MongoDB database.")  # display.print_success kullan
@@ -1,5 +1,9 @@
-from pymongo import MongoClient
+import time
+from datetime import datetime
+from pymongo import MongoClient, UpdateOne, ASCENDING
+from pymongo.errors import BulkWriteError
 from logB.logger import Logger
+from utils.metrics import DB_WRITE_SECONDS, DB_ROWS_WRITTEN, DB_WRITE_ERRORS
 
 
 class MongoDB:
@@ -18,6 +22,8 @@ class MongoDB:
         self.connection_string = config["mongodb"]["url"]  # connection string config'den alınıyor
         self.client = None
         self.db = None
+        self.results_collection = config["mongodb"].get("results_collection", "blacklist_results")
+        self.timeseries = config["mongodb"].get("timeseries", False)
         self.logger = Logger(log_file_path=config['logging']['app_log_path'])  # Logger nesnesi, config dosyasından log yolunu alıyor
 
     def connect(self, db_name=None):  # db_name parametresi opsiyonel hale getirildi
@@ -81,4 +87,117 @@ class MongoDB:
                 self.logger.info("MongoDB bağlantısı kapatıldı.")
         except Exception as e:
             self.logger.error(f"MongoDB bağlantı kapatma hatası: {e}", extra={"function": "close_connection", "file": "mongodb.py"})  # extra bilgisi eklendi
-            raise
\ No newline at end of file
+            raise
+
+    def ensure_results_collection(self):
+        """
+        Sonuç koleksiyonunu ve indekslerini oluşturur.
+
+        Default layout: one document per (ip, dns, check_date) with a unique compound index
+        that the bulk upserts are keyed on. With `timeseries` enabled the collection is a
+        time-series collection (timeField last_updated, metaField meta) suited to history.
+        """
+        try:
+            collection = self.db[self.results_collection]
+            if self.timeseries:
+                if self.results_collection not in self.db.list_collection_names():
+                    self.db.create_collection(
+                        self.results_collection,
+                        timeseries={"timeField": "last_updated", "metaField": "meta", "granularity": "hours"}
+                    )
+                collection.create_index([("meta.ip", ASCENDING), ("meta.dns", ASCENDING), ("last_updated", ASCENDING)])
+                collection.create_index([("meta.dns", ASCENDING), ("result", ASCENDING)])
+            else:
+                collection.create_index(
+                    [("ip", ASCENDING), ("dns", ASCENDING), ("check_date", ASCENDING)],
+                    unique=True, name="ip_dns_check_date"
+                )
+                collection.create_index([("check_date", ASCENDING), ("result", ASCENDING)], name="check_date_result")
+                collection.create_index([("dns", ASCENDING), ("result", ASCENDING)], name="dns_result")
+            self.logger.info(f"{self.results_collection} koleksiyonu ve indeksleri hazır.")
+        except Exception as e:
+            self.logger.error(f"İndeks oluşturma hatası: {e}", extra={"function": "ensure_results_collection", "file": "mongodb.py", "collection": self.results_collection})
+            raise
+
+    def bulk_upsert_results(self, tasks):
+        """
+        Sonuçları tek bir sırasız (unordered) bulk_write ile yazar.
+
+        Args:
+            tasks (list[dict]): Tasks with 'ip', 'dns', 'status', 'result', 'check_date' and 'last_updated' keys.
+
+        Returns:
+            int: Number of written documents.
+        """
+        if not tasks:
+            return 0
+        collection = self.db[self.results_collection]
+        started = time.perf_counter()
+        try:
+            if self.timeseries:
+                result = collection.insert_many([_timeseries_document(task) for task in tasks], ordered=False)
+                written = len(result.inserted_ids)
+            else:
+                operations = [
+                    UpdateOne(
+                        {"ip": task["ip"], "dns": task["dns"], "check_date": task["check_date"]},
+                        {"$set": {
+                            "status": task["status"],
+                            "result": task["result"],
+                            "last_updated": _to_datetime(task["last_updated"])
+                        }},
+                        upsert=True
+                    )
+                    for task in tasks
+                ]
+                result = collection.bulk_write(operations, ordered=False)
+                written = result.upserted_count + result.matched_count
+            DB_WRITE_SECONDS.labels("mongodb", "bulk_upsert").observe(time.perf_counter() - started)
+            DB_ROWS_WRITTEN.labels("mongodb").inc(written)
+            self.logger.info(f"{self.results_collection} koleksiyonuna {written} sonuç yazıldı.")
+            return written
+        except BulkWriteError as e:
+            DB_WRITE_ERRORS.labels("mongodb", "bulk_upsert").inc()
+            self.logger.error(f"Toplu yazma hatası: {e.details.get('writeErrors', [])[:5]}", extra={"function": "bulk_upsert_results", "file": "mongodb.py", "collection": self.results_collection})
+            raise
+        except Exception as e:
+            DB_WRITE_ERRORS.labels("mongodb", "bulk_upsert").inc()
+            self.logger.error(f"Toplu yazma hatası: {e}", extra={"function": "bulk_upsert_results", "file": "mongodb.py", "collection": self.results_collection})
+            raise
+
+    def iter_documents(self, collection_name, query, batch_size=1000, projection=None):
+        """
+        Sorguya uyan belgeleri imleç üzerinden parça parça döndürür; tüm sonucu belleğe almaz.
+
+        Args:
+            collection_name: Koleksiyon adı.
+            query: Sorgu (sözlük).
+            batch_size: Sunucudan her seferde alınacak belge sayısı.
+            projection: Döndürülecek alanlar (opsiyonel).
+
+        Yields:
+            dict: Belgeler.
+        """
+        try:
+            with self.db[collection_name].find(query, projection, batch_size=batch_size) as cursor:
+                for document in cursor:
+                    yield document
+        except Exception as e:
+            self.logger.error(f"Belge okuma hatası: {e}", extra={"function": "iter_documents", "file": "mongodb.py", "collection": collection_name, "query": query})
+            raise
+
+
+def _to_datetime(value):
+    if isinstance(value, datetime) or value is None:
+        return value
+    return datetime.strptime(str(value)[:19], "%Y-%m-%d %H:%M:%S")
+
+
+def _timeseries_document(task):
+    return {
+        "last_updated": _to_datetime(task["last_updated"]) or datetime.utcnow(),
+        "meta": {"ip": task["ip"], "dns": task["dns"]},
+        "check_date": task["check_date"],
+        "status": task["status"],
+        "result": task["result"]
+    }
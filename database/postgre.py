@@ -1,7 +1,68 @@
+import re
+import time
 import psycopg2
+import psycopg2.pool
+import psycopg2.extras
 import sqlite3
+from contextlib import contextmanager
+from datetime import date, datetime
+from database.postgre_pool import get_pool
 from logB.logger import Logger
 from utils.display import Display
+from utils.metrics import DB_WRITE_SECONDS, DB_ROWS_WRITTEN, DB_WRITE_ERRORS
+
+HISTORY_TABLE = "blacklisted_tasks"
+SYNC_WATERMARK_NAME = "postgresql"
+UPSERT_RESULTS_QUERY = f"""
+INSERT INTO {HISTORY_TABLE} (ip_address, dns, status, result, check_date, last_updated)
+VALUES %s
+ON CONFLICT (ip_address, dns, check_date) DO UPDATE
+SET status = EXCLUDED.status, result = EXCLUDED.result, last_updated = EXCLUDED.last_updated;
+"""
+RECENT_RESULTS_QUERY = f"""
+SELECT host(ip_address), dns, status, result, check_date, last_updated
+FROM {HISTORY_TABLE}
+WHERE check_date >= CURRENT_DATE - %s::int AND result = %s
+ORDER BY check_date DESC, ip_address
+"""
+_PARTITION_NAME_RE = re.compile(rf"^{HISTORY_TABLE}_p(\d{{4}})_(\d{{2}})$")
+
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def _month_start(value):
+    return value.replace(day=1)
+
+
+def _add_months(month_start, months):
+    month_index = month_start.year * 12 + month_start.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def _iter_months(first, last):
+    month_start = _month_start(_to_date(first))
+    last_month = _month_start(_to_date(last))
+    while month_start <= last_month:
+        yield month_start
+        month_start = _add_months(month_start, 1)
+
+
+def _partition_name(month_start):
+    return f"{HISTORY_TABLE}_p{month_start.year:04d}_{month_start.month:02d}"
+
+
+def _partition_month(partition_name):
+    match = _PARTITION_NAME_RE.match(partition_name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
 
 class PostgreSQL:
     """
@@ -19,35 +80,62 @@ class PostgreSQL:
         self.host = config["postgresql"]["postgres_host"]
         self.database = config["postgresql"]["postgres_db"]
         self.user = config["postgresql"]["postgres_user"]
-        self.password = config["postgresql"]["postgres_password"]
+        self.stream_batch_size = config["postgresql"].get("stream_batch_size", 2000)
+        self.partition_months_ahead = config["postgresql"].get("partition_months_ahead", 2)
+        self.retention_months = config["postgresql"].get("retention_months", 0)
+        self.sync_batch_size = config["postgresql"].get("sync_batch_size", 1000)
+        self._known_partitions = set()
+        self.pool = None
         self.connection = None
         self.cursor = None
+        self._in_transaction = False
+        self._stream_counter = 0
         self.logger = Logger(log_file_path=config['logging']['app_log_path'])
         self.display = Display()
 
     def connect(self):
         """
-        PostgreSQL sunucusuna bağlanır.
+        Paylaşılan havuzdan bir PostgreSQL bağlantısı alır.
         """
+        if self.connection is not None:
+            return
         try:
-            self.connection = psycopg2.connect(
-                host=self.host,
-                database=self.database,
-                user=self.user,
-                password=self.password
-            )
+            self.pool = get_pool(self.config)
+            self.connection = self.pool.getconn()
             self.cursor = self.connection.cursor()
             self.logger.info("PostgreSQL sunucusuna başarıyla bağlanıldı.")
             self.display.print_success("✔️ PostgreSQL sunucusuna başarıyla bağlanıldı.")
-        except psycopg2.Error as e:
+        except (psycopg2.Error, psycopg2.pool.PoolError) as e:
             error_message = f"PostgreSQL bağlantı hatası: {e}"
             self.logger.error(error_message, extra={"function": "connect", "file": "postgre.py"})
             self.display.print_error(f"❌ {error_message}")
             raise
 
+    @contextmanager
+    def transaction(self):
+        """
+        Explicit transaction scope: statements executed inside are committed together on
+        success and rolled back on error. Nested scopes join the outer transaction.
+
+        Yields:
+            The cursor bound to the transaction.
+        """
+        if self._in_transaction:
+            yield self.cursor
+            return
+        self._in_transaction = True
+        try:
+            yield self.cursor
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            self._in_transaction = False
+
     def execute_query(self, query, params=None):
         """
-        Belirtilen sorguyu çalıştırır.
+        Belirtilen sorguyu çalıştırır. Bir transaction() kapsamı dışında her sorgudan sonra commit edilir.
 
         Args:
             query: Çalıştırılacak SQL sorgusu.
@@ -55,17 +143,74 @@ class PostgreSQL:
         """
         try:
             self.cursor.execute(query, params)
-            self.connection.commit()
+            if not self._in_transaction:
+                self.connection.commit()
             self.display.print_success("✔️ Query : " + query + " executed successfully")
         except psycopg2.Error as e:
+            if not self._in_transaction:
+                self.connection.rollback()
             error_message = f"Query çalıştırma hatası: {e}"
             self.logger.error(error_message, extra={"function": "execute_query", "file": "postgre.py", "query": query, "params": params})
             self.display.print_error(f"❌ {error_message}")
             raise
 
+    def execute_prepared(self, name, query, params_list, page_size=500):
+        """
+        Runs a statement many times through a server-side prepared statement. The statement
+        is prepared once per pooled connection and reused by every later call.
+
+        Args:
+            name (str): Prepared statement name.
+            query (str): SQL with %s placeholders.
+            params_list (list[tuple]): One parameter tuple per execution.
+            page_size (int): Executions sent per round trip.
+        """
+        try:
+            self.pool.prepare(self.connection, name, query)
+            placeholders = ", ".join(["%s"] * query.count("%s"))
+            psycopg2.extras.execute_batch(self.cursor, f"EXECUTE {name} ({placeholders})", params_list, page_size=page_size)
+            if not self._in_transaction:
+                self.connection.commit()
+        except psycopg2.Error as e:
+            if not self._in_transaction:
+                self.connection.rollback()
+            error_message = f"Prepared statement '{name}' failed: {e}"
+            self.logger.error(error_message, extra={"function": "execute_prepared", "file": "postgre.py", "query": query})
+            self.display.print_error(f"❌ {error_message}")
+            raise
+
+    def fetch_prepared(self, name, query, params=None):
+        """
+        Runs a prepared query and returns its rows.
+
+        Args:
+            name (str): Prepared statement name.
+            query (str): SQL with %s placeholders.
+            params (tuple, optional): Query parameters.
+
+        Returns:
+            list: Result rows.
+        """
+        try:
+            self.pool.prepare(self.connection, name, query)
+            if params:
+                self.cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+            else:
+                self.cursor.execute(f"EXECUTE {name}")
+            return self.cursor.fetchall()
+        except psycopg2.Error as e:
+            # transaction() kapsamındaysa geri alma kapsamın işi
+            if not self._in_transaction:
+                self.connection.rollback()
+            error_message = f"Prepared query '{name}' failed: {e}"
+            self.logger.error(error_message, extra={"function": "fetch_prepared", "file": "postgre.py", "query": query})
+            self.display.print_error(f"❌ {error_message}")
+            raise
+
     def fetch_data(self, query, params=None):
         """
         Belirtilen sorguyu çalıştırır ve sonuçları döndürür.
+        Büyük sonuçlar için stream_data tercih edilmelidir.
 
         Args:
             query: Çalıştırılacak SQL sorgusu.
@@ -86,15 +231,46 @@ class PostgreSQL:
             self.display.print_error(f"❌ {error_message}")
             raise
 
+    def stream_data(self, query, params=None, batch_size=None):
+        """
+        Streams query results through a server-side named cursor, fetching `batch_size`
+        rows per round trip instead of materialising the whole result in memory.
+
+        Args:
+            query: SQL query.
+            params: Query parameters (optional).
+            batch_size (int, optional): Rows fetched per round trip.
+
+        Yields:
+            tuple: One result row at a time.
+        """
+        batch_size = batch_size or self.stream_batch_size
+        self._stream_counter += 1
+        cursor_name = f"stream_{id(self):x}_{self._stream_counter}"
+        try:
+            with self.transaction():
+                with self.connection.cursor(name=cursor_name) as cursor:
+                    cursor.itersize = batch_size
+                    cursor.execute(query, params)
+                    for row in cursor:
+                        yield row
+        except psycopg2.Error as e:
+            error_message = f"Veri akışı hatası: {e}"
+            self.logger.error(error_message, extra={"function": "stream_data", "file": "postgre.py", "query": query, "params": params})
+            self.display.print_error(f"❌ {error_message}")
+            raise
+
     def close_connection(self):
         """
-        PostgreSQL bağlantısını kapatır.
+        PostgreSQL bağlantısını havuza geri bırakır.
         """
         try:
             if self.cursor:
                 self.cursor.close()
+                self.cursor = None
             if self.connection:
-                self.connection.close()
+                self.pool.putconn(self.connection)
+                self.connection = None
                 self.logger.info("PostgreSQL bağlantısı kapatıldı.")
                 self.display.print_success("✔️ PostgreSQL bağlantısı kapatıldı.")
         except psycopg2.Error as e:
@@ -132,79 +308,297 @@ class PostgreSQL:
 
     def ensure_blacklisted_tasks_table_exists(self):
         """
-        Ensures that the 'blacklisted_tasks' table exists in the PostgreSQL database.
-        Creates the table if it does not exist or updates it with the UNIQUE constraint.
+        Ensures that the partitioned 'blacklisted_tasks' history table exists in PostgreSQL.
+
+        The table is range-partitioned by month on check_date and stores IPs as inet.
+        A legacy flat table is migrated in place and upcoming partitions are created.
+        Retention is opt-in (POSTGRES_RETENTION_MONTHS > 0): partitions older than the
+        window are dropped, except in the run that migrated the legacy table.
         """
         try:
-            create_table_query = """
-            CREATE TABLE IF NOT EXISTS blacklisted_tasks (
-                id SERIAL PRIMARY KEY,
-                ip_address TEXT NOT NULL,
+            relkind = self._get_relkind(HISTORY_TABLE)
+            if relkind == "r":
+                self._migrate_legacy_history_table()
+            elif relkind is None:
+                self._create_partitioned_history_table()
+
+            self.ensure_partitions()
+            if relkind == "r" and self.retention_months:
+                # Taşınan geçmiş aynı çalıştırmada sessizce silinmesin
+                self.display.print_warning("⚠️ Legacy history migrated; retention is applied from the next run on.")
+            else:
+                self.drop_expired_partitions()
+            self.logger.info("Ensured partitioned 'blacklisted_tasks' table exists.")
+            self.display.print_success("✔️ Ensured partitioned 'blacklisted_tasks' table exists.")
+        except Exception as e:
+            error_message = f"Error ensuring 'blacklisted_tasks' table exists: {e}"
+            self.logger.error(error_message, extra={"function": "ensure_blacklisted_tasks_table_exists", "file": "postgre.py"})
+            self.display.print_error(f"❌ {error_message}")
+            raise
+
+    def _get_relkind(self, table_name):
+        """
+        Returns the pg_class relkind of a table ('r' plain, 'p' partitioned) or None if it does not exist.
+        """
+        self.cursor.execute(
+            "SELECT c.relkind FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE c.relname = %s AND n.nspname = current_schema();",
+            (table_name,)
+        )
+        row = self.cursor.fetchone()
+        return row[0] if row else None
+
+    def _create_partitioned_history_table(self):
+        """
+        Creates the partitioned parent table and its partitioned indexes.
+
+        Indexes declared on the parent are created on every partition automatically:
+        BRIN for the append-ordered date columns and GiST (inet_ops) for subnet queries.
+        Per-IP lookups are served by the primary key.
+        """
+        statements = [
+            f"""
+            CREATE TABLE IF NOT EXISTS {HISTORY_TABLE} (
+                ip_address INET NOT NULL,
                 dns TEXT NOT NULL,
                 status TEXT NOT NULL,
                 result TEXT,
                 check_date DATE NOT NULL,
                 last_updated TIMESTAMP NOT NULL,
-                UNIQUE (ip_address, dns, check_date) -- Prevent duplicate entries
-            );
-            """
-            self.execute_query(create_table_query)
-            self.logger.info("Ensured 'blacklisted_tasks' table exists with UNIQUE constraint.")
-            self.display.print_success("✔️ Ensured 'blacklisted_tasks' table exists with UNIQUE constraint.")
-        except Exception as e:
-            error_message = f"Error ensuring 'blacklisted_tasks' table exists: {e}"
-            self.logger.error(error_message, extra={"function": "ensure_blacklisted_tasks_table_exists", "file": "postgre.py"})
+                CONSTRAINT {HISTORY_TABLE}_pk PRIMARY KEY (ip_address, dns, check_date)
+            ) PARTITION BY RANGE (check_date);
+            """,
+            f"CREATE INDEX IF NOT EXISTS {HISTORY_TABLE}_check_date_brin ON {HISTORY_TABLE} USING BRIN (check_date);",
+            f"CREATE INDEX IF NOT EXISTS {HISTORY_TABLE}_last_updated_brin ON {HISTORY_TABLE} USING BRIN (last_updated);",
+            f"CREATE INDEX IF NOT EXISTS {HISTORY_TABLE}_ip_gist ON {HISTORY_TABLE} USING GIST (ip_address inet_ops);",
+        ]
+        with self.transaction() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+        self.logger.info(f"Created partitioned '{HISTORY_TABLE}' table.")
+
+    def _migrate_legacy_history_table(self):
+        """
+        Converts the legacy flat 'blacklisted_tasks' table (TEXT IPs, SERIAL id) to the
+        partitioned layout in a single transaction.
+        """
+        legacy_table = f"{HISTORY_TABLE}_legacy"
+        with self.transaction() as cursor:
+            cursor.execute(f"ALTER TABLE {HISTORY_TABLE} RENAME TO {legacy_table};")
+            cursor.execute(f"SELECT MIN(check_date), MAX(check_date) FROM {legacy_table};")
+            min_date, max_date = cursor.fetchone()
+
+            self._create_partitioned_history_table()
+            if min_date:
+                for month_start in _iter_months(min_date, max_date):
+                    self._create_partition(month_start)
+                cursor.execute(f"""
+                    INSERT INTO {HISTORY_TABLE} (ip_address, dns, status, result, check_date, last_updated)
+                    SELECT ip_address::inet, dns, status, result, check_date, last_updated FROM {legacy_table}
+                    ON CONFLICT (ip_address, dns, check_date) DO NOTHING;
+                """)
+            cursor.execute(f"DROP TABLE {legacy_table};")
+        self.logger.info(f"Migrated legacy '{HISTORY_TABLE}' table to the partitioned layout.")
+        self.display.print_success(f"✔️ Migrated legacy '{HISTORY_TABLE}' table to the partitioned layout.")
+
+    def _create_partition(self, month_start):
+        """
+        Creates the monthly partition starting at month_start if it does not exist.
+        Callers run it inside a transaction() scope.
+
+        Args:
+            month_start (date): First day of the partition month.
+        """
+        month_end = _add_months(month_start, 1)
+        partition_name = _partition_name(month_start)
+        self.cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {partition_name} PARTITION OF {HISTORY_TABLE} "
+            "FOR VALUES FROM (%s) TO (%s);",
+            (month_start, month_end)
+        )
+
+    def ensure_partitions(self, start=None, months_ahead=None):
+        """
+        Creates monthly partitions from the month of `start` (default: today) up to `months_ahead` months later.
+
+        Args:
+            start (date, optional): Date whose month is the first partition to ensure.
+            months_ahead (int, optional): Number of upcoming months to pre-create.
+        """
+        months_ahead = self.partition_months_ahead if months_ahead is None else months_ahead
+        first_month = _month_start(start or date.today())
+        months = [_add_months(first_month, offset) for offset in range(months_ahead + 1)]
+        try:
+            with self.transaction():
+                for month_start in months:
+                    self._create_partition(month_start)
+            self._known_partitions.update(months)
+        except psycopg2.Error as e:
+            error_message = f"Error creating partitions: {e}"
+            self.logger.error(error_message, extra={"function": "ensure_partitions", "file": "postgre.py"})
+            raise
+
+    def ensure_partitions_for_dates(self, check_dates):
+        """
+        Makes sure a partition exists for every given check_date.
+
+        Args:
+            check_dates (iterable): Dates as `date` objects or 'YYYY-MM-DD' strings.
+        """
+        months = {_month_start(_to_date(check_date)) for check_date in check_dates} - self._known_partitions
+        if not months:
+            return
+        with self.transaction():
+            for month_start in sorted(months):
+                self._create_partition(month_start)
+        self._known_partitions.update(months)
+
+    def drop_expired_partitions(self, retention_months=None):
+        """
+        Drops monthly partitions that end before the retention window. Dropping a partition
+        is a metadata operation, unlike DELETE it leaves no dead tuples to vacuum.
+
+        Args:
+            retention_months (int, optional): Months of history to keep; 0 disables retention.
+
+        Returns:
+            list: Names of the dropped partitions.
+        """
+        retention_months = self.retention_months if retention_months is None else retention_months
+        if not retention_months:
+            return []
+
+        cutoff = _add_months(_month_start(date.today()), -retention_months)
+        dropped = []
+        try:
+            with self.transaction() as cursor:
+                cursor.execute(
+                    "SELECT child.relname FROM pg_inherits i "
+                    "JOIN pg_class parent ON parent.oid = i.inhparent "
+                    "JOIN pg_class child ON child.oid = i.inhrelid "
+                    "WHERE parent.relname = %s;",
+                    (HISTORY_TABLE,)
+                )
+                for (partition_name,) in cursor.fetchall():
+                    month_start = _partition_month(partition_name)
+                    if month_start is not None and _add_months(month_start, 1) <= cutoff:
+                        cursor.execute(f"DROP TABLE IF EXISTS {partition_name};")
+                        dropped.append((partition_name, month_start))
+        except psycopg2.Error as e:
+            error_message = f"Error dropping expired partitions: {e}"
+            self.logger.error(error_message, extra={"function": "drop_expired_partitions", "file": "postgre.py"})
+            raise
+
+        self._known_partitions.difference_update(month_start for _, month_start in dropped)
+        dropped_names = [partition_name for partition_name, _ in dropped]
+        if dropped_names:
+            self.logger.info(f"Dropped {len(dropped_names)} expired partitions: {', '.join(dropped_names)}")
+            self.display.print_info(f"ℹ️ Dropped {len(dropped_names)} expired partitions.")
+        return dropped_names
+
+    def fetch_recent_results(self, days=14, result="listed"):
+        """
+        Fetches results of the last `days` days. The check_date range lets the planner
+        prune every partition outside the window.
+
+        Args:
+            days (int): Size of the window in days.
+            result (str): Result class to filter on.
+
+        Returns:
+            list: Matching rows.
+        """
+        return self.fetch_prepared("fetch_recent_results", RECENT_RESULTS_QUERY, (days, result))
+
+    def upsert_results(self, tasks):
+        """
+        Upserts a batch of task results into the history table in a single transaction.
+
+        Args:
+            tasks (list[dict]): Tasks with 'ip', 'dns', 'status', 'result', 'check_date' and 'last_updated' keys.
+
+        Returns:
+            int: Number of upserted rows.
+        """
+        # Aynı anahtar bir VALUES listesinde iki kez geçerse ON CONFLICT hata verir; sonuncusu kalır
+        rows = {
+            (task["ip"], task["dns"], task["check_date"]): (
+                task["ip"], task["dns"], task["status"], task["result"], task["check_date"], task["last_updated"]
+            )
+            for task in tasks
+        }
+        if not rows:
+            return 0
+
+        try:
+            self.ensure_partitions_for_dates(key[2] for key in rows)
+            with DB_WRITE_SECONDS.labels("postgresql", "upsert").time(), self.transaction() as cursor:
+                psycopg2.extras.execute_values(cursor, UPSERT_RESULTS_QUERY, list(rows.values()), page_size=len(rows))
+            DB_ROWS_WRITTEN.labels("postgresql").inc(len(rows))
+            self.logger.info(f"Upserted {len(rows)} results into '{HISTORY_TABLE}'.")
+            return len(rows)
+        except psycopg2.Error as e:
+            DB_WRITE_ERRORS.labels("postgresql", "upsert").inc()
+            error_message = f"Error upserting results: {e}"
+            self.logger.error(error_message, extra={"function": "upsert_results", "file": "postgre.py", "rows": len(rows)})
             self.display.print_error(f"❌ {error_message}")
             raise
-    
+
+    def export_results_since_watermark(self, sqlite_manager, batch_size=None, drain=False):
+        """
+        Ships every settled SQLite task past the persisted watermark to PostgreSQL in batches.
+        Rows of the current second are left for the next export (see TaskManager.settled_cutoff).
+
+        Args:
+            sqlite_manager: The SQLite TaskManager instance holding the tasks and the watermark.
+            batch_size (int, optional): Rows per batch.
+            drain (bool): Wait for the current second to pass first, so rows finished
+                just before the call are exported too.
+
+        Returns:
+            int: Number of exported rows.
+        """
+        batch_size = batch_size or self.sync_batch_size
+        if drain:
+            time.sleep(1.0 - time.time() % 1.0)
+        last_updated, last_id = sqlite_manager.get_sync_watermark(SYNC_WATERMARK_NAME)
+        cutoff = sqlite_manager.settled_cutoff()
+        exported = 0
+        while True:
+            batch = sqlite_manager.fetch_tasks_updated_since(last_updated, last_id, batch_size, before=cutoff)
+            if not batch:
+                break
+            self.upsert_results(batch)
+            last_updated, last_id = batch[-1]["last_updated"], batch[-1]["id"]
+            sqlite_manager.set_sync_watermark(SYNC_WATERMARK_NAME, last_updated, last_id)
+            exported += len(batch)
+            if len(batch) < batch_size:
+                break
+        return exported
+
     def process_sqlite_to_postgres_and_exit(self, sqlite_manager):
         """
-        Processes 'blacklisted' tasks from SQLite for the latest date and inserts them into PostgreSQL.
+        Exports SQLite results that are past the sync watermark into PostgreSQL.
+        When the live PostgreSQL sync ran during processing there is nothing left and this is a no-op.
         Closes the connection after processing.
-        
+
         Args:
             sqlite_manager: The SQLite TaskManager instance to fetch tasks.
         """
         try:
             self.connect()  # Connect to PostgreSQL
-            
+
             # Ensure the table exists before proceeding
             self.ensure_blacklisted_tasks_table_exists()
 
-            # Fetch 'blacklisted' tasks from SQLite for the latest date
-            blacklisted_tasks = sqlite_manager.fetch_tasks_by_latest_date("listed")
-            if not blacklisted_tasks:
-                self.logger.info("No 'blacklisted' tasks found in SQLite.")
-                self.display.print_info("ℹ️ No 'blacklisted' tasks found in SQLite.")
+            exported = self.export_results_since_watermark(sqlite_manager, drain=True)
+            if not exported:
+                self.logger.info("No new results to transfer, PostgreSQL is up to date.")
+                self.display.print_info("ℹ️ No new results to transfer, PostgreSQL is up to date.")
                 return
-            
-            self.logger.info(f"Found {len(blacklisted_tasks)} 'blacklisted' tasks to transfer.")
-            self.display.print_info(f"ℹ️ Transferring {len(blacklisted_tasks)} 'blacklisted' tasks to PostgreSQL.")
-
-            # Insert tasks into PostgreSQL
-            for task in blacklisted_tasks:
-                try:
-                    query = """
-                    INSERT INTO blacklisted_tasks (ip_address, dns, status, result, check_date, last_updated)
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (ip_address, dns, check_date) DO UPDATE
-                    SET status = EXCLUDED.status, result = EXCLUDED.result, last_updated = EXCLUDED.last_updated;
-                    """
-                    params = (
-                        task["ip"], task["dns"], task["status"], task["result"], task["check_date"], task["last_updated"]
-                    )
-                    self.execute_query(query, params)
-                except Exception as e:
-                    if "relation" in str(e) and "does not exist" in str(e):
-                        self.logger.warning("Table 'blacklisted_tasks' not found. Attempting to create it.")
-                        self.ensure_blacklisted_tasks_table_exists()
-                        self.logger.info("Retrying insertion after table creation.")
-                        self.execute_query(query, params)  # Retry the insertion
-                    else:
-                        raise e  # Re-raise unexpected exceptions
-            
-            self.logger.info(f"Transferred {len(blacklisted_tasks)} 'blacklisted' tasks successfully.")
-            self.display.print_success(f"✔️ Transferred {len(blacklisted_tasks)} 'blacklisted' tasks successfully.")
+
+            self.logger.info(f"Transferred {exported} results successfully.")
+            self.display.print_success(f"✔️ Transferred {exported} results successfully.")
         except Exception as e:
             error_message = f"Error during SQLite to PostgreSQL transfer: {e}"
             self.logger.error(error_message, extra={"function": "process_sqlite_to_postgres_and_exit", "file": "postgre.py"})
@@ -0,0 +1,184 @@
+import re
+import time
+import atexit
+import threading
+from contextlib import contextmanager
+import psycopg2
+import psycopg2.pool
+import psycopg2.extensions
+from logB.logger import Logger
+
+_PARAM_RE = re.compile(r"%s")
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PostgresPool:
+    """
+    Thread-safe PostgreSQL connection pool shared by every PostgreSQL user in the process.
+
+    Connections are health-checked when they are handed out after being idle, and
+    statements prepared on a connection are remembered so they are only prepared once.
+    """
+
+    def __init__(self, config):
+        """
+        Creates the pool from the 'postgresql' section of the configuration.
+
+        Args:
+            config: Application configuration.
+        """
+        pg_config = config["postgresql"]
+        self.min_size = pg_config.get("pool_min", 1)
+        self.max_size = pg_config.get("pool_max", 5)
+        self.health_check_interval = pg_config.get("pool_health_check_interval", 30)
+        self.acquire_timeout = pg_config.get("pool_acquire_timeout", 30)
+        self.logger = Logger(log_file_path=config['logging']['app_log_path'])
+        self._pool = psycopg2.pool.ThreadedConnectionPool(
+            self.min_size,
+            self.max_size,
+            host=pg_config["postgres_host"],
+            port=pg_config.get("postgres_port", 5432),
+            database=pg_config["postgres_db"],
+            user=pg_config["postgres_user"],
+            password=pg_config["postgres_password"]
+        )
+        # ThreadedConnectionPool raises when exhausted; the semaphore makes callers wait instead
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        self._last_used = {}
+        self._prepared = {}
+
+    def getconn(self):
+        """
+        Takes a healthy connection from the pool, waiting up to `acquire_timeout` seconds for a free slot.
+
+        Returns:
+            psycopg2.extensions.connection: A pooled connection.
+        """
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise psycopg2.pool.PoolError(f"No PostgreSQL connection available within {self.acquire_timeout}s.")
+        try:
+            conn = self._pool.getconn()
+            if not self._is_healthy(conn):
+                self._discard(conn)
+                conn = self._pool.getconn()
+            return conn
+        except Exception:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn):
+        """
+        Returns a connection to the pool, rolling back any transaction left open.
+
+        Args:
+            conn: Connection obtained from getconn().
+        """
+        try:
+            if conn.closed:
+                self._discard(conn)
+                return
+            if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            self._last_used[id(conn)] = time.monotonic()
+            self._pool.putconn(conn)
+        except psycopg2.Error:
+            self._discard(conn)
+        finally:
+            self._slots.release()
+
+    def _is_healthy(self, conn):
+        if conn.closed:
+            return False
+        idle_since = self._last_used.get(id(conn))
+        if idle_since is not None and time.monotonic() - idle_since < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1;")
+            conn.rollback()
+            return True
+        except psycopg2.Error as e:
+            self.logger.warning(f"Discarding unhealthy PostgreSQL connection: {e}")
+            return False
+
+    def _discard(self, conn):
+        self._last_used.pop(id(conn), None)
+        self._prepared.pop(id(conn), None)
+        self._pool.putconn(conn, close=True)
+
+    def prepare(self, conn, name, query):
+        """
+        Prepares `query` under `name` on the connection unless it was already prepared there.
+
+        Args:
+            conn: Pooled connection.
+            name (str): Statement name.
+            query (str): SQL using %s placeholders.
+        """
+        prepared = self._prepared.setdefault(id(conn), set())
+        if name in prepared:
+            return
+        counter = iter(range(1, query.count("%s") + 1))
+        server_query = _PARAM_RE.sub(lambda _: f"${next(counter)}", query)
+        with conn.cursor() as cursor:
+            cursor.execute(f"PREPARE {name} AS {server_query}")
+        prepared.add(name)
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager that lends a connection and returns it to the pool afterwards.
+        """
+        conn = self.getconn()
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def close(self):
+        """
+        Closes every connection of the pool.
+        """
+        self._pool.closeall()
+        self._last_used.clear()
+        self._prepared.clear()
+
+
+def get_pool(config):
+    """
+    Returns the process-wide pool for the configured server and database, creating it on first use.
+
+    Args:
+        config: Application configuration.
+
+    Returns:
+        PostgresPool: The shared pool.
+    """
+    pg_config = config["postgresql"]
+    key = (
+        pg_config["postgres_host"],
+        pg_config.get("postgres_port", 5432),
+        pg_config["postgres_db"],
+        pg_config["postgres_user"]
+    )
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = PostgresPool(config)
+            _pools[key] = pool
+        return pool
+
+
+def close_all_pools():
+    """
+    Closes every pool created in this process.
+    """
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+atexit.register(close_all_pools)
@@ -2,6 +2,11 @@ import json
 import pika
 from logB.logger import Logger
 from utils.display import Display
+from utils import metrics
+from utils.profiler import profiled
+
+MESSAGES_PUBLISHED = metrics.counter("dnsbl_rabbitmq_messages_published_total", "Task messages published to RabbitMQ.", ("queue",))
+PUBLISH_SECONDS = metrics.histogram("dnsbl_rabbitmq_publish_batch_duration_seconds", "Duration of publishing one task batch.", ("queue",))
 
 
 class RabbitMQ:
@@ -86,24 +91,35 @@ class RabbitMQ:
         except Exception as e:
             self._handle_critical_error(f"Error clearing queue '{queue_name}': {e}", "clear_queue", queue_name)
 
-    def publish_task(self, queue_name, tasks):
+    @profiled("rabbitmq.publish_task")
+    def publish_task(self, queue_name, tasks, tracer=None):
         """
         Publishes multiple tasks to the specified queue in batch.
 
         Args:
             queue_name (str): The name of the queue to publish the tasks to.
             tasks (list of dict): The tasks to publish.
+            tracer (Tracer, optional): Stamps trace context headers into sampled messages.
         """
         try:
             self.ensure_queue_exists(queue_name)
-            for task in tasks:
-                message = json.dumps(task)
-                self.channel.basic_publish(
-                    exchange='',
-                    routing_key=queue_name,
-                    body=message,
-                    properties=pika.BasicProperties(delivery_mode=2)
-                )
+            persistent = pika.BasicProperties(delivery_mode=2)
+            tracing = tracer is not None and tracer.enabled
+            with PUBLISH_SECONDS.labels(queue_name).time():
+                for task in tasks:
+                    message = json.dumps(task)
+                    properties = persistent
+                    if tracing:
+                        headers = tracer.inject({"messaging.destination": queue_name, "dns.zone": task.get("dns", "")})
+                        if headers is not None:
+                            properties = pika.BasicProperties(delivery_mode=2, headers=headers)
+                    self.channel.basic_publish(
+                        exchange='',
+                        routing_key=queue_name,
+                        body=message,
+                        properties=properties
+                    )
+            MESSAGES_PUBLISHED.labels(queue_name).inc(len(tasks))
             self.logger.info(f"Published {len(tasks)} tasks to queue '{queue_name}'.")
         except Exception as e:
             self._handle_critical_error(f"Failed to publish tasks to queue '{queue_name}': {e}", "publish_task", queue_name)
@@ -0,0 +1,279 @@
+import time
+import asyncio
+from database.postgre import PostgreSQL, SYNC_WATERMARK_NAME
+from logB.logger import Logger
+from utils.display import Display
+from utils import metrics
+from utils.tracing import get_tracer
+from utils.postgres_synchronizer import export_since_watermark
+
+SINK_WRITE_SECONDS = metrics.histogram("dnsbl_result_sink_write_duration_seconds", "Duration of one result sink batch write.", ("sink",))
+SINK_WRITTEN = metrics.counter("dnsbl_result_sink_results_written_total", "Results written by each result sink.", ("sink",))
+SINK_FAILED_BATCHES = metrics.counter("dnsbl_result_sink_failed_batches_total", "Result batches a sink failed to write.", ("sink",))
+SINK_QUEUE_DEPTH = metrics.gauge("dnsbl_result_sink_queue_depth", "Result batches waiting in each sink's queue.", ("sink",))
+
+_CLOSE = object()
+
+
+class ResultSink:
+    """
+    Base class for result backends fed by ResultFanout.
+
+    Subclasses implement write_batch and may override open/flush/close. Each sink gets
+    its own bounded queue and consumer task, so a slow backend only applies
+    backpressure once its own queue is full.
+    """
+
+    name = "sink"
+
+    def __init__(self, buffer_size=500, queue_size=8):
+        """
+        Args:
+            buffer_size (int): Results accumulated before write_batch is called.
+            queue_size (int): Published batches that may wait for this sink before publishers block.
+        """
+        self.buffer_size = buffer_size
+        self.queue_size = queue_size
+        self.written_count = 0
+        self.failed_batches = 0
+
+    async def open(self):
+        """
+        Prepares the backend before the first batch.
+        """
+
+    async def write_batch(self, batch):
+        """
+        Writes one batch of processed tasks.
+
+        Args:
+            batch (list[dict]): Processed tasks.
+        """
+        raise NotImplementedError
+
+    async def flush(self):
+        """
+        Writes anything the backend buffers internally.
+        """
+
+    async def close(self):
+        """
+        Releases the backend's resources.
+        """
+
+
+class SQLiteResultSink(ResultSink):
+    """
+    Updates task rows through the SQLite TaskManager. The sqlite3 connection belongs to
+    the event loop thread, so writes run there.
+    """
+
+    name = "SQLite"
+
+    def __init__(self, sqlite_manager, buffer_size=500, queue_size=8):
+        super().__init__(buffer_size, queue_size)
+        self.sqlite_manager = sqlite_manager
+
+    async def write_batch(self, batch):
+        self.sqlite_manager.bulk_update_tasks(batch)
+
+
+class PostgresResultSink(ResultSink):
+    """
+    Upserts results straight into the PostgreSQL history table from the default executor.
+
+    Rows left behind by earlier runs are exported through the SQLite watermark when the
+    sink opens; if every batch is written, the watermark is moved to the newest row on
+    close so the end-of-run export has nothing left to do.
+    """
+
+    name = "PostgreSQL"
+
+    def __init__(self, config, sqlite_manager, buffer_size=1000, queue_size=8):
+        super().__init__(buffer_size, queue_size)
+        self.postgres = PostgreSQL(config)
+        self.sqlite_manager = sqlite_manager
+
+    async def open(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.postgres.connect)
+        await loop.run_in_executor(None, self.postgres.ensure_blacklisted_tasks_table_exists)
+        # Upsert'ler executor'da; SQLite okuması bağlantının sahibi olan loop thread'inde
+        await export_since_watermark(self.postgres, self.sqlite_manager, self.postgres.sync_batch_size)
+
+    async def write_batch(self, batch):
+        await asyncio.get_running_loop().run_in_executor(None, self.postgres.upsert_results, batch)
+
+    async def close(self):
+        if not self.failed_batches:
+            self.sqlite_manager.set_sync_watermark(SYNC_WATERMARK_NAME, *self.sqlite_manager.get_latest_watermark())
+        await asyncio.get_running_loop().run_in_executor(None, self.postgres.close_connection)
+
+
+class MongoResultSink(ResultSink):
+    """
+    Writes results to MongoDB in unordered bulk upserts from the default executor.
+    """
+
+    name = "MongoDB"
+
+    def __init__(self, mongodb, buffer_size=None, queue_size=8):
+        super().__init__(buffer_size or mongodb.config["mongodb"].get("bulk_size", 1000), queue_size)
+        self.mongodb = mongodb
+
+    async def write_batch(self, batch):
+        await asyncio.get_running_loop().run_in_executor(None, self.mongodb.bulk_upsert_results, batch)
+
+
+class ResultFanout:
+    """
+    Publishes each result batch once and lets every sink consume it concurrently.
+    """
+
+    def __init__(self, sinks, config):
+        """
+        Args:
+            sinks (list[ResultSink]): Enabled sinks.
+            config: Application configuration.
+        """
+        self.sinks = sinks
+        self.flush_interval = config.get("results", {}).get("flush_interval", 2.0)
+        self.logger = Logger(log_file_path=config['logging']['app_log_path'])
+        self.display = Display()
+        self.tracer = get_tracer(config)
+        self._queues = {}
+        self._consumers = []
+        self._started = False
+
+    async def start(self):
+        """
+        Opens every sink and starts one consumer task per sink.
+        """
+        self._started = True
+        for sink in list(self.sinks):
+            try:
+                await sink.open()
+            except Exception as e:
+                # Açılamayan sink devre dışı kalır, diğerleri çalışmaya devam eder
+                self.sinks.remove(sink)
+                error_message = f"{sink.name} result sink could not be opened and is disabled: {e}"
+                self.logger.error(error_message, extra={"function": "start", "file": "result_sink.py", "sink": sink.name})
+                self.display.print_error(f"❌ {error_message}")
+                continue
+            queue = asyncio.Queue(maxsize=sink.queue_size)
+            self._queues[sink] = queue
+            SINK_QUEUE_DEPTH.labels(sink.name).set_function(queue.qsize)
+            self._consumers.append(asyncio.create_task(self._consume(sink, queue)))
+        self.logger.info(f"Result fan-out started for: {', '.join(sink.name for sink in self.sinks)}")
+
+    async def publish(self, batch):
+        """
+        Hands the batch to every sink. Only waits when a sink's queue is full.
+
+        Args:
+            batch (list[dict]): Processed tasks.
+        """
+        if not batch:
+            return
+        for queue in self._queues.values():
+            await queue.put(batch)
+
+    async def _consume(self, sink, queue):
+        loop = asyncio.get_running_loop()
+        buffer = []
+        closing = False
+        # Tampondaki en eski sonuç flush_interval'dan fazla beklemez (sürekli akışta da)
+        deadline = None
+        while not closing:
+            timeout = self.flush_interval if deadline is None else max(deadline - loop.time(), 0)
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                item = None
+            if item is _CLOSE:
+                closing = True
+            elif item is not None:
+                if not buffer:
+                    deadline = loop.time() + self.flush_interval
+                buffer.extend(item)
+
+            expired = deadline is not None and loop.time() >= deadline
+            while len(buffer) >= sink.buffer_size or (buffer and (expired or closing)):
+                batch = buffer[:sink.buffer_size]
+                del buffer[:sink.buffer_size]
+                await self._write(sink, batch)
+            if not buffer:
+                deadline = None
+
+    async def _write(self, sink, batch):
+        try:
+            started_ns = time.time_ns()
+            with SINK_WRITE_SECONDS.labels(sink.name).time():
+                await sink.write_batch(batch)
+            sink.written_count += len(batch)
+            SINK_WRITTEN.labels(sink.name).inc(len(batch))
+            if self.tracer.enabled:
+                self._record_spans(sink, batch, started_ns, time.time_ns())
+        except Exception as e:
+            sink.failed_batches += 1
+            SINK_FAILED_BATCHES.labels(sink.name).inc()
+            error_message = f"{sink.name} result sink failed to write {len(batch)} results: {e}"
+            self.logger.error(error_message, extra={"function": "_write", "file": "result_sink.py", "sink": sink.name})
+            self.display.print_error(f"❌ {error_message}")
+
+    def _record_spans(self, sink, batch, started_ns, finished_ns):
+        """
+        Records buffer_wait (resolved until the sink started writing) and persist spans
+        for the sampled tasks of a written batch.
+        """
+        attributes = {"db.system": sink.name, "batch.size": len(batch)}
+        for task in batch:
+            trace = task.get("_trace")
+            if trace is not None:
+                self.tracer.record(trace, "buffer_wait", trace.enqueued_at_ns, started_ns, attributes)
+                self.tracer.record(trace, "persist", started_ns, finished_ns, attributes)
+
+    async def close(self):
+        """
+        Drains every queue, flushes and closes the sinks.
+        """
+        if not self._started:
+            return
+        self._started = False
+        for queue in self._queues.values():
+            await queue.put(_CLOSE)
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        for sink in self.sinks:
+            try:
+                await sink.flush()
+                await sink.close()
+            except Exception as e:
+                self.logger.error(f"Closing {sink.name} result sink failed: {e}", extra={"function": "close", "file": "result_sink.py", "sink": sink.name})
+            self.logger.info(f"{sink.name} result sink wrote {sink.written_count} results ({sink.failed_batches} failed batches).")
+        self._queues.clear()
+        self._consumers = []
+
+
+def build_result_sinks(config, db_manager):
+    """
+    Builds the sinks for every enabled backend.
+
+    SQLite is always written. PostgreSQL is fed directly only with
+    postgresql.sync_mode == "sink"; by default it is kept up to date by the watermark sync.
+
+    Args:
+        config: Application configuration.
+        db_manager: Connected DBManager.
+
+    Returns:
+        list[ResultSink]: Sinks to pass to ResultFanout.
+    """
+    queue_size = config.get("results", {}).get("queue_size", 8)
+    sinks = [
+        SQLiteResultSink(db_manager.sqlite_db, buffer_size=config["sqlite"].get("bulk_update_count", 500), queue_size=queue_size)
+    ]
+    if "PostgreSQL" in db_manager.active_connections and config["postgresql"].get("sync_mode") == "sink":
+        sinks.append(PostgresResultSink(config, db_manager.sqlite_db, buffer_size=config["postgresql"].get("sync_batch_size", 1000), queue_size=queue_size))
+    if "MongoDB" in db_manager.active_connections:
+        sinks.append(MongoResultSink(db_manager.mongodb, queue_size=queue_size))
+    return sinks
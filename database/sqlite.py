@@ -96,7 +96,6 @@ class Database:
             with sqlite3.connect(self.db_path) as conn:  # Her process için yeni bağlantı
                 cursor = conn.cursor()
                 for task in tasks:
-                    self.display.print_success(f"Updating {task['ip']} with status {task['status']} and result {task['result']}")
                     cursor.execute(
                         "UPDATE ip_check SET status = ?, result = ? , last_checked = DATETIME('now') WHERE ip_address = ?",
                         (task["status"], task["result"],task["ip"])
@@ -112,7 +111,7 @@ class Database:
         """
         Async wrapper for bulk updating tasks using ProcessPoolExecutor.
         """
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         await loop.run_in_executor(self.executor, self.bulk_update_tasks_sync, tasks)
 
     async def async_bulk_update_tasks(self, tasks):
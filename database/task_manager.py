@@ -1,7 +1,10 @@
+import time
 import sqlite3
-from datetime import date, datetime
+from datetime import date, datetime, timezone
 from utils.display import Display
 from logB.logger import Logger
+from utils.metrics import DB_WRITE_SECONDS, DB_ROWS_WRITTEN, DB_WRITE_ERRORS
+from utils.profiler import profiled
 
 
 class TaskManager:
@@ -40,6 +43,24 @@ class TaskManager:
                     last_updated DATETIME DEFAULT CURRENT_TIMESTAMP
                 )
             ''')
+            self.cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_ip_check_last_updated ON ip_check (last_updated, id)"
+            )
+            self.ensure_lease_columns()
+            # Sonuç güncellemesi (ip, dns) ile, kiralama (check_date, status) ile arar
+            self.cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_ip_check_lookup ON ip_check (ip_address, dns, check_date)"
+            )
+            self.cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_ip_check_claim ON ip_check (check_date, status, id)"
+            )
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    name TEXT PRIMARY KEY,
+                    last_updated TEXT NOT NULL,
+                    last_id INTEGER NOT NULL
+                )
+            ''')
             self.conn.commit()
             self.logger.info("Table initialized successfully.")
             self.display.print_success("Table initialized successfully.")
@@ -47,6 +68,17 @@ class TaskManager:
             self.logger.error(f"Error initializing table: {e}", extra={"function": "initialize", "file": "task_manager.py"})  # extra bilgisi eklendi
             self.display.print_error(f"Error initializing table: {e}")
 
+    def ensure_lease_columns(self):
+        """
+        Adds the lease columns used by the SQLite work queue to tables created before them.
+        """
+        self.cursor.execute("PRAGMA table_info(ip_check)")
+        columns = {row[1] for row in self.cursor.fetchall()}
+        if "lease_owner" not in columns:
+            self.cursor.execute("ALTER TABLE ip_check ADD COLUMN lease_owner TEXT")
+        if "lease_expires" not in columns:
+            self.cursor.execute("ALTER TABLE ip_check ADD COLUMN lease_expires REAL")
+
     def has_today_records(self):
         """
         Checks if there are records for today's date.
@@ -87,6 +119,73 @@ class TaskManager:
             self.logger.error(f"Error inserting tasks: {e}", extra={"function": "insert_tasks", "file": "task_manager.py", "tasks": tasks})  # extra bilgisi eklendi
             self.display.print_error(f"Error inserting tasks: {e}")
 
+    def delete_pending_tasks(self, tasks, check_date=None):
+        """
+        Deletes pending tasks of a day, e.g. the pairs handed over to another shard.
+
+        Args:
+            tasks (list): (ip, dns) pairs to delete.
+            check_date (str, optional): Day of the tasks (default: today).
+
+        Returns:
+            int: Number of deleted rows.
+        """
+        try:
+            self.cursor.executemany(
+                "DELETE FROM ip_check WHERE ip_address = ? AND dns = ? AND check_date = ? AND status = 'pending'",
+                [(ip, dns, check_date or self.today) for ip, dns in tasks]
+            )
+            self.conn.commit()
+            deleted = self.cursor.rowcount
+            self.logger.info(f"Deleted {deleted} pending tasks.")
+            return deleted
+        except sqlite3.Error as e:
+            self.logger.error(f"Error deleting pending tasks: {e}", extra={"function": "delete_pending_tasks", "file": "task_manager.py"})
+            self.display.print_error(f"Error deleting pending tasks: {e}")
+            return 0
+
+    def fetch_task_ids(self, check_date):
+        """
+        Returns:
+            dict: Row id of every task of a check date, keyed by (ip, dns).
+        """
+        try:
+            self.cursor.execute(
+                "SELECT id, ip_address, dns FROM ip_check WHERE check_date = ?", (check_date,)
+            )
+            return {(ip, dns): task_id for task_id, ip, dns in self.cursor.fetchall()}
+        except sqlite3.Error as e:
+            self.logger.error(f"Error fetching task ids for date {check_date}: {e}", extra={"function": "fetch_task_ids", "file": "task_manager.py"})
+            self.display.print_error(f"Error fetching task ids for date {check_date}: {e}")
+            return {}
+
+    def create_tasks(self, tasks, check_date):
+        """
+        Inserts pending rows for (ip, dns) pairs of a check date in one transaction.
+
+        Args:
+            tasks (list): (ip, dns) pairs without a row on that date.
+            check_date (str): Check date of the rows.
+
+        Returns:
+            dict: Row id of each inserted task, keyed by (ip, dns).
+        """
+        task_ids = {}
+        try:
+            with self.conn:
+                for ip, dns in tasks:
+                    self.cursor.execute(
+                        "INSERT INTO ip_check (ip_address, dns, status, check_date) VALUES (?, ?, 'pending', ?) RETURNING id",
+                        (ip, dns, check_date)
+                    )
+                    task_ids[(ip, dns)] = self.cursor.fetchone()[0]
+            self.logger.info(f"Created {len(task_ids)} tasks for {check_date}.")
+            return task_ids
+        except sqlite3.Error as e:
+            self.logger.error(f"Error creating tasks for {check_date}: {e}", extra={"function": "create_tasks", "file": "task_manager.py"})
+            self.display.print_error(f"Error creating tasks for {check_date}: {e}")
+            return {}
+
     def fetch_pending_tasks(self):
         """
         Fetches all pending tasks from the SQLite database.
@@ -177,33 +276,149 @@ class TaskManager:
             self.logger.error(f"Error closing SQLite connection: {e}", extra={"function": "close_connection", "file": "task_manager.py"})  # extra bilgisi eklendi
             self.display.print_error(f"Error closing SQLite connection: {e}")
 
+    @profiled("sqlite.bulk_update")
     def bulk_update_tasks(self, tasks):
         """
         Bulk updates the status of tasks in the SQLite database.
 
         Args:
-            tasks (list): A list of task dictionaries with 'ip', 'dns', and 'status' keys.
+            tasks (list): A list of task dictionaries with 'ip', 'dns', 'check_date' and 'status' keys.
+                Tasks claimed from the lease queue also carry the row 'id' and are updated by it.
 
         Example:
             tasks = [
-                {"ip": "192.168.1.1", "dns": "example.com", "status": "completed"},
-                {"ip": "192.168.1.2", "dns": "test.com", "status": "failed"},
+                {"ip": "192.168.1.1", "dns": "example.com", "check_date": "2024-01-01", "status": "completed"},
+                {"ip": "192.168.1.2", "dns": "test.com", "check_date": "2024-01-01", "status": "failed"},
             ]
         """
+        # Yalnızca görevin kendi gününün satırı güncellenir; önceki günlerin sonuçları korunur
         query = """
         UPDATE ip_check
         SET status = :status , result = :result , last_updated = CURRENT_TIMESTAMP
-        WHERE ip_address = :ip AND dns = :dns
+        WHERE ip_address = :ip AND dns = :dns AND check_date = :check_date
+        """
+        # Kiralanmış görevler satır id'si taşır; tamamlanınca kira da bırakılır
+        query_by_id = """
+        UPDATE ip_check
+        SET status = :status , result = :result , last_updated = CURRENT_TIMESTAMP,
+            lease_owner = NULL , lease_expires = NULL
+        WHERE id = :id
         """
+        leased = [task for task in tasks if task.get("id") is not None]
         try:
-            with self.conn:
-                self.cursor.executemany(query, tasks)
+            with DB_WRITE_SECONDS.labels("sqlite", "bulk_update").time(), self.conn:
+                if leased:
+                    self.cursor.executemany(query_by_id, leased)
+                if len(leased) < len(tasks):
+                    self.cursor.executemany(query, [
+                        # check_date taşımayan eski kuyruk mesajları bugünün satırını günceller
+                        task if task.get("check_date") else dict(task, check_date=self.today)
+                        for task in tasks if task.get("id") is None
+                    ])
+            DB_ROWS_WRITTEN.labels("sqlite").inc(len(tasks))
             self.logger.info(f"Bulk updated {len(tasks)} tasks successfully.")
             self.display.print_success(f"Bulk updated {len(tasks)} tasks successfully.")
         except sqlite3.Error as e:
+            DB_WRITE_ERRORS.labels("sqlite", "bulk_update").inc()
             self.logger.error(f"Failed to bulk update tasks: {e}", extra={"function": "bulk_update_tasks", "file": "task_manager.py", "tasks": tasks})  # extra bilgisi eklendi
             self.display.print_error(f"Failed to bulk update tasks: {e}")
 
+    @profiled("sqlite.claim_tasks")
+    def claim_tasks(self, owner, limit, lease_seconds, check_date=None, after_id=0):
+        """
+        Leases up to `limit` pending tasks of a check date to `owner` in one statement.
+        Unleased rows and rows whose lease has expired are both claimable.
+
+        Args:
+            owner (str): Lease owner (host, process and instance).
+            limit (int): Maximum number of tasks to claim.
+            lease_seconds (float): Lease duration.
+            check_date (str, optional): Check date of the tasks (default: today).
+            after_id (int): Only rows with a larger id; lets a caller continue after its
+                previous claim instead of re-scanning the rows still leased before it.
+
+        Returns:
+            list[dict]: Claimed tasks with 'id', 'ip', 'dns' and 'check_date'.
+        """
+        now = time.time()
+        try:
+            with self.conn:
+                self.cursor.execute(
+                    """
+                    UPDATE ip_check SET lease_owner = ?, lease_expires = ?
+                    WHERE id IN (
+                        SELECT id FROM ip_check
+                        WHERE check_date = ? AND status = 'pending' AND id > ?
+                          AND (lease_expires IS NULL OR lease_expires < ?)
+                        ORDER BY id
+                        LIMIT ?
+                    )
+                    RETURNING id, ip_address, dns, check_date
+                    """,
+                    (owner, now + lease_seconds, check_date or self.today, after_id, now, limit)
+                )
+                rows = self.cursor.fetchall()
+            return [{"id": row[0], "ip": row[1], "dns": row[2], "check_date": row[3]} for row in rows]
+        except sqlite3.Error as e:
+            self.logger.error(f"Error claiming tasks: {e}", extra={"function": "claim_tasks", "file": "task_manager.py", "owner": owner})
+            self.display.print_error(f"❌ Error claiming tasks: {e}")
+            raise
+
+    def count_claimable_tasks(self, check_date=None):
+        """
+        Returns:
+            int: Pending tasks of the check date that are unleased or whose lease has expired.
+        """
+        self.cursor.execute(
+            """
+            SELECT COUNT(*) FROM ip_check
+            WHERE check_date = ? AND status = 'pending' AND (lease_expires IS NULL OR lease_expires < ?)
+            """,
+            (check_date or self.today, time.time())
+        )
+        return self.cursor.fetchone()[0]
+
+    def reclaim_expired_leases(self):
+        """
+        Clears the leases of pending tasks whose owner did not finish them in time
+        (crashed or stopped workers).
+
+        Returns:
+            int: Number of reclaimed tasks.
+        """
+        try:
+            with self.conn:
+                self.cursor.execute(
+                    "UPDATE ip_check SET lease_owner = NULL, lease_expires = NULL "
+                    "WHERE status = 'pending' AND lease_expires < ?",
+                    (time.time(),)
+                )
+            return self.cursor.rowcount
+        except sqlite3.Error as e:
+            self.logger.error(f"Error reclaiming expired leases: {e}", extra={"function": "reclaim_expired_leases", "file": "task_manager.py"})
+            self.display.print_error(f"❌ Error reclaiming expired leases: {e}")
+            raise
+
+    def release_leases(self, owner):
+        """
+        Releases the leases an owner still holds on unfinished tasks.
+
+        Returns:
+            int: Number of released tasks.
+        """
+        try:
+            with self.conn:
+                self.cursor.execute(
+                    "UPDATE ip_check SET lease_owner = NULL, lease_expires = NULL "
+                    "WHERE lease_owner = ? AND status = 'pending'",
+                    (owner,)
+                )
+            return self.cursor.rowcount
+        except sqlite3.Error as e:
+            self.logger.error(f"Error releasing leases: {e}", extra={"function": "release_leases", "file": "task_manager.py", "owner": owner})
+            self.display.print_error(f"❌ Error releasing leases: {e}")
+            raise
+
     def fetch_tasks_by_latest_date(self, result="listed"):
         """
         Fetches tasks with a specific status for the latest check_date.
@@ -267,3 +482,107 @@ class TaskManager:
             self.logger.error(f"Error fetching latest check_date: {e}", extra={"function": "get_latest_check_date", "file": "task_manager.py"})
             self.display.print_error(f"❌ Error fetching latest check_date: {e}")
             raise
+
+    def settled_cutoff(self):
+        """
+        Returns the current second in the format of SQLite's CURRENT_TIMESTAMP (UTC).
+
+        last_updated has one-second resolution, so a row finishing later in the current
+        second may get a lower id than one already seen. Rows are exported only once
+        their second has passed, which keeps the (last_updated, id) watermark gap-free.
+
+        Returns:
+            str: 'YYYY-MM-DD HH:MM:SS'; rows with last_updated before it are settled.
+        """
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+    def fetch_tasks_updated_since(self, last_updated, last_id, limit, before=None):
+        """
+        Fetches finished tasks whose (last_updated, id) is past the given watermark.
+
+        Args:
+            last_updated (str): Watermark timestamp ('' to start from the beginning).
+            last_id (int): Watermark row id used to break timestamp ties.
+            limit (int): Maximum number of rows to return.
+            before (str, optional): Only rows with last_updated strictly before this
+                timestamp (see settled_cutoff).
+
+        Returns:
+            list[dict]: Tasks ordered by (last_updated, id), including their row id.
+        """
+        try:
+            self.cursor.execute(
+                """
+                SELECT id, ip_address, dns, status, result, check_date, last_updated FROM ip_check
+                WHERE status != 'pending' AND (last_updated, id) > (?, ?)
+                  AND (? IS NULL OR last_updated < ?)
+                ORDER BY last_updated, id
+                LIMIT ?
+                """,
+                (last_updated, last_id, before, before, limit)
+            )
+            return [
+                {
+                    "id": row[0],
+                    "ip": row[1],
+                    "dns": row[2],
+                    "status": row[3],
+                    "result": row[4],
+                    "check_date": row[5],
+                    "last_updated": row[6]
+                }
+                for row in self.cursor.fetchall()
+            ]
+        except sqlite3.Error as e:
+            self.logger.error(f"Error fetching tasks updated since watermark: {e}", extra={"function": "fetch_tasks_updated_since", "file": "task_manager.py", "last_updated": last_updated, "last_id": last_id})
+            self.display.print_error(f"❌ Error fetching tasks updated since watermark: {e}")
+            raise
+
+    def get_sync_watermark(self, name):
+        """
+        Returns the persisted export watermark for the given sync target.
+
+        Args:
+            name (str): Name of the sync target (e.g. 'postgresql').
+
+        Returns:
+            tuple: (last_updated, last_id), ('', 0) when nothing was exported yet.
+        """
+        self.cursor.execute("SELECT last_updated, last_id FROM sync_state WHERE name = ?", (name,))
+        row = self.cursor.fetchone()
+        return (row[0], row[1]) if row else ("", 0)
+
+    def get_latest_watermark(self):
+        """
+        Returns the (last_updated, id) of the most recently finished task.
+
+        Returns:
+            tuple: (last_updated, id), ('', 0) when no task has finished yet.
+        """
+        self.cursor.execute(
+            "SELECT last_updated, id FROM ip_check WHERE status != 'pending' ORDER BY last_updated DESC, id DESC LIMIT 1"
+        )
+        row = self.cursor.fetchone()
+        return (row[0], row[1]) if row else ("", 0)
+
+    def set_sync_watermark(self, name, last_updated, last_id):
+        """
+        Persists the export watermark for the given sync target.
+
+        Args:
+            name (str): Name of the sync target.
+            last_updated (str): Timestamp of the last exported row.
+            last_id (int): Id of the last exported row.
+        """
+        try:
+            with self.conn:
+                self.cursor.execute(
+                    """
+                    INSERT INTO sync_state (name, last_updated, last_id) VALUES (?, ?, ?)
+                    ON CONFLICT(name) DO UPDATE SET last_updated = excluded.last_updated, last_id = excluded.last_id
+                    """,
+                    (name, last_updated, last_id)
+                )
+        except sqlite3.Error as e:
+            self.logger.error(f"Error saving sync watermark: {e}", extra={"function": "set_sync_watermark", "file": "task_manager.py", "name": name})
+            raise
@@ -3,8 +3,8 @@ from .logger import Logger
 from .log_levels import DEBUG, INFO, WARNING, ERROR, CRITICAL
 from .log_formatter import format_log
 from .log_rotator import manage_logs
-from .access_control import check_access, log_access, request_access
-from .log_security import mask_data, encrypt_data, decrypt_data
+from .access_control import check_access, log_access, request_access, query_access_logs
+from .log_security import mask_data, encrypt_data, decrypt_data, read_encrypted_log, decrypt_log_file
 
 # Yeni fonksiyon: init_logging
 def init_logging(log_file_path='app.log'):
@@ -25,8 +25,11 @@ __all__ = [
     "check_access",
     "log_access",
     "request_access",
+    "query_access_logs",
     "mask_data",
     "encrypt_data",
     "decrypt_data",
+    "read_encrypted_log",
+    "decrypt_log_file",
     "init_logging"  # init_logging fonksiyonunu da dışa aktarıyoruz
 ]
@@ -1,17 +1,28 @@
 # access_control.py
 
-from datetime import datetime
+from datetime import datetime, timedelta
+import atexit
+import bisect
+import hashlib
 import json
 import os
+import struct
+import threading
+import time
+
+from logB.config import LOG_DIRECTORY, LOG_ROTATION_SIZE, LOG_RETENTION_DAYS
+
+try:
+    import fcntl  # POSIX dosya kilidi
+except ImportError:  # Windows: yalnızca süreç içi kilit kullanılır
+    fcntl = None
 
 # Access control settings
-ACCESS_LOG_FILE = os.path.join(os.getcwd(), "logs", "access_logs.json")
+ACCESS_LOG_FILE = os.path.join(LOG_DIRECTORY, "access_logs.jsonl")
+LEGACY_ACCESS_LOG_FILE = os.path.join(LOG_DIRECTORY, "access_logs.json")
 
-# Ensure the access log file exists
-os.makedirs(os.path.dirname(ACCESS_LOG_FILE), exist_ok=True)
-if not os.path.exists(ACCESS_LOG_FILE):
-    with open(ACCESS_LOG_FILE, 'w') as f:
-        json.dump([], f)
+# Sidecar index record: timestamp (epoch seconds), byte offset in the segment, user id hash
+INDEX_RECORD = struct.Struct("<dQQ")
 
 # Role-based access control (RBAC) settings
 ROLE_PERMISSIONS = {
@@ -20,14 +31,259 @@ ROLE_PERMISSIONS = {
     "user": []  # Basic users have no access to logs
 }
 
+
+def _user_hash(user_id):
+    return int.from_bytes(hashlib.blake2b(str(user_id).encode(), digest_size=8).digest(), "little")
+
+
+def _index_path(segment_path):
+    return segment_path + ".idx"
+
+
+class AccessLog:
+    """
+    Append-only JSONL access log with a fixed-width sidecar index.
+
+    Each entry is appended as one line while holding an exclusive lock on the segment,
+    and a (timestamp, offset, user hash) record is appended to `<segment>.idx`. Queries
+    binary-search the index by time and seek straight to matching lines. The active
+    segment is rotated past LOG_ROTATION_SIZE and rotated segments older than
+    LOG_RETENTION_DAYS are deleted. fsync is batched: every `fsync_every` entries or
+    `fsync_interval` seconds, whichever comes first.
+    """
+
+    def __init__(self, path=ACCESS_LOG_FILE, rotation_size=LOG_ROTATION_SIZE, retention_days=LOG_RETENTION_DAYS,
+                 fsync_every=64, fsync_interval=1.0):
+        self.path = path
+        self.rotation_size = rotation_size
+        self.retention_days = retention_days
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._data = None
+        self._index = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+    def _open(self):
+        self._data = open(self.path, "ab")
+        self._index = open(_index_path(self.path), "ab")
+
+    def _close_files(self):
+        for f in (self._data, self._index):
+            if f is not None:
+                f.close()
+        self._data = self._index = None
+
+    def _lock_segment(self):
+        """
+        Locks the active segment, reopening it if another process rotated it meanwhile.
+        """
+        while True:
+            if self._data is None:
+                self._open()
+            if fcntl is None:
+                return
+            fcntl.flock(self._data.fileno(), fcntl.LOCK_EX)
+            try:
+                if os.fstat(self._data.fileno()).st_ino == os.stat(self.path).st_ino:
+                    return
+            except FileNotFoundError:
+                pass
+            fcntl.flock(self._data.fileno(), fcntl.LOCK_UN)
+            self._close_files()
+
+    def _unlock_segment(self):
+        if fcntl is not None and self._data is not None:
+            fcntl.flock(self._data.fileno(), fcntl.LOCK_UN)
+
+    def append(self, entry, created=None):
+        """
+        Appends one entry.
+
+        Args:
+            entry (dict): Access entry; must contain 'user_id'. 'timestamp' is added if missing.
+            created (float, optional): Epoch timestamp of the entry. Defaults to now.
+        """
+        with self._lock:
+            self._lock_segment()
+            try:
+                if created is None:
+                    created = time.time()
+                entry.setdefault("timestamp", datetime.utcfromtimestamp(created).isoformat() + "Z")
+                line = (json.dumps(entry) + "\n").encode()
+                offset = self._data.seek(0, os.SEEK_END)
+                self._data.write(line)
+                self._index.write(INDEX_RECORD.pack(created, offset, _user_hash(entry.get("user_id"))))
+                self._data.flush()
+                self._index.flush()
+                self._unsynced += 1
+                if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+                    self._sync()
+                if offset + len(line) >= self.rotation_size:
+                    self._rotate()
+            finally:
+                self._unlock_segment()
+
+    def _sync(self):
+        if self._data is None:
+            return
+        os.fsync(self._data.fileno())
+        os.fsync(self._index.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def flush(self):
+        """
+        fsyncs entries that are only in the OS cache.
+        """
+        with self._lock:
+            if self._unsynced:
+                self._sync()
+
+    def close(self):
+        """
+        Flushes and closes the active segment.
+        """
+        self.flush()
+        with self._lock:
+            self._close_files()
+
+    def _rotate(self):
+        # Kilit altında çağrılır: segment ve indeksi zaman damgalı adlarla arşivler
+        self._sync()
+        base, ext = os.path.splitext(self.path)
+        archived = f"{base}.{datetime.now().strftime('%Y%m%d%H%M%S%f')}{ext}"
+        os.rename(_index_path(self.path), _index_path(archived))
+        os.rename(self.path, archived)
+        self._unlock_segment()
+        self._close_files()
+        self.delete_expired_segments()
+
+    def segments(self):
+        """
+        Returns the segment paths from oldest to newest, the active segment last.
+        """
+        directory = os.path.dirname(self.path)
+        base, ext = os.path.splitext(os.path.basename(self.path))
+        rotated = sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.startswith(base + ".") and name.endswith(ext) and name != os.path.basename(self.path)
+        )
+        if os.path.exists(self.path):
+            rotated.append(self.path)
+        return rotated
+
+    def delete_expired_segments(self):
+        """
+        Deletes rotated segments whose newest entry is older than the retention period.
+        """
+        cutoff = time.time() - timedelta(days=self.retention_days).total_seconds()
+        for segment in self.segments():
+            if segment == self.path:
+                continue
+            index = _read_index(_index_path(segment))
+            newest = index[-1][0] if index else os.path.getmtime(segment)
+            if newest < cutoff:
+                for path in (segment, _index_path(segment)):
+                    if os.path.exists(path):
+                        os.remove(path)
+
+    def query(self, start=None, end=None, user_id=None):
+        """
+        Yields entries in [start, end) for an optional user, using the sidecar index.
+
+        Args:
+            start (datetime | float, optional): Inclusive lower bound (naive datetimes are UTC).
+            end (datetime | float, optional): Exclusive upper bound.
+            user_id (str, optional): Only return this user's entries.
+
+        Yields:
+            dict: Access entries in time order.
+        """
+        start_ts = _to_epoch(start, float("-inf"))
+        end_ts = _to_epoch(end, float("inf"))
+        user_hash = _user_hash(user_id) if user_id is not None else None
+        for segment in self.segments():
+            index = _read_index(_index_path(segment))
+            if not index or index[-1][0] < start_ts or index[0][0] >= end_ts:
+                continue
+            position = bisect.bisect_left(index, (start_ts,))
+            with open(segment, "rb") as f:
+                for created, offset, entry_user in index[position:]:
+                    if created >= end_ts:
+                        break
+                    if user_hash is not None and entry_user != user_hash:
+                        continue
+                    f.seek(offset)
+                    entry = json.loads(f.readline())
+                    if user_id is None or entry.get("user_id") == user_id:
+                        yield entry
+
+    def migrate_legacy(self, legacy_path=LEGACY_ACCESS_LOG_FILE):
+        """
+        Moves entries of the old JSON-array access log into the JSONL log and renames the old file.
+        """
+        if not os.path.exists(legacy_path):
+            return 0
+        try:
+            with open(legacy_path) as f:
+                entries = json.load(f)
+        except (ValueError, OSError):
+            entries = []
+        for entry in entries:
+            self.append(entry, created=_to_epoch(entry.get("timestamp"), time.time()))
+        os.replace(legacy_path, legacy_path + ".migrated")
+        return len(entries)
+
+
+def _read_index(index_path):
+    try:
+        with open(index_path, "rb") as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return []
+    # Yarım kalmış son kayıt (ör. çökme) yok sayılır
+    usable = len(raw) - len(raw) % INDEX_RECORD.size
+    return list(INDEX_RECORD.iter_unpack(raw[:usable]))
+
+
+def _to_epoch(value, default):
+    if value is None:
+        return default
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.rstrip("Z"))
+    return (value - datetime(1970, 1, 1)).total_seconds() if value.tzinfo is None else value.timestamp()
+
+
+_access_log = None
+_access_log_lock = threading.Lock()
+
+
+def get_access_log():
+    """
+    Returns the process-wide AccessLog, migrating the legacy JSON access log on first use.
+    """
+    global _access_log
+    with _access_log_lock:
+        if _access_log is None:
+            _access_log = AccessLog()
+            _access_log.migrate_legacy()
+            atexit.register(_access_log.close)
+        return _access_log
+
+
 def check_access(user_role, required_permission):
     """
     Checks if a user role has the required permission.
-    
+
     Args:
         user_role (str): The role of the user (e.g., 'admin', 'auditor').
         required_permission (str): The permission required (e.g., 'read', 'write', 'delete').
-    
+
     Returns:
         bool: True if the user has the required permission, False otherwise.
     """
@@ -44,22 +300,31 @@ def log_access(user_id, action, resource="log file"):
         resource (str): The resource being accessed (default: "log file").
     """
     access_entry = {
-        "timestamp": datetime.utcnow().isoformat() + "Z",
         "user_id": user_id,
         "action": action,
         "resource": resource
     }
     # Append the access entry to the access log file
-    with open(ACCESS_LOG_FILE, 'r+') as f:
-        access_log = json.load(f)
-        access_log.append(access_entry)
-        f.seek(0)
-        json.dump(access_log, f, indent=4)
+    get_access_log().append(access_entry)
+
+def query_access_logs(start=None, end=None, user_id=None):
+    """
+    Returns access entries in a time range, optionally for one user.
+
+    Args:
+        start (datetime, optional): Inclusive lower bound (UTC).
+        end (datetime, optional): Exclusive upper bound (UTC).
+        user_id (str, optional): Only return this user's entries.
+
+    Returns:
+        list[dict]: Matching access entries in time order.
+    """
+    return list(get_access_log().query(start, end, user_id))
 
 def request_access(user_id, user_role, action):
     """
     Handles an access request by checking permissions and logging the attempt.
-    
+
     Args:
         user_id (str): The ID of the user requesting access.
         user_role (str): The role of the user (e.g., 'admin', 'auditor').
@@ -79,8 +344,9 @@ def request_access(user_id, user_role, action):
 if __name__ == "__main__":
     # Test cases
     user_id = "user_123"
-    
+
     print(request_access(user_id, "admin", "read"))       # Expected: Access granted
     print(request_access(user_id, "auditor", "write"))    # Expected: Access denied
     print(request_access(user_id, "user", "read"))        # Expected: Access denied
     print(request_access(user_id, "admin", "delete"))     # Expected: Access granted
+    print(query_access_logs(user_id=user_id))
@@ -11,6 +11,10 @@ LOG_FILE_PATH = os.path.join(LOG_DIRECTORY, "app_logs.json")
 LOG_ROTATION_SIZE = 10 * 1024 * 1024  # Log dosyası 10 MB'a ulaştığında döndürme işlemi yapılır
 LOG_RETENTION_DAYS = 30  # Log dosyaları 30 gün boyunca saklanır
 
+# Şifreli loglama (encrypt=True): kayıtlar '<log>.enc' dosyasına bloklar halinde şifrelenerek yazılır
+ENCRYPTED_LOG_BLOCK_SIZE = 256  # Bir blokta şifrelenen kayıt sayısı
+ENCRYPTED_LOG_FLUSH_INTERVAL = 1.0  # Bekleyen kayıtlar en geç bu kadar saniye sonra yazılır (listener zamanlayıcısı)
+
 # Security configuration (Encryption key for sensitive data in logs)
 # Fernet şifrelemesi için 32 baytlık URL güvenli base64 kodlanmış bir anahtar gereklidir.
 # Aşağıdaki anahtarı bir kere oluşturup sabit olarak kullanabilirsiniz.
@@ -1,28 +1,89 @@
 import json
+import logging
 from datetime import datetime
 
-def format_log(level, message, details=None, extra=None):  # extra parametresini ekledik
+try:
+    import orjson  # Opsiyonel: kuruluysa JSON serileştirme için kullanılır
+except ImportError:
+    orjson = None
+
+
+def dumps(log_entry):
     """
-    Formats a log entry as a JSON string.
+    Serializes a log entry to a single-line JSON string, using orjson when it is installed.
+
+    Values that are not JSON serializable are written with str().
 
     Args:
-        level (str): The severity level of the log (e.g., DEBUG, INFO, WARNING, ERROR, CRITICAL).
+        log_entry (dict): The log entry.
+
+    Returns:
+        str: The JSON string.
+    """
+    if orjson is not None:
+        return orjson.dumps(log_entry, default=str).decode()
+    return json.dumps(log_entry, default=str)
+
+
+def build_log_entry(level, message, details=None, extra=None, created=None):
+    """
+    Builds the dictionary of a log entry.
+
+    Args:
+        level (str): The severity level of the log.
         message (str): The main log message.
         details (dict, optional): Additional context or details for the log message.
         extra (dict, optional): Extra key-value pairs to include in the log entry.
+        created (float, optional): POSIX timestamp of the event. Defaults to now.
 
     Returns:
-        str: A JSON string representing the formatted log entry.
+        dict: The log entry.
     """
+    timestamp = datetime.utcnow() if created is None else datetime.utcfromtimestamp(created)
     log_entry = {
-        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "timestamp": timestamp.isoformat() + "Z",
         "level": level,
         "message": message,
         "details": details if details else {},
     }
     if extra:
-        log_entry.update(extra)  # extra parametresindeki değerleri log kaydına ekliyoruz
-    return json.dumps(log_entry)
+        log_entry.update(extra)
+    return log_entry
+
+
+def format_log(level, message, details=None, extra=None):  # extra parametresini ekledik
+    """
+    Formats a log entry as a JSON string.
+
+    Args:
+        level (str): The severity level of the log (e.g., DEBUG, INFO, WARNING, ERROR, CRITICAL).
+        message (str): The main log message.
+        details (dict, optional): Additional context or details for the log message.
+        extra (dict, optional): Extra key-value pairs to include in the log entry.
+
+    Returns:
+        str: A JSON string representing the formatted log entry.
+    """
+    return dumps(build_log_entry(level, message, details, extra))
+
+
+class JsonLineFormatter(logging.Formatter):
+    """
+    Formats a LogRecord as one JSON line. Runs in the QueueListener thread, so each
+    record is serialized exactly once and off the caller's thread.
+
+    Records carry the logB fields in `logb_details` and `logb_extra`.
+    """
+
+    def format(self, record):
+        return dumps(build_log_entry(
+            record.levelname,
+            record.getMessage(),
+            getattr(record, "logb_details", None),
+            getattr(record, "logb_extra", None),
+            created=record.created
+        ))
+
 
 # Example Usage
 if __name__ == "__main__":
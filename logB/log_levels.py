@@ -20,3 +20,9 @@ CRITICAL = "CRITICAL"
 
 # Log level order for easy comparison, if needed in filtering or threshold-based logging.
 LEVELS = [DEBUG, INFO, WARNING, ERROR, CRITICAL]
+
+# Numeric values matching the standard logging module, precomputed for fast threshold checks.
+LEVEL_VALUES = {DEBUG: 10, INFO: 20, WARNING: 30, ERROR: 40, CRITICAL: 50}
+
+# Reverse lookup: numeric value -> level name.
+LEVEL_NAMES = {value: name for name, value in LEVEL_VALUES.items()}
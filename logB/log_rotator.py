@@ -1,46 +1,345 @@
 import os
+import gzip
+import queue
 import shutil
+import atexit
+import logging
+import threading
+import time
+from collections import namedtuple
 from datetime import datetime, timedelta
-from logB.config import LOG_FILE_PATH, LOG_ROTATION_SIZE, LOG_RETENTION_DAYS
+from logging.handlers import BaseRotatingHandler
+from logB.config import (
+    LOG_FILE_PATH, LOG_ROTATION_SIZE, LOG_RETENTION_DAYS,
+    ENCRYPTED_LOG_BLOCK_SIZE, ENCRYPTED_LOG_FLUSH_INTERVAL
+)
+from logB.log_security import encrypt_block
+
+SEGMENT_TIME_FORMAT = "%Y%m%d-%H%M%S-%f"
+
+# Döndürülmüş bir log parçası: yol, oluşturulma zamanı, sıkıştırılmış mı
+Segment = namedtuple("Segment", ["path", "created", "compressed"])
+
+_STOP = object()
+
+
+class LogRotationService:
+    """
+    Background service that compresses rotated log segments and enforces retention.
+
+    Rotating handlers only rename the active file (cheap) and hand the segment to this
+    service; gzip compression and deletion happen in its thread. Segment metadata is kept
+    in memory per log file, built with one directory scan the first time a log file is
+    seen, so retention never rescans the directory.
+    """
+
+    def __init__(self, retention_days=LOG_RETENTION_DAYS, max_segments=None, compress=True):
+        """
+        Args:
+            retention_days (int): Segments older than this are deleted.
+            max_segments (int, optional): Keep at most this many segments per log file.
+            compress (bool): gzip rotated segments.
+        """
+        self.retention_days = retention_days
+        self.max_segments = max_segments
+        self.compress = compress
+        self._segments = {}
+        self._max_segments = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="log-rotation", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """
+        Finishes the pending compression jobs and stops the thread.
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def segments(self, base_path):
+        """
+        Returns the known segments of a log file, oldest first.
+        """
+        base_path = os.path.abspath(base_path)
+        with self._lock:
+            return list(self._index_for(base_path))
+
+    def set_max_segments(self, base_path, max_segments):
+        """
+        Overrides max_segments for one log file.
+        """
+        with self._lock:
+            self._max_segments[os.path.abspath(base_path)] = max_segments
+
+    def _index_for(self, base_path):
+        # Kilit altında çağrılır; dizin yalnızca ilk kez taranır
+        index = self._segments.get(base_path)
+        if index is None:
+            index = []
+            directory, name = os.path.split(base_path)
+            if os.path.isdir(directory):
+                for filename in os.listdir(directory):
+                    created = _segment_time(name, filename)
+                    if created is not None:
+                        index.append(Segment(os.path.join(directory, filename), created, filename.endswith(".gz")))
+            index.sort(key=lambda segment: segment.created)
+            self._segments[base_path] = index
+        return index
+
+    def rotate(self, source, created=None):
+        """
+        Renames `source` to a timestamped segment and queues it for compression and retention.
+
+        Args:
+            source (str): The active log file.
+            created (datetime, optional): Segment timestamp. Defaults to now.
+
+        Returns:
+            str: Path of the renamed segment.
+        """
+        created = created or datetime.now()
+        dest = segment_name(source, created)
+        if os.path.exists(source):
+            os.rename(source, dest)
+            self.add_segment(source, dest, created)
+        return dest
+
+    def add_segment(self, base_path, segment_path, created):
+        """
+        Registers a segment produced by a handler and queues its compression.
+        """
+        base_path = os.path.abspath(base_path)
+        with self._lock:
+            self._index_for(base_path).append(Segment(segment_path, created, False))
+        self.start()
+        self._queue.put(base_path)
+
+    def rotator(self, source, dest):
+        """
+        `rotator` hook for logging rotating handlers: renames and defers compression.
+        """
+        if os.path.exists(source):
+            os.rename(source, dest)
+            created = _segment_time(os.path.basename(source), os.path.basename(dest)) or datetime.now()
+            self.add_segment(source, dest, created)
+
+    def enforce_retention(self, base_path, now=None):
+        """
+        Deletes segments past retention_days / max_segments using the in-memory index.
+
+        Returns:
+            int: Number of deleted segments.
+        """
+        base_path = os.path.abspath(base_path)
+        cutoff = (now or datetime.now()) - timedelta(days=self.retention_days)
+        with self._lock:
+            index = self._index_for(base_path)
+            max_segments = self._max_segments.get(base_path, self.max_segments)
+            expired = [segment for segment in index if segment.created < cutoff]
+            if max_segments is not None and len(index) - len(expired) > max_segments:
+                kept = [segment for segment in index if segment.created >= cutoff]
+                expired += kept[:len(kept) - max_segments]
+            for segment in expired:
+                index.remove(segment)
+        for segment in expired:
+            try:
+                os.remove(segment.path)
+            except FileNotFoundError:
+                pass
+        return len(expired)
+
+    def _run(self):
+        while True:
+            base_path = self._queue.get()
+            if base_path is _STOP:
+                break
+            try:
+                if self.compress:
+                    self._compress_pending(base_path)
+                self.enforce_retention(base_path)
+            except Exception as e:
+                logging.getLogger(__name__).error(f"Log rotation failed for {base_path}: {e}")
+
+    def _compress_pending(self, base_path):
+        with self._lock:
+            pending = [segment for segment in self._index_for(base_path) if not segment.compressed]
+        for segment in pending:
+            compressed_path = segment.path + ".gz"
+            try:
+                with open(segment.path, "rb") as src, gzip.open(compressed_path + ".tmp", "wb") as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+            except FileNotFoundError:
+                continue
+            os.replace(compressed_path + ".tmp", compressed_path)
+            os.remove(segment.path)
+            with self._lock:
+                index = self._index_for(base_path)
+                if segment in index:
+                    index[index.index(segment)] = Segment(compressed_path, segment.created, True)
+
+
+class SizeAndDailyRotatingFileHandler(BaseRotatingHandler):
+    """
+    File handler that rolls over when the file passes `max_bytes` or the day changes.
+
+    Rollover only renames the file; compression and retention are done by the
+    LogRotationService thread through the rotator hook.
+    """
+
+    def __init__(self, filename, max_bytes=LOG_ROTATION_SIZE, backup_count=None, service=None, encoding=None):
+        super().__init__(filename, "a", encoding=encoding, delay=False)
+        self.max_bytes = max_bytes
+        self.service = service or get_rotation_service()
+        if backup_count:
+            self.service.set_max_segments(self.baseFilename, backup_count)
+        self.rotator = self.service.rotator
+        self.namer = lambda default_name: segment_name(self.baseFilename, datetime.now())
+        self.rollover_at = _next_midnight()
+
+    def shouldRollover(self, record):
+        if record.created >= self.rollover_at:
+            return True
+        if self.max_bytes > 0 and self.stream is not None:
+            return self.stream.tell() >= self.max_bytes
+        return False
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+            self.rotate(self.baseFilename, self.rotation_filename(self.baseFilename))
+        self.rollover_at = _next_midnight()
+        self.stream = self._open()
+
+
+class EncryptedBlockFileHandler(SizeAndDailyRotatingFileHandler):
+    """
+    Buffers formatted records and writes them as authenticated Fernet blocks, one token per line.
+
+    A block is written when `block_size` records are buffered, when a record arrives more
+    than `flush_interval` seconds after the last block, from the logging listener's timer
+    (flush_due) once the oldest buffered record is `flush_interval` seconds old, and on
+    flush/close. Segments are read back with logB.log_security.read_encrypted_log.
+    """
+
+    def __init__(self, filename, max_bytes=LOG_ROTATION_SIZE, backup_count=None, service=None,
+                 block_size=ENCRYPTED_LOG_BLOCK_SIZE, flush_interval=ENCRYPTED_LOG_FLUSH_INTERVAL):
+        super().__init__(filename, max_bytes=max_bytes, backup_count=backup_count, service=service)
+        self.block_size = block_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._last_write = time.monotonic()
+        self._buffered_since = None
+
+    def emit(self, record):
+        try:
+            if not self._buffer:
+                self._buffered_since = time.monotonic()
+            self._buffer.append(self.format(record))
+            if len(self._buffer) >= self.block_size or time.monotonic() - self._last_write >= self.flush_interval:
+                self._write_block(record)
+        except Exception:
+            self.handleError(record)
+
+    def _write_block(self, record=None):
+        if not self._buffer:
+            return
+        if self.stream is None:
+            self.stream = self._open()
+        if record is not None and self.shouldRollover(record):
+            self.doRollover()
+        self.stream.write(encrypt_block(self._buffer) + "\n")
+        self.stream.flush()
+        self._buffer.clear()
+        self._last_write = time.monotonic()
+        self._buffered_since = None
+
+    def flush_due(self, slack=0.0):
+        """
+        Writes the buffered records once the oldest of them is `flush_interval` seconds
+        old, so an idle log does not keep records in memory. Called periodically by the
+        logging listener thread.
+
+        Args:
+            slack (float): The caller's timer period; blocks due before its next tick are written now.
+        """
+        with self.lock:
+            if self._buffer and time.monotonic() - self._buffered_since >= self.flush_interval - slack:
+                self._write_block()
+
+    def flush(self):
+        with self.lock:
+            self._write_block()
+        super().flush()
+
+
+def segment_name(base_path, created):
+    return f"{base_path}.{created.strftime(SEGMENT_TIME_FORMAT)}"
+
+
+def _segment_time(base_name, filename):
+    if not filename.startswith(base_name + "."):
+        return None
+    stamp = filename[len(base_name) + 1:]
+    if stamp.endswith(".gz"):
+        stamp = stamp[:-3]
+    try:
+        return datetime.strptime(stamp, SEGMENT_TIME_FORMAT)
+    except ValueError:
+        return None
+
+
+def _next_midnight():
+    tomorrow = datetime.now().date() + timedelta(days=1)
+    return datetime(tomorrow.year, tomorrow.month, tomorrow.day).timestamp()
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_rotation_service():
+    """
+    Returns the process-wide LogRotationService, starting it on first use.
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = LogRotationService().start()
+            atexit.register(_service.stop)
+        return _service
+
 
 def rotate_log():
     """
     Rotates the log file if it exceeds the defined size limit.
-    Renames the current log file with a timestamp and creates a new empty log file.
+    The file is renamed to a timestamped segment; compression happens in the rotation service.
     """
     # Kontrol: Log dosyası belirlenen boyut sınırını aşıyor mu?
     if os.path.exists(LOG_FILE_PATH) and os.path.getsize(LOG_FILE_PATH) > LOG_ROTATION_SIZE:
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        archived_log_path = f"{LOG_FILE_PATH}.{timestamp}.backup"
-        # Mevcut log dosyasını yeniden adlandır
-        os.rename(LOG_FILE_PATH, archived_log_path)
-        # Yeni, boş bir log dosyası oluştur
-        with open(LOG_FILE_PATH, 'w') as new_log_file:
-            new_log_file.write("")
+        get_rotation_service().rotate(LOG_FILE_PATH)
 
 def delete_old_logs():
     """
-    Deletes log files that have exceeded the retention period.
-    Searches for files with the .backup extension and deletes those older than the configured retention period.
-    """
-    retention_period = timedelta(days=LOG_RETENTION_DAYS)
-    current_time = datetime.now()
-    
-    # Log dosyalarının bulunduğu dizin
-    log_dir = os.path.dirname(LOG_FILE_PATH)
-    for filename in os.listdir(log_dir):
-        # Yalnızca .backup uzantısına sahip yedek log dosyalarını kontrol et
-        if filename.startswith(os.path.basename(LOG_FILE_PATH)) and filename.endswith(".backup"):
-            file_path = os.path.join(log_dir, filename)
-            file_creation_time = datetime.fromtimestamp(os.path.getctime(file_path))
-            # Saklama süresini aşan dosyaları sil
-            if current_time - file_creation_time > retention_period:
-                os.remove(file_path)
+    Deletes log segments that have exceeded the retention period, using the service's segment index.
+    """
+    get_rotation_service().enforce_retention(LOG_FILE_PATH)
 
 def manage_logs():
     """
     Main function to manage logs: rotates the log if needed and deletes old logs.
-    This should be scheduled to run periodically to maintain log size and retention.
+    Files written through logB.Logger are rotated by their handler; this covers other writers.
     """
     rotate_log()
     delete_old_logs()
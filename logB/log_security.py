@@ -1,16 +1,80 @@
-
+import gzip
+import json
+from functools import lru_cache
 from cryptography.fernet import Fernet
 from logB.config import ENCRYPTION_KEY
 
+@lru_cache(maxsize=None)
+def get_cipher(key=ENCRYPTION_KEY):
+    """
+    Returns the cached Fernet cipher for the key; building it derives the signing and encryption keys.
+    """
+    return Fernet(key)
+
 def mask_data(data):
     # Example: Replace sensitive data with asterisks
     return str(data)[:3] + '***' if isinstance(data, str) else data
 
 def encrypt_data(data):
-    f = Fernet(ENCRYPTION_KEY)
-    return f.encrypt(data.encode()).decode()
+    return get_cipher().encrypt(data.encode()).decode()
 
 def decrypt_data(data):
-    f = Fernet(ENCRYPTION_KEY)
-    return f.decrypt(data.encode()).decode()
-    
\ No newline at end of file
+    return get_cipher().decrypt(data.encode()).decode()
+
+def encrypt_block(lines):
+    """
+    Encrypts a block of log lines into one authenticated Fernet token.
+
+    Args:
+        lines (list[str]): Log lines without trailing newlines.
+
+    Returns:
+        str: The token; one line in an encrypted log segment.
+    """
+    return get_cipher().encrypt("\n".join(lines).encode()).decode()
+
+def iter_decrypted_lines(path):
+    """
+    Streams the plaintext lines of an encrypted log segment, one block at a time.
+    gzip-compressed (rotated) segments are read transparently.
+
+    Args:
+        path (str): Path of a `.enc` segment.
+
+    Yields:
+        str: Decrypted log lines.
+
+    Raises:
+        cryptography.fernet.InvalidToken: If a block was tampered with or the key is wrong.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    cipher = get_cipher()
+    with opener(path, "rb") as f:
+        for token in f:
+            token = token.strip()
+            if token:
+                yield from cipher.decrypt(token).decode().split("\n")
+
+def read_encrypted_log(path):
+    """
+    Streams the records of an encrypted log segment.
+
+    Yields:
+        dict: Log records.
+    """
+    for line in iter_decrypted_lines(path):
+        yield json.loads(line)
+
+def decrypt_log_file(path, output_path):
+    """
+    Writes the decrypted JSON lines of an encrypted segment to `output_path`.
+
+    Returns:
+        int: Number of written lines.
+    """
+    count = 0
+    with open(output_path, "w") as out:
+        for line in iter_decrypted_lines(path):
+            out.write(line + "\n")
+            count += 1
+    return count
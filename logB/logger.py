@@ -1,119 +1,233 @@
 import os
+import queue
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
-from logB.log_formatter import format_log
-from logB.log_security import encrypt_data, mask_data
-from logB.log_levels import DEBUG, INFO, WARNING, ERROR, CRITICAL
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from logB.log_formatter import format_log, JsonLineFormatter
+from logB.log_rotator import SizeAndDailyRotatingFileHandler, EncryptedBlockFileHandler
+from logB.log_security import mask_data
+from logB.config import ENCRYPTED_LOG_FLUSH_INTERVAL
+from logB.log_levels import DEBUG, INFO, WARNING, ERROR, CRITICAL, LEVEL_VALUES, LEVEL_NAMES
+
+
+def _level_value(level):
+    if isinstance(level, int):
+        return level
+    return LEVEL_VALUES.get(level, logging.DEBUG)
+
+
+_QUEUE = queue.SimpleQueue()
+_REGISTRY_LOCK = threading.RLock()
+_PATH_LOGGERS = {}
+_FILE_HANDLERS = {}
+_LISTENER = None
+
+
+class _PathQueueHandler(QueueHandler):
+    """
+    QueueHandler that tags each record with the log file it belongs to.
+    """
+
+    def __init__(self, log_queue, log_path):
+        super().__init__(log_queue)
+        self.log_path = log_path
+
+    def prepare(self, record):
+        # Mesaj çağıranın thread'inde çözülür; JSON serileştirme listener thread'inde yapılır
+        if callable(record.msg):
+            record.msg = record.msg()
+        record = super().prepare(record)
+        record.logb_path = self.log_path
+        return record
+
+
+class _RoutingHandler(logging.Handler):
+    """
+    Runs in the QueueListener thread and hands each record to the file handler of its path.
+    """
+
+    def handle(self, record):
+        handler = _FILE_HANDLERS.get(getattr(record, "logb_path", None))
+        if handler is not None:
+            handler.handle(record)
+        return True
+
+    def emit(self, record):
+        self.handle(record)
+
+
+class _TimedQueueListener(QueueListener):
+    """
+    QueueListener that wakes up every `tick` seconds while the queue is idle and lets the
+    file handlers write out records they are holding back (EncryptedBlockFileHandler's
+    partial blocks), so their flush interval is an upper bound even without new records.
+    """
+
+    def __init__(self, log_queue, *handlers, tick=ENCRYPTED_LOG_FLUSH_INTERVAL / 4):
+        super().__init__(log_queue, *handlers)
+        self.tick = tick
+
+    def dequeue(self, block):
+        while True:
+            try:
+                return self.queue.get(block, timeout=self.tick if block else None)
+            except queue.Empty:
+                if not block:
+                    raise
+                _flush_due_handlers(self.tick)
+
+
+def _flush_due_handlers(slack):
+    for handler in list(_FILE_HANDLERS.values()):
+        flush_due = getattr(handler, "flush_due", None)
+        if flush_due is not None:
+            flush_due(slack)
+
+
+def _get_path_logger(log_file_path, max_bytes, backup_count, encrypted=False):
+    """
+    Returns the single logging.Logger bound to a log file, creating its file handler on first use.
+    Every Logger(...) for the same path shares it, so each record is written exactly once.
+    Encrypted paths get an EncryptedBlockFileHandler.
+    """
+    global _LISTENER
+    path = os.path.abspath(log_file_path)
+    with _REGISTRY_LOCK:
+        path_logger = _PATH_LOGGERS.get(path)
+        if path_logger is not None:
+            return path_logger
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handler_class = EncryptedBlockFileHandler if encrypted else SizeAndDailyRotatingFileHandler
+        handler = handler_class(path, max_bytes=max_bytes, backup_count=backup_count)
+        handler.setFormatter(JsonLineFormatter())
+        _FILE_HANDLERS[path] = handler
+
+        # Manager dışında oluşturulur: isim 'logB.logger' kalır, hiyerarşiye yayılmaz
+        path_logger = logging.Logger(__name__, logging.DEBUG)
+        path_logger.addHandler(_PathQueueHandler(_QUEUE, path))
+        _PATH_LOGGERS[path] = path_logger
+
+        if _LISTENER is None:
+            _LISTENER = _TimedQueueListener(_QUEUE, _RoutingHandler())
+            _LISTENER.start()
+        return path_logger
+
+
+def shutdown_logging():
+    """
+    Writes out queued records, stops the background listener and closes every file handler.
+    """
+    global _LISTENER
+    with _REGISTRY_LOCK:
+        if _LISTENER is not None:
+            _LISTENER.stop()
+            _LISTENER = None
+        for handler in _FILE_HANDLERS.values():
+            handler.close()
+        _FILE_HANDLERS.clear()
+        for path_logger in _PATH_LOGGERS.values():
+            path_logger.handlers.clear()
+        _PATH_LOGGERS.clear()
+
+
+atexit.register(shutdown_logging)
 
 
 class Logger:
     def __init__(self, log_file_path, level=DEBUG, max_bytes=10 * 1024 * 1024, backup_count=5):
         self.log_file_path = log_file_path
         self.level = level  # Varsayılan seviye DEBUG
+        self._threshold = _level_value(level)
+        self._max_bytes = max_bytes
+        self._backup_count = backup_count
+        self._encrypted_logger = None
 
-        # Log seviyesini ayarlıyoruz
-        self.logger = logging.getLogger(__name__)
-        self.logger.setLevel(self.level)
-
-        # RotatingFileHandler ile dosya yönetimi
-        handler = RotatingFileHandler(
-            self.log_file_path,
-            maxBytes=max_bytes,  # Maksimum boyut (10 MB)
-            backupCount=backup_count  # Yedek dosya sayısı
-        )
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
+        # Aynı dosya için tek handler; kayıtlar kuyruk üzerinden arka plan thread'inde yazılır
+        self.logger = _get_path_logger(log_file_path, max_bytes, backup_count)
 
     def set_level(self, level):
         """
         Log seviyesini ayarlar.
         Seviyeler: DEBUG, INFO, WARNING, ERROR, CRITICAL
         """
-        level_dict = {
-            'DEBUG': logging.DEBUG,
-            'INFO': logging.INFO,
-            'WARNING': logging.WARNING,
-            'ERROR': logging.ERROR,
-            'CRITICAL': logging.CRITICAL
-        }
-
-        if level in level_dict:
-            self.level = level_dict[level]
-            self.logger.setLevel(self.level)
+        if level in LEVEL_VALUES:
+            self.level = LEVEL_VALUES[level]
+            self._threshold = self.level
             print(f"Log level set to: {level}")
         else:
             print(f"Invalid log level: {level}")
 
-    def log(self, level, message, details=None, encrypt=False, extra=None):
+    def log(self, level, message, details=None, encrypt=False, extra=None, args=None):
         """
         Loglama fonksiyonu.
-        """
-        log_entry = format_log(level, message, details, extra=extra)
-
-        if encrypt:
-            log_entry = encrypt_data(log_entry)
 
-        if extra is None:
-            extra = {}
-
-        if self._should_log(level):
-            self.logger.log(self._get_numeric_level(level), log_entry, extra=extra)
+        Seviye önce kontrol edilir; kapalı seviyelerde mesaj biçimlendirilmez. JSON
+        serileştirme arka plandaki QueueListener thread'inde yapılır.
+
+        Args:
+            level (str): Log seviyesi.
+            message (str | callable): Mesaj; `args` ile %-biçimlendirilir. Callable verilirse
+                yalnızca seviye açıksa çağrılır.
+            details (dict, optional): Ek ayrıntılar.
+            encrypt (bool): Kaydı şifreler.
+            extra (dict, optional): Kayda eklenecek alanlar.
+            args (tuple, optional): Mesajın ertelenmiş biçimlendirme argümanları.
+        """
+        level_value = LEVEL_VALUES.get(level, logging.DEBUG)
+        if level_value < self._threshold:
+            return
+
+        # Şifreli kayıtlar '<log>.enc' dosyasına gider ve bloklar halinde şifrelenir
+        target = self._get_encrypted_logger() if encrypt else self.logger
+        target.log(level_value, message, *(args or ()), extra={"logb_details": details, "logb_extra": extra})
+
+    def _get_encrypted_logger(self):
+        if self._encrypted_logger is None:
+            self._encrypted_logger = _get_path_logger(
+                self.log_file_path + ".enc", self._max_bytes, self._backup_count, encrypted=True
+            )
+        return self._encrypted_logger
+
+    def is_enabled_for(self, level):
+        """
+        Verilen seviyedeki kayıtların yazılıp yazılmayacağını döndürür.
+        """
+        return LEVEL_VALUES.get(level, logging.DEBUG) >= self._threshold
 
     def _should_log(self, level):
         """
         Bu fonksiyon, verilen log seviyesinin mevcut log seviyesinden daha yüksek olup olmadığını kontrol eder.
         """
-        level_priority = {
-            'DEBUG': 10,
-            'INFO': 20,
-            'WARNING': 30,
-            'ERROR': 40,
-            'CRITICAL': 50
-        }
-
-        return level_priority[level] >= level_priority[self._get_level_name(self.level)]
+        return self.is_enabled_for(level)
 
     def _get_level_name(self, level):
         """
         Sayısal seviyeyi, log seviyesinin ismine çevirir.
         """
-        level_dict = {
-            logging.DEBUG: 'DEBUG',
-            logging.INFO: 'INFO',
-            logging.WARNING: 'WARNING',
-            logging.ERROR: 'ERROR',
-            logging.CRITICAL: 'CRITICAL'
-        }
-        return level_dict.get(level, 'DEBUG')
+        return LEVEL_NAMES.get(level, DEBUG)
 
     def _get_numeric_level(self, level_name):
         """
         İsim seviyesini sayısal seviyeye çevirir.
         """
-        level_dict = {
-            'DEBUG': logging.DEBUG,
-            'INFO': logging.INFO,
-            'WARNING': logging.WARNING,
-            'ERROR': logging.ERROR,
-            'CRITICAL': logging.CRITICAL
-        }
-        return level_dict.get(level_name, logging.DEBUG)
+        return LEVEL_VALUES.get(level_name, logging.DEBUG)
 
-    def debug(self, message, details=None, encrypt=False, extra=None):
-        self.log("DEBUG", message, details, encrypt, extra)
+    def debug(self, message, details=None, encrypt=False, extra=None, args=None):
+        self.log("DEBUG", message, details, encrypt, extra, args)
 
-    def info(self, message, details=None, encrypt=False, extra=None):
-        self.log("INFO", message, details, encrypt, extra)
+    def info(self, message, details=None, encrypt=False, extra=None, args=None):
+        self.log("INFO", message, details, encrypt, extra, args)
 
-    def warning(self, message, details=None, encrypt=False, extra=None):
-        self.log("WARNING", message, details, encrypt, extra)
+    def warning(self, message, details=None, encrypt=False, extra=None, args=None):
+        self.log("WARNING", message, details, encrypt, extra, args)
 
-    def error(self, message, details=None, encrypt=False, extra=None):
-        self.log("ERROR", message, details, encrypt, extra)
+    def error(self, message, details=None, encrypt=False, extra=None, args=None):
+        self.log("ERROR", message, details, encrypt, extra, args)
 
-    def critical(self, message, details=None, encrypt=False, extra=None):
-        self.log("CRITICAL", message, details, encrypt, extra)
+    def critical(self, message, details=None, encrypt=False, extra=None, args=None):
+        self.log("CRITICAL", message, details, encrypt, extra, args)
 
     # Proxy metodlar ekleyerek diğer modüllerin doğrudan kullanmasını sağlıyoruz
     def get_logger(self):
@@ -121,11 +235,9 @@ class Logger:
 
     def close_handlers(self):
         """
-        Açık olan tüm handler'ları kapatır.
+        Kuyruktaki kayıtları yazar ve açık olan tüm handler'ları kapatır.
         """
-        for handler in self.logger.handlers:
-            handler.close()
-        self.logger.handlers.clear()
+        shutdown_logging()
 
 
 # Logger nesnesi oluşturuluyor
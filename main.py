@@ -1,15 +1,24 @@
 import os
-import asyncio
+import argparse
 import signal
 import time
 from database.db_manager import DBManager
 from database.postgre import PostgreSQL
+from database.result_sink import build_result_sinks
 from tests.tests import run_tests
 from utils.config_manager import load_config
 from utils.display import Display, console
 from utils.task_generator import TaskGenerator
 from utils.task_synchronizer import TaskSynchronizer
 from utils.process_manager import ProcessManager
+from utils.supervisor import Supervisor
+from utils.postgres_synchronizer import PostgresSynchronizer
+from utils.metrics import start_metrics_server
+from utils.loop_monitor import start_loop_monitor
+from utils import runtime
+from utils.work_queue import build_work_queue
+from utils.scheduler import ScheduledWorkQueue, build_scheduler
+from utils import profiler
 from rich.table import Table
 from logB.logger import Logger
 
@@ -25,13 +34,16 @@ def signal_handler(sig, frame):
     display.print_error("\u274c Application interrupted. Exiting...")
     exit(0)
 
-async def main():
+async def main(config=None):
     """
     Main function to initialize the application and handle its lifecycle.
+
+    Args:
+        config: Already loaded configuration (loaded here when omitted).
     """
     # Load configuration
     try:
-        config = load_config()
+        config = config or load_config()
         if not config:
             raise ValueError("Configuration could not be loaded.")
     except Exception as e:
@@ -44,6 +56,16 @@ async def main():
 
     # Signal Handling
     signal.signal(signal.SIGINT, signal_handler)
+    display.print_info(f"ℹ️ Event loop: {runtime.loop_name()}")
+
+    # Optional /metrics endpoint; runs in a daemon thread for the whole process lifetime
+    try:
+        metrics_server = start_metrics_server(config)
+        if metrics_server:
+            display.print_success(f"✔️ Metrics endpoint listening on port {metrics_server.server_port}.")
+    except OSError as e:
+        logger.error(f"Metrics endpoint could not be started: {e}", extra={"function": "main", "section": "metrics"})
+        display.print_warning(f"⚠️ Metrics endpoint could not be started: {e}")
 
     # Run system tests
     try:
@@ -70,7 +92,7 @@ async def main():
 
     # Generate tasks
     try:
-        task_generator = TaskGenerator()
+        task_generator = TaskGenerator(config)
         ip_list = task_generator.parse_ip_list(NETCONF_FILE)
         blacklist_list = task_generator.get_blacklist_config()
         in_memory_tasks = task_generator.generate_task_list(ip_list, blacklist_list)
@@ -96,51 +118,103 @@ async def main():
         display.print_error(f"\u274c DBManager initialization failed: {e}")
         return
 
-    # Synchronize tasks
+    # Broker-less single-node queue (QUEUE_BACKEND=memory or sqlite)
+    local_queue = build_work_queue(config, db_manager.sqlite_db)
+
+    # Synchronize tasks (daemon mode creates each day's rows itself as pairs fall due)
+    daemon = config.get("daemon", {}).get("enabled", False)
     try:
-        synchronizer = TaskSynchronizer(
-            sqlite_manager=db_manager.sqlite_db,
-            rabbitmq=db_manager.rabbitmq,
-            in_memory_tasks=in_memory_tasks,
-            config=config,
-            active_db_manager=db_manager
-        )
-
-        await synchronizer.synchronize()
-        logger.info("Task synchronization completed.")
-        display.print_success("\u2714\ufe0f Task synchronization completed.")
+        if daemon:
+            display.print_info("ℹ️ Daemon mode: pairs are scheduled in-process, task synchronization is skipped.")
+        else:
+            synchronizer = TaskSynchronizer(
+                sqlite_manager=db_manager.sqlite_db,
+                work_queue=local_queue or db_manager.rabbitmq,
+                in_memory_tasks=in_memory_tasks,
+                config=config,
+                active_db_manager=db_manager
+            )
+
+            await synchronizer.synchronize()
+            logger.info("Task synchronization completed.")
+            display.print_success("\u2714\ufe0f Task synchronization completed.")
     except Exception as e:
         logger.error(f"Task synchronization failed: {e}", extra={"function": "main", "section": "task_sync"})
         display.print_error(f"\u274c Task synchronization failed: {e}")
         return
     finally:
         # RabbitMQ bağlantısını kapat
+        if db_manager.rabbitmq is not None:
+            try:
+                db_manager.rabbitmq.channel.close()
+                db_manager.rabbitmq.connection.close()
+                logger.info("RabbitMQ connection closed successfully.")
+                display.print_success("✔️ RabbitMQ connection closed successfully.")
+            except Exception as close_error:
+                logger.error(f"Failed to close RabbitMQ connection: {close_error}")
+                display.print_error(f"❌ Failed to close RabbitMQ connection: {close_error}")
+
+
+    # Start the live PostgreSQL sync alongside processing
+    postgres_sync = None
+    postgres_config = config["postgresql"]
+    if (config.get("database", {}).get("recorded_dbs", {}).get("postgresql", False)
+            and postgres_config.get("live_sync", True) and postgres_config.get("sync_mode", "watermark") == "watermark"):
         try:
-            db_manager.rabbitmq.channel.close()
-            db_manager.rabbitmq.connection.close()
-            logger.info("RabbitMQ connection closed successfully.")
-            display.print_success("✔️ RabbitMQ connection closed successfully.")
-        except Exception as close_error:
-            logger.error(f"Failed to close RabbitMQ connection: {close_error}")
-            display.print_error(f"❌ Failed to close RabbitMQ connection: {close_error}")
+            postgres_sync = PostgresSynchronizer(sqlite_manager=db_manager.sqlite_db, config=config)
+            await postgres_sync.start()
+        except Exception as e:
+            postgres_sync = None
+            logger.error(f"PostgreSQL live sync could not be started: {e}", extra={"function": "main", "section": "postgres_sync"})
+            display.print_warning(f"⚠️ PostgreSQL live sync could not be started, results will be exported at the end: {e}")
 
+    # Optional event loop health monitor for the processing phase
+    loop_monitor = start_loop_monitor(config)
 
-    # Process tasks dynamically
+    # Process tasks dynamically (WORKER_PROCESSES > 1: one event loop per worker process)
+    worker_processes = config["workers"]["processes"]
+    if worker_processes > 1 and (daemon or config["queue"]["backend"] == "memory"):
+        display.print_warning("⚠️ Daemon mode and QUEUE_BACKEND=memory are process-local; WORKER_PROCESSES is ignored.")
+        worker_processes = 1
     try:
-        process_manager = ProcessManager(
-            sqlite_manager=db_manager.sqlite_db,
-            config=config
-        )
         queue_name = config["rabbitmq"]["default_queue"]
-        await process_manager.fetch_and_process_tasks(queue_name)
+        if daemon:
+            # Zamanlayıcı kuyruğu: işçiler sinyal gelene kadar vadesi gelen çiftleri işler
+            local_queue = ScheduledWorkQueue(build_scheduler(config, in_memory_tasks), db_manager.sqlite_db, config)
+        if worker_processes > 1:
+            supervisor = Supervisor(
+                sqlite_manager=db_manager.sqlite_db,
+                config=config,
+                result_sinks=build_result_sinks(config, db_manager),
+                processes=worker_processes
+            )
+            await supervisor.run(queue_name)
+        else:
+            process_manager = ProcessManager(
+                sqlite_manager=db_manager.sqlite_db,
+                config=config,
+                result_sinks=build_result_sinks(config, db_manager),
+                work_queue=local_queue
+            )
+            await process_manager.fetch_and_process_tasks(queue_name, continuous=daemon)
         logger.info("Task processing completed.")
         display.print_success("\u2714\ufe0f Task processing completed.")
     except Exception as e:
         logger.error(f"Task processing failed: {e}", extra={"function": "main", "section": "task_processing"})
         display.print_error(f"\u274c Task processing failed: {e}")
         return
-        
-    # Finalize and handle PostgreSQL processing
+    finally:
+        if loop_monitor:
+            await loop_monitor.stop()
+            loop_monitor.render()
+        if postgres_sync:
+            try:
+                await postgres_sync.stop()
+            except Exception as e:
+                logger.error(f"Stopping PostgreSQL live sync failed: {e}", extra={"function": "main", "section": "postgres_sync"})
+                display.print_error(f"❌ Stopping PostgreSQL live sync failed: {e}")
+
+    # Finalize and handle PostgreSQL processing (a no-op when the live sync shipped everything)
     try:
         postgres = PostgreSQL(config)
         sqlite_manager = db_manager.sqlite_db  # Access SQLite TaskManager instance
@@ -153,5 +227,32 @@ async def main():
         return
 
 
+def parse_args():
+    """
+    Parses the command line options.
+    """
+    parser = argparse.ArgumentParser(description="DNSBL checker")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Keep running and re-check every pair on its blacklist's interval (DAEMON_ENABLED).")
+    parser.add_argument("--profile", action="store_true",
+                        help="Time the processing stages and write a breakdown at exit.")
+    parser.add_argument("--profile-sample", action="store_true",
+                        help="With --profile, also sample all thread stacks and write a collapsed-stack file.")
+    parser.add_argument("--profile-interval", type=float, default=0.005,
+                        help="Stack sampling interval in seconds (default: 0.005).")
+    parser.add_argument("--profile-output", default=os.path.join("logs", "profile"),
+                        help="Directory for the profile report (default: logs/profile).")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    args = parse_args()
+    if args.profile:
+        profiler.enable(sample=args.profile_sample, interval=args.profile_interval, output_dir=args.profile_output)
+    # Event loop ve çalışma zamanı ayarları yapılandırmadan gelir, bu yüzden önce yüklenir
+    config = load_config()
+    if not config:
+        raise SystemExit("\u274c Failed to load configuration.")
+    if args.daemon:
+        config["daemon"]["enabled"] = True
+    runtime.run(main(config), config)
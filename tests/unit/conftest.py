@@ -0,0 +1,65 @@
+"""
+Shared fixtures of the offline unit tests (`python -m pytest tests/unit`).
+"""
+import sqlite3
+from contextlib import asynccontextmanager
+import aiodns
+import pytest
+from benchmarks.standins import bench_config
+from database.task_manager import TaskManager
+from utils.display import console
+from utils.dns_stub_server import StubDNSServer
+from utils.resolver import resolver_flags
+
+
+@pytest.fixture(autouse=True)
+def quiet_console():
+    console.quiet = True
+    yield
+    console.quiet = False
+
+
+@pytest.fixture
+def config(tmp_path):
+    """
+    Minimal application configuration with three synthetic zones, every file under tmp_path.
+    """
+    return bench_config(str(tmp_path), 3)
+
+
+@pytest.fixture
+def task_manager(config):
+    conn = sqlite3.connect(config["sqlite"]["db_path"])
+    manager = TaskManager(conn, config)
+    yield manager
+    conn.close()
+
+
+@pytest.fixture
+def stub_dns():
+    """
+    Starts a StubDNSServer for the given zones inside the test's event loop and yields
+    (server, resolver), the resolver pointed at the stub like RESOLVER_NAMESERVERS does.
+
+        async with stub_dns([StubZone("zen.stub.test", listed=["127.0.0.2"])]) as (server, resolver):
+            ...
+    """
+    @asynccontextmanager
+    async def start(zones, timeout=2.0, tries=1):
+        async with StubDNSServer(zones, seed=1) as server:
+            resolver = aiodns.DNSResolver(nameservers=[server.host], udp_port=server.port, tcp_port=server.port,
+                                          timeout=timeout, tries=tries, flags=resolver_flags([server.host]))
+            yield server, resolver
+
+    return start
+
+
+def complete(task_manager, task_id, last_updated, result="not_listed"):
+    """
+    Finishes a task row with an explicit last_updated, as CURRENT_TIMESTAMP would.
+    """
+    with task_manager.conn:
+        task_manager.conn.execute(
+            "UPDATE ip_check SET status = 'completed', result = ?, last_updated = ? WHERE id = ?",
+            (result, last_updated, task_id)
+        )
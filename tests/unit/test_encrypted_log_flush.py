@@ -0,0 +1,40 @@
+import os
+import time
+import logging
+from logB.logger import Logger
+from logB.log_formatter import JsonLineFormatter
+from logB.log_rotator import EncryptedBlockFileHandler
+from logB.log_security import read_encrypted_log
+
+
+def make_record(message):
+    return logging.LogRecord("audit", logging.INFO, __file__, 1, message, None, None)
+
+
+def test_flush_due_writes_a_partial_block_once_it_is_old_enough(tmp_path):
+    path = str(tmp_path / "audit.log.enc")
+    handler = EncryptedBlockFileHandler(path, flush_interval=0.2)
+    handler.setFormatter(JsonLineFormatter())
+    try:
+        handler.handle(make_record("first"))
+        handler.flush_due()
+        assert os.path.getsize(path) == 0
+
+        time.sleep(0.25)
+        handler.flush_due()
+        assert [entry["message"] for entry in read_encrypted_log(path)] == ["first"]
+    finally:
+        handler.close()
+
+
+def test_idle_encrypted_records_are_written_without_a_following_record(tmp_path):
+    log_path = str(tmp_path / "app.log")
+    Logger(log_file_path=log_path).info("audit record", encrypt=True)
+
+    # Sonraki kayıt gelmese de listener zamanlayıcısı bloğu flush_interval içinde yazar
+    deadline = time.monotonic() + 3.0
+    while time.monotonic() < deadline:
+        if os.path.exists(log_path + ".enc") and os.path.getsize(log_path + ".enc") > 0:
+            break
+        time.sleep(0.05)
+    assert [entry["message"] for entry in read_encrypted_log(log_path + ".enc")] == ["audit record"]
@@ -0,0 +1,113 @@
+"""
+Leases of the SQLite work queue (QUEUE_BACKEND=sqlite): TaskManager.claim_tasks and the
+release of a lease when bulk_update_tasks finishes a claimed row.
+"""
+import time
+import sqlite3
+import threading
+from database.task_manager import TaskManager
+from utils.work_queue import SQLiteLeaseQueue
+
+
+def insert_pending(task_manager, count):
+    task_manager.insert_tasks([{"ip": f"10.0.0.{index}", "dns": "zone0.bench.test"} for index in range(1, count + 1)])
+
+
+def lease_of(task_manager, task_id):
+    return task_manager.conn.execute(
+        "SELECT lease_owner, lease_expires, status FROM ip_check WHERE id = ?", (task_id,)
+    ).fetchone()
+
+
+def test_claim_sets_owner_and_expiry(task_manager):
+    insert_pending(task_manager, 5)
+    before = time.time()
+
+    claimed = task_manager.claim_tasks("worker-a", 3, 30)
+
+    assert [task["id"] for task in claimed] == [1, 2, 3]
+    assert claimed[0]["ip"] == "10.0.0.1" and claimed[0]["check_date"] == task_manager.today
+    owner, expires, status = lease_of(task_manager, 1)
+    assert owner == "worker-a" and status == "pending"
+    assert before + 30 <= expires <= time.time() + 30
+    assert lease_of(task_manager, 4)[:2] == (None, None)
+    assert task_manager.count_claimable_tasks() == 2
+
+
+def test_leased_tasks_are_not_claimed_again(task_manager):
+    insert_pending(task_manager, 5)
+    first = task_manager.claim_tasks("worker-a", 3, 30)
+
+    second = task_manager.claim_tasks("worker-b", 10, 30)
+
+    assert [task["id"] for task in second] == [4, 5]
+    assert not {task["id"] for task in first} & {task["id"] for task in second}
+    assert task_manager.claim_tasks("worker-c", 10, 30) == []
+
+
+def test_expired_leases_are_claimable_and_reclaimed(task_manager):
+    insert_pending(task_manager, 3)
+    task_manager.claim_tasks("crashed", 2, -1)
+
+    assert task_manager.count_claimable_tasks() == 3
+    assert [task["id"] for task in task_manager.claim_tasks("worker-b", 1, 30)] == [1]
+    assert lease_of(task_manager, 1)[0] == "worker-b"
+
+    assert task_manager.reclaim_expired_leases() == 1
+    assert lease_of(task_manager, 2)[:2] == (None, None)
+    assert lease_of(task_manager, 1)[0] == "worker-b"
+
+
+def test_two_owners_never_claim_the_same_row(task_manager, config):
+    insert_pending(task_manager, 200)
+    claims = {}
+
+    def drain(owner):
+        conn = sqlite3.connect(config["sqlite"]["db_path"], timeout=30)
+        manager = TaskManager(conn, config)
+        ids = claims.setdefault(owner, [])
+        try:
+            while True:
+                batch = manager.claim_tasks(owner, 7, 30)
+                if not batch:
+                    break
+                ids.extend(task["id"] for task in batch)
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=drain, args=(owner,)) for owner in ("worker-a", "worker-b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    a, b = claims["worker-a"], claims["worker-b"]
+    assert len(a) == len(set(a)) and len(b) == len(set(b))
+    assert not set(a) & set(b)
+    assert sorted(a + b) == list(range(1, 201))
+
+
+def test_bulk_update_by_id_releases_the_lease(task_manager):
+    insert_pending(task_manager, 2)
+    claimed = task_manager.claim_tasks("worker-a", 2, 30)
+
+    task_manager.bulk_update_tasks([dict(claimed[0], status="completed", result="listed")])
+
+    assert lease_of(task_manager, 1) == (None, None, "completed")
+    assert lease_of(task_manager, 2)[0] == "worker-a"
+    assert task_manager.release_leases("worker-a") == 1
+    assert lease_of(task_manager, 2)[:2] == (None, None)
+
+
+def test_lease_queue_claims_past_its_leases_and_wraps_around(task_manager, config):
+    insert_pending(task_manager, 6)
+    work_queue = SQLiteLeaseQueue(task_manager, config)
+    work_queue.batch_size = 2
+
+    assert [task["id"] for task in work_queue.claim()] == [1, 2]
+    assert [task["id"] for task in work_queue.claim()] == [3, 4]
+    # Bir kira süresi dolar; kuyruk önce sona kadar ilerler, sonra baştan alır
+    task_manager.conn.execute("UPDATE ip_check SET lease_expires = 0 WHERE id = 2")
+    assert [task["id"] for task in work_queue.claim()] == [5, 6]
+    assert [task["id"] for task in work_queue.claim()] == [2]
+    assert work_queue.claim() == []
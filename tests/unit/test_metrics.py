@@ -0,0 +1,38 @@
+"""
+Shipping metric increments between registries, as worker processes do for the supervisor.
+"""
+from utils.metrics import MetricsRegistry, snapshot_delta
+
+
+def test_worker_increments_add_up_in_the_parent():
+    worker, parent = MetricsRegistry(), MetricsRegistry()
+    lookups = worker.counter("lookups_total", "Lookups.", ("result",))
+    latency = worker.histogram("lookup_seconds", "Latency.", buckets=(0.1, 1.0))
+    depth = worker.gauge("queue_depth", "Depth.")
+    parent.counter("lookups_total", "Lookups.", ("result",)).labels("listed").inc(2)
+
+    lookups.labels("listed").inc(3)
+    latency.observe(0.05)
+    depth.set(7)
+    first = worker.snapshot()
+    parent.merge(snapshot_delta(first, {}))
+    lookups.labels("not_listed").inc()
+    latency.observe(0.5)
+    parent.merge(snapshot_delta(worker.snapshot(), first))
+
+    rendered = parent.render()
+    assert 'lookups_total{result="listed"} 5.0' in rendered
+    assert 'lookups_total{result="not_listed"} 1.0' in rendered
+    assert 'lookup_seconds_bucket{le="0.1"} 1' in rendered
+    assert 'lookup_seconds_bucket{le="1.0"} 2' in rendered
+    assert "lookup_seconds_count 2" in rendered
+    assert "queue_depth" not in rendered
+
+
+def test_unchanged_samples_are_not_shipped():
+    worker = MetricsRegistry()
+    worker.counter("lookups_total", "Lookups.", ("result",)).labels("listed").inc()
+    worker.histogram("lookup_seconds", "Latency.").observe(0.2)
+    snapshot = worker.snapshot()
+
+    assert snapshot_delta(worker.snapshot(), snapshot) == {}
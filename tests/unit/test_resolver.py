@@ -0,0 +1,60 @@
+"""
+rdns_check against the stub DNSBL server: every result class the stub can produce.
+"""
+import asyncio
+from utils.dns_stub_server import StubZone
+from utils.resolver import rdns_check
+
+ZONE = "zen.stub.test"
+
+
+def check(stub_dns, zone, ip, **resolver_options):
+    async def run():
+        async with stub_dns([zone], **resolver_options) as (server, resolver):
+            return await rdns_check(resolver, ip, ZONE), dict(server.stats)
+
+    return asyncio.run(run())
+
+
+def test_listed_address_reports_txt_reason(stub_dns):
+    result, stats = check(stub_dns, StubZone(ZONE, listed=["127.0.0.2"], txt="Spam source"), "127.0.0.2")
+
+    assert result["status"] == "completed"
+    assert result["result"] == "listed"
+    assert result["details"].startswith("127.0.0.2: Spam source (")
+    assert stats["listed"] == 2
+
+
+def test_unlisted_address_is_nxdomain(stub_dns):
+    result, stats = check(stub_dns, StubZone(ZONE, listed=["127.0.0.2"]), "192.0.2.10")
+
+    assert result["result"] == "not_listed"
+    assert stats["nxdomain"] == 1
+
+
+def test_listed_without_txt_is_still_listed(stub_dns):
+    result, _ = check(stub_dns, StubZone(ZONE, listed=["127.0.0.2"], txt=""), "127.0.0.2")
+
+    assert result["result"] == "listed"
+    assert result["details"].startswith("127.0.0.2:  (")
+
+
+def test_servfail_from_single_nameserver(stub_dns):
+    result, stats = check(stub_dns, StubZone(ZONE, listed=["127.0.0.2"], servfail_rate=1.0), "127.0.0.2")
+
+    assert result["result"] == "servfail"
+    assert stats["servfail"] == 1
+
+
+def test_lost_query_times_out(stub_dns):
+    result, stats = check(stub_dns, StubZone(ZONE, loss_rate=1.0), "127.0.0.2", timeout=0.2, tries=1)
+
+    assert result["result"] == "timed_out"
+    assert stats["dropped"] >= 1
+
+
+def test_invalid_ip_is_not_queried(stub_dns):
+    result, stats = check(stub_dns, StubZone(ZONE), "not-an-ip")
+
+    assert result["result"] == "invalid_ip"
+    assert stats["queries"] == 0
@@ -0,0 +1,152 @@
+"""
+Daemon mode: the CheckScheduler heap, the ScheduledWorkQueue binding of pairs to the
+day's rows, and results reaching the sinks without a full bulk-update batch.
+"""
+import time
+import asyncio
+from datetime import date
+from benchmarks.standins import SyntheticResolver
+from database.result_sink import ResultFanout, ResultSink
+from utils import scheduler as scheduler_module
+from utils.process_manager import ProcessManager
+from utils.scheduler import CheckScheduler, ScheduledWorkQueue
+
+ZONE_A = "zone0.bench.test"
+ZONE_B = "zone1.bench.test"
+
+
+def make_tasks(count, dns=ZONE_A):
+    return [{"ip": f"10.0.0.{index}", "dns": dns, "blacklist_name": dns} for index in range(1, count + 1)]
+
+
+class RecordingSink(ResultSink):
+    name = "Recording"
+
+    def __init__(self, buffer_size=500):
+        super().__init__(buffer_size)
+        self.batches = []
+
+    async def write_batch(self, batch):
+        self.batches.append((time.monotonic(), [task["ip"] for task in batch]))
+
+
+def test_pairs_are_popped_in_due_order():
+    scheduler = CheckScheduler(make_tasks(3), {}, 60)
+    now = time.time()
+    assert [ip for _, ip, _ in scheduler.pop_due(now, 10)] == ["10.0.0.1", "10.0.0.2", "10.0.0.3"]
+
+    scheduler.schedule("10.0.0.3", ZONE_A, now + 5)
+    scheduler.schedule("10.0.0.1", ZONE_A, now + 10)
+    scheduler.schedule("10.0.0.2", ZONE_A, now + 5)
+
+    assert scheduler.next_due() == now + 5
+    assert scheduler.pop_due(now + 1, 10) == []
+    assert [ip for _, ip, _ in scheduler.pop_due(now + 5, 10)] == ["10.0.0.3", "10.0.0.2"]
+    assert [ip for _, ip, _ in scheduler.pop_due(now + 60, 10)] == ["10.0.0.1"]
+    assert scheduler.next_due() is None
+
+
+def test_pop_due_respects_the_limit():
+    scheduler = CheckScheduler(make_tasks(5), {}, 60)
+
+    assert len(scheduler.pop_due(time.time(), 2)) == 2
+    assert len(scheduler) == 3
+
+
+def test_reschedule_uses_the_zone_interval():
+    scheduler = CheckScheduler(make_tasks(1) + make_tasks(1, ZONE_B), {ZONE_B: 30}, 3600)
+    scheduler.pop_due(time.time(), 10)
+
+    scheduler.reschedule("10.0.0.1", ZONE_A, now=1000)
+    scheduler.reschedule("10.0.0.1", ZONE_B, now=1000)
+
+    assert scheduler.pop_due(1029, 10) == []
+    assert scheduler.pop_due(1030, 10) == [(1030, "10.0.0.1", ZONE_B)]
+    assert scheduler.pop_due(4600, 10) == [(4600, "10.0.0.1", ZONE_A)]
+
+
+def test_rows_are_created_once_per_day(task_manager, config, monkeypatch):
+    class Today:
+        value = date(2026, 3, 1)
+
+        @classmethod
+        def today(cls):
+            return cls.value
+
+    monkeypatch.setattr(scheduler_module, "date", Today)
+    work_queue = ScheduledWorkQueue(CheckScheduler(make_tasks(2), {}, 60), task_manager, config)
+    pairs = [("10.0.0.1", ZONE_A), ("10.0.0.2", ZONE_A)]
+
+    first = dict(work_queue._bind_rows(pairs[:1]))
+    second = dict(work_queue._bind_rows(pairs))
+    assert work_queue.check_date == "2026-03-01"
+    assert second[pairs[0]] == first[pairs[0]]
+    assert len(task_manager.fetch_task_ids("2026-03-01")) == 2
+
+    Today.value = date(2026, 3, 2)
+    next_day = dict(work_queue._bind_rows(pairs))
+
+    assert work_queue.check_date == "2026-03-02"
+    assert set(next_day) == set(pairs)
+    assert not set(next_day.values()) & set(second.values())
+    assert len(task_manager.fetch_task_ids("2026-03-01")) == 2
+    assert len(task_manager.fetch_task_ids("2026-03-02")) == 2
+
+
+def test_dispatched_pairs_carry_their_row_and_are_rescheduled(task_manager, config):
+    scheduler = CheckScheduler(make_tasks(2), {}, 60)
+    work_queue = ScheduledWorkQueue(scheduler, task_manager, config)
+
+    async def run():
+        queue = await work_queue.open_queue("daemon")
+        async with queue.iterator() as messages:
+            message = await messages.__anext__()
+            async with message.process():
+                assert len(scheduler) == 0
+        return message.task
+
+    task = asyncio.run(run())
+
+    assert task["id"] == work_queue.task_ids[(task["ip"], task["dns"])]
+    assert task["check_date"] == date.today().strftime("%Y-%m-%d")
+    assert len(scheduler) == 1
+    assert scheduler.next_due() >= time.time() + 59
+
+
+def test_fanout_flushes_a_steady_trickle(config):
+    config["results"] = {"flush_interval": 0.1}
+    sink = RecordingSink(buffer_size=1000)
+    fanout = ResultFanout([sink], config)
+
+    async def run():
+        await fanout.start()
+        # Kuyruk hiç boşta kalmaz; yine de tampon yaş sınırında yazılmalı
+        for index in range(25):
+            await fanout.publish([{"ip": f"10.0.0.{index}"}])
+            await asyncio.sleep(0.02)
+        written_before_close = sum(len(ips) for _, ips in sink.batches)
+        await fanout.close()
+        return written_before_close
+
+    assert asyncio.run(run()) > 0
+    assert sum(len(ips) for _, ips in sink.batches) == 25
+
+
+def test_daemon_results_reach_the_sinks_below_the_batch_size(task_manager, config):
+    config["results"] = {"flush_interval": 0.1}
+    config["sqlite"]["bulk_update_count"] = 500
+    config["daemon"] = {"poll_seconds": 0.05}
+    sink = RecordingSink()
+    work_queue = ScheduledWorkQueue(CheckScheduler(make_tasks(3), {}, 3600), task_manager, config)
+    process_manager = ProcessManager(task_manager, config, result_sinks=[sink], resolver=SyntheticResolver(),
+                                     work_queue=work_queue)
+
+    async def run():
+        processing = asyncio.create_task(process_manager.fetch_and_process_tasks("daemon", continuous=True))
+        await asyncio.sleep(0.5)
+        written = [ip for _, ips in sink.batches for ip in ips]
+        await process_manager.stop_workers()
+        await processing
+        return written
+
+    assert sorted(asyncio.run(run())) == ["10.0.0.1", "10.0.0.2", "10.0.0.3"]
@@ -0,0 +1,74 @@
+"""
+Shard assignment (utils.sharding) and the hand-over of foreign rows in TaskSynchronizer.
+"""
+import pytest
+from utils.sharding import HashRing, ModuloSharding, moved_fraction
+from utils.task_synchronizer import TaskSynchronizer
+from tests.unit.conftest import complete
+
+KEYS = [(f"10.{i >> 8 & 255}.{i & 255}.1", f"zone{i % 5}.test") for i in range(20000)]
+NODES = ["node-a", "node-b", "node-c", "node-d"]
+
+
+def assert_partition(shards):
+    owned = [{key for key in KEYS if shard.owns(*key)} for shard in shards]
+    for index, keys in enumerate(owned):
+        for other in owned[index + 1:]:
+            assert not keys & other
+    assert set().union(*owned) == set(KEYS)
+    # Her parça kabaca eşit pay alır
+    for keys in owned:
+        assert len(keys) == pytest.approx(len(KEYS) / len(shards), rel=0.25)
+
+
+def test_modulo_shards_partition_the_keys():
+    assert_partition([ModuloSharding(index, 4) for index in range(4)])
+
+
+def test_ring_nodes_partition_the_keys():
+    assert_partition([HashRing(NODES, node) for node in NODES])
+
+
+def test_invalid_shards_are_rejected():
+    with pytest.raises(ValueError):
+        ModuloSharding(4, 4)
+    with pytest.raises(ValueError):
+        HashRing(NODES, "node-x")
+
+
+def test_adding_a_ring_node_moves_about_one_in_n_keys():
+    before = HashRing(NODES, NODES[0])
+    after = HashRing(NODES + ["node-e"], NODES[0])
+
+    moved = moved_fraction(before, after, KEYS)
+
+    assert moved == pytest.approx(1 / 5, abs=0.05)
+    # Taşınan her anahtar yeni düğüme gider
+    for ip, dns in KEYS:
+        if before.owner(ip, dns) != after.owner(ip, dns):
+            assert after.owner(ip, dns) == "node-e"
+
+
+def test_modulo_moves_most_keys_when_the_count_changes():
+    assert moved_fraction(ModuloSharding(0, 4), ModuloSharding(0, 5), KEYS) > 0.7
+
+
+def test_drop_foreign_tasks_deletes_only_pending_foreign_rows(task_manager, config):
+    config["sharding"] = {"mode": "modulo", "index": 0, "count": 2}
+    tasks = [{"ip": f"10.0.0.{index}", "dns": "zone0.bench.test"} for index in range(1, 41)]
+    task_manager.insert_tasks(tasks)
+    synchronizer = TaskSynchronizer(task_manager, None, tasks, config, None)
+    sharding = synchronizer.sharding
+    foreign = [task for task in tasks if not sharding.owns(task["ip"], task["dns"])]
+    # Başka parçaya geçmiş ama bugün tamamlanmış satır yerinde kalmalı
+    finished = task_manager.fetch_task_ids(task_manager.today)[(foreign[0]["ip"], foreign[0]["dns"])]
+    complete(task_manager, finished, "2026-01-01 10:00:00")
+
+    owned = synchronizer.drop_foreign_tasks(task_manager.fetch_tasks_by_date(task_manager.today))
+
+    remaining = set(task_manager.fetch_task_ids(task_manager.today))
+    assert {(task["ip"], task["dns"]) for task in owned} == {
+        (task["ip"], task["dns"]) for task in tasks if sharding.owns(task["ip"], task["dns"])
+    }
+    assert remaining == {(task["ip"], task["dns"]) for task in owned} | {(foreign[0]["ip"], foreign[0]["dns"])}
+    assert 0 < len(foreign) < len(tasks)
@@ -0,0 +1,20 @@
+"""
+Per-process configuration of the worker processes (WORKER_PROCESSES > 1).
+"""
+from utils.supervisor import worker_process_config
+
+
+def test_worker_files_do_not_collide(config):
+    config["tracing"] = {"enabled": True, "export_path": "logs/traces.otlp.json"}
+    config["resolver"] = {"timeout": 2.0, "record_path": "logs/dns-recording.jsonl.gz"}
+
+    children = [worker_process_config(config, index) for index in (1, 2)]
+
+    assert [child["resolver"]["record_path"] for child in children] == [
+        "logs/dns-recording.worker1.jsonl.gz", "logs/dns-recording.worker2.jsonl.gz"
+    ]
+    assert [child["tracing"]["export_path"] for child in children] == [
+        "logs/traces.worker1.otlp.json", "logs/traces.worker2.otlp.json"
+    ]
+    assert children[0]["resolver"]["timeout"] == 2.0
+    assert config["resolver"]["record_path"] == "logs/dns-recording.jsonl.gz"
@@ -0,0 +1,90 @@
+import asyncio
+from database.postgre import SYNC_WATERMARK_NAME
+from utils.postgres_synchronizer import PostgresSynchronizer
+from tests.unit.conftest import complete
+
+SECOND = "2026-01-01 10:00:00"
+NEXT_SECOND = "2026-01-01 10:00:01"
+
+
+class RecordingPostgres:
+    def __init__(self):
+        self.batches = []
+        self.rows = []
+
+    def upsert_results(self, tasks):
+        self.batches.append([task["id"] for task in tasks])
+        self.rows.extend(tasks)
+        return len(tasks)
+
+
+def insert_pending(task_manager, count):
+    task_manager.insert_tasks([{"ip": f"10.0.0.{index}", "dns": "zone0.bench.test"} for index in range(1, count + 1)])
+
+
+def test_rows_of_the_current_second_are_not_exported(task_manager):
+    insert_pending(task_manager, 5)
+    complete(task_manager, 5, SECOND)
+
+    assert task_manager.fetch_tasks_updated_since("", 0, 100, before=SECOND) == []
+    assert [task["id"] for task in task_manager.fetch_tasks_updated_since("", 0, 100, before=NEXT_SECOND)] == [5]
+
+
+def test_lower_id_finishing_in_the_same_second_is_exported(task_manager, config):
+    insert_pending(task_manager, 5)
+    synchronizer = PostgresSynchronizer(task_manager, config)
+    synchronizer.postgres = RecordingPostgres()
+
+    # id 5 biter, senkronizasyon aynı saniyede çalışır; ardından id 2 aynı saniyede biter
+    complete(task_manager, 5, SECOND)
+    task_manager.settled_cutoff = lambda: SECOND
+    assert asyncio.run(synchronizer.sync_once()) == 0
+    complete(task_manager, 2, SECOND)
+
+    task_manager.settled_cutoff = lambda: NEXT_SECOND
+    assert asyncio.run(synchronizer.sync_once()) == 2
+    assert synchronizer.postgres.batches == [[2, 5]]
+    assert task_manager.get_sync_watermark(SYNC_WATERMARK_NAME) == (SECOND, 5)
+
+    # Watermark ilerledi: aynı satırlar tekrar gönderilmez
+    assert asyncio.run(synchronizer.sync_once()) == 0
+
+
+def test_watermark_pages_through_settled_rows(task_manager, config):
+    insert_pending(task_manager, 5)
+    for task_id in range(1, 6):
+        complete(task_manager, task_id, SECOND)
+    config["postgresql"]["sync_batch_size"] = 2
+    synchronizer = PostgresSynchronizer(task_manager, config)
+    synchronizer.postgres = RecordingPostgres()
+    task_manager.settled_cutoff = lambda: NEXT_SECOND
+
+    assert asyncio.run(synchronizer.sync_once()) == 5
+    assert synchronizer.postgres.batches == [[1, 2], [3, 4], [5]]
+
+
+def test_result_without_row_id_only_updates_its_own_day(task_manager, config):
+    pair = ("10.0.0.1", "zone0.bench.test")
+    yesterday = task_manager.create_tasks([pair], "2026-01-01")[pair]
+    complete(task_manager, yesterday, SECOND, result="listed")
+    synchronizer = PostgresSynchronizer(task_manager, config)
+    synchronizer.postgres = RecordingPostgres()
+    task_manager.settled_cutoff = lambda: NEXT_SECOND
+    assert asyncio.run(synchronizer.sync_once()) == 1
+
+    # Bugünün sonucu RabbitMQ'dan gelir gibi satır id'si olmadan yazılır
+    task_manager.insert_tasks([{"ip": pair[0], "dns": pair[1]}])
+    today = task_manager.fetch_tasks_by_date(task_manager.today)[0]
+    task_manager.bulk_update_tasks([dict(today, status="completed", result="not_listed")])
+
+    rows = task_manager.conn.execute(
+        "SELECT check_date, result, last_updated FROM ip_check ORDER BY check_date"
+    ).fetchall()
+    assert rows[0] == ("2026-01-01", "listed", SECOND)
+    assert rows[1][:2] == (task_manager.today, "not_listed")
+
+    task_manager.settled_cutoff = lambda: "9999-12-31 00:00:00"
+    assert asyncio.run(synchronizer.sync_once()) == 1
+    assert [(row["check_date"], row["result"]) for row in synchronizer.postgres.rows] == [
+        ("2026-01-01", "listed"), (task_manager.today, "not_listed")
+    ]
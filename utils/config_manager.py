@@ -3,6 +3,7 @@ from dotenv import load_dotenv
 import yaml
 from logB.logger import Logger
 from utils.display import Display
+from utils.sharding import SHARD_MODES, apply_shard_queue
 
 def load_secret(file_path, fallback=None):
     """
@@ -56,7 +57,10 @@ def load_config():
         # Load MongoDB settings
         config['mongodb'] = {
             "url": os.getenv("MONGO_URL"),
-            "db_name": os.getenv("MONGO_DB_NAME")
+            "db_name": os.getenv("MONGO_DB_NAME"),
+            "results_collection": os.getenv("MONGO_RESULTS_COLLECTION", "blacklist_results"),
+            "bulk_size": int(os.getenv("MONGO_BULK_SIZE", 1000)),
+            "timeseries": os.getenv("MONGO_TIMESERIES", "false").lower() == "true"
         }
 
         # Load RabbitMQ settings
@@ -78,7 +82,18 @@ def load_config():
             "postgres_password": os.getenv("POSTGRES_PASSWORD", load_secret(os.getenv("POSTGRES_PASSWORD_FILE"))),
             "postgres_db": os.getenv("POSTGRES_DB"),
             "postgres_host": os.getenv("POSTGRES_HOST"),
-            "postgres_port": int(os.getenv("POSTGRES_PORT", 5432))
+            "postgres_port": int(os.getenv("POSTGRES_PORT", 5432)),
+            "partition_months_ahead": int(os.getenv("POSTGRES_PARTITION_MONTHS_AHEAD", 2)),
+            "retention_months": int(os.getenv("POSTGRES_RETENTION_MONTHS", 0)),
+            "live_sync": os.getenv("POSTGRES_LIVE_SYNC", "true").lower() == "true",
+            "sync_mode": os.getenv("POSTGRES_SYNC_MODE", "watermark"),
+            "sync_interval": float(os.getenv("POSTGRES_SYNC_INTERVAL", 5)),
+            "sync_batch_size": int(os.getenv("POSTGRES_SYNC_BATCH_SIZE", 1000)),
+            "pool_min": int(os.getenv("POSTGRES_POOL_MIN", 1)),
+            "pool_max": int(os.getenv("POSTGRES_POOL_MAX", 5)),
+            "pool_health_check_interval": float(os.getenv("POSTGRES_POOL_HEALTH_CHECK_INTERVAL", 30)),
+            "pool_acquire_timeout": float(os.getenv("POSTGRES_POOL_ACQUIRE_TIMEOUT", 30)),
+            "stream_batch_size": int(os.getenv("POSTGRES_STREAM_BATCH_SIZE", 2000))
         }
 
         config['sqlite'] = {
@@ -86,6 +101,100 @@ def load_config():
             "bulk_update_count": int(os.getenv("SQLITE_BULK_UPDATE_COUNT"))  
         }
 
+        # Result sink fan-out settings
+        config['results'] = {
+            "queue_size": int(os.getenv("RESULT_SINK_QUEUE_SIZE", 8)),
+            "flush_interval": float(os.getenv("RESULT_SINK_FLUSH_INTERVAL", 2))
+        }
+
+        # Console output: auto | live | headless | tasks (per-task lines)
+        config['display'] = {
+            "mode": os.getenv("DISPLAY_MODE", "auto").lower(),
+            "refresh_per_second": float(os.getenv("DISPLAY_REFRESH_PER_SECOND", 4)),
+            "progress_interval": float(os.getenv("DISPLAY_PROGRESS_INTERVAL", 5)),
+            "top_zones": int(os.getenv("DISPLAY_TOP_ZONES", 10))
+        }
+
+        # Prometheus-style /metrics endpoint
+        config['metrics'] = {
+            "enabled": os.getenv("METRICS_ENABLED", "false").lower() == "true",
+            "host": os.getenv("METRICS_HOST", "0.0.0.0"),
+            "port": int(os.getenv("METRICS_PORT", 9108))
+        }
+
+        # Sampled task traces (OTLP/JSON lines file)
+        config['tracing'] = {
+            "enabled": os.getenv("TRACING_ENABLED", "false").lower() == "true",
+            "sample_rate": float(os.getenv("TRACING_SAMPLE_RATE", 0.01)),
+            "export_path": os.getenv("TRACING_EXPORT_PATH", "logs/traces.otlp.jsonl"),
+            "service_name": os.getenv("TRACING_SERVICE_NAME", "dnsbl-checker")
+        }
+
+        # DNS resolver used for DNSBL lookups (empty nameservers: system resolv.conf)
+        config['resolver'] = {
+            "nameservers": [ns.strip() for ns in os.getenv("RESOLVER_NAMESERVERS", "").split(",") if ns.strip()],
+            "port": int(os.getenv("RESOLVER_PORT", 53)),
+            "timeout": float(os.getenv("RESOLVER_TIMEOUT", 0)) or None,
+            "tries": int(os.getenv("RESOLVER_TRIES", 0)) or None,
+            "record_path": os.getenv("RESOLVER_RECORD_PATH") or None,
+            "replay_path": os.getenv("RESOLVER_REPLAY_PATH") or None,
+            "replay_time_scale": float(os.getenv("RESOLVER_REPLAY_TIME_SCALE", 1.0))
+        }
+
+        # Event loop lag / blocking call monitor
+        config['loop_monitor'] = {
+            "enabled": os.getenv("LOOP_MONITOR_ENABLED", "false").lower() == "true",
+            "interval": float(os.getenv("LOOP_MONITOR_INTERVAL", 0.05)),
+            "threshold": float(os.getenv("LOOP_MONITOR_THRESHOLD", 0.1)),
+            "debug": os.getenv("LOOP_MONITOR_DEBUG", "false").lower() == "true",
+            "top": int(os.getenv("LOOP_MONITOR_TOP", 10)),
+            "report_path": os.getenv("LOOP_MONITOR_REPORT_PATH", "logs/loop_monitor.json")
+        }
+
+        # Task queue backend: RabbitMQ, or the in-process / SQLite lease queue of a single-node run
+        config['queue'] = {
+            "backend": os.getenv("QUEUE_BACKEND", "rabbitmq").lower(),
+            "memory_maxsize": int(os.getenv("QUEUE_MEMORY_MAXSIZE", 10000)),
+            "lease_seconds": float(os.getenv("QUEUE_LEASE_SECONDS", 300))
+        }
+        if config['queue']['backend'] not in ("rabbitmq", "memory", "sqlite"):
+            raise ValueError(f"QUEUE_BACKEND must be 'rabbitmq', 'memory' or 'sqlite', got '{config['queue']['backend']}'")
+
+        # asyncio runtime profile: loop implementation, default executor size, GC threshold
+        config['runtime'] = {
+            "loop": os.getenv("RUNTIME_LOOP", "auto").lower(),
+            "executor_workers": int(os.getenv("RUNTIME_EXECUTOR_WORKERS", 0)),
+            "gc_threshold": int(os.getenv("RUNTIME_GC_THRESHOLD", 0))
+        }
+
+        # Worker processes of the processing phase (1 = single event loop)
+        config['workers'] = {
+            "processes": max(int(os.getenv("WORKER_PROCESSES", 1)), 1)
+        }
+
+        # Daemon mode: re-check every pair on its blacklist's interval instead of one run per invocation
+        config['daemon'] = {
+            "enabled": os.getenv("DAEMON_ENABLED", "false").lower() == "true",
+            "interval": float(os.getenv("DAEMON_INTERVAL", 86400)),
+            "poll_seconds": float(os.getenv("DAEMON_POLL_SECONDS", 1.0))
+        }
+        if config['daemon']['interval'] <= 0:
+            raise ValueError(f"DAEMON_INTERVAL must be positive, got {config['daemon']['interval']}")
+
+        # Cross-node sharding of the IP x blacklist task space (modulo index/count or a consistent-hash ring)
+        config['sharding'] = {
+            "mode": os.getenv("SHARD_MODE", "none").lower(),
+            "index": int(os.getenv("SHARD_INDEX", 0)),
+            "count": int(os.getenv("SHARD_COUNT", 1)),
+            "nodes": [node.strip() for node in os.getenv("SHARD_NODES", "").split(",") if node.strip()],
+            "node": os.getenv("SHARD_NODE", ""),
+            "vnodes": int(os.getenv("SHARD_VNODES", 128))
+        }
+        if config['sharding']['mode'] not in SHARD_MODES:
+            raise ValueError(f"SHARD_MODE must be one of {', '.join(SHARD_MODES)}, got '{config['sharding']['mode']}'")
+        # Her düğüm kendi kuyruğunu kullanır; birinin purge'ü diğerinin görevlerini silmez
+        apply_shard_queue(config)
+
         # Logging paths
         config['logging'] = {
             "app_log_path": app_log_path,
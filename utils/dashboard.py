@@ -0,0 +1,221 @@
+import sys
+import json
+import time
+import threading
+from collections import Counter, defaultdict, deque
+from datetime import timedelta
+from rich.live import Live
+from rich.table import Table
+from rich.panel import Panel
+from rich.console import Group
+from utils.display import Display, console
+
+
+class ProgressState:
+    """
+    Aggregated run progress. Updates are plain counter increments on the event loop
+    thread; renderers read snapshots from their own thread at a fixed rate.
+    """
+
+    def __init__(self, recent_size=10):
+        self.total_tasks = 0
+        self.tasks_done = 0
+        self.started = time.monotonic()
+        self.results = Counter()
+        self.zones = defaultdict(Counter)
+        self.recent_listings = deque(maxlen=recent_size)
+
+    def start(self, total_tasks):
+        self.total_tasks = total_tasks
+        self.started = time.monotonic()
+
+    def record(self, ip, dns, result):
+        self.tasks_done += 1
+        self.results[result] += 1
+        self.zones[dns][result] += 1
+        if result == "listed":
+            self.recent_listings.append((time.strftime("%H:%M:%S"), ip, dns))
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: Progress figures: done/total, elapsed, throughput, ETA, result and zone counters.
+        """
+        elapsed = time.monotonic() - self.started
+        done = self.tasks_done
+        rate = done / elapsed if elapsed > 0 else 0.0
+        remaining = max(self.total_tasks - done, 0)
+        return {
+            "tasks_done": done,
+            "total_tasks": self.total_tasks,
+            "elapsed_s": round(elapsed, 1),
+            "tasks_per_s": round(rate, 1),
+            "eta_s": round(remaining / rate, 1) if rate > 0 else None,
+            "results": dict(self.results),
+            "zones": {zone: dict(counts) for zone, counts in list(self.zones.items())},
+            "recent_listings": list(self.recent_listings)
+        }
+
+
+class Dashboard:
+    """
+    Progress reporting for a run. The base class only aggregates; subclasses decide how
+    (and how often) the aggregate is shown.
+    """
+
+    def __init__(self, config=None):
+        self.state = ProgressState()
+
+    def start(self, total_tasks):
+        self.state.start(total_tasks)
+
+    def record(self, worker_id, ip, dns, result, status, details=None):
+        """
+        Records one processed task. Called from the hot path, so it must stay cheap.
+        """
+        self.state.record(ip, dns, result)
+
+    def stop(self):
+        pass
+
+
+class TaskPrinterDashboard(Dashboard):
+    """
+    The per-task console output (DISPLAY_MODE=tasks). Renders one rich line per task.
+    """
+
+    def record(self, worker_id, ip, dns, result, status, details=None):
+        super().record(worker_id, ip, dns, result, status, details)
+        elapsed_time = timedelta(seconds=time.monotonic() - self.state.started)
+        done, total = self.state.tasks_done, self.state.total_tasks
+        remaining = (elapsed_time / done) * (total - done) if done else timedelta(seconds=0)
+        Display.print_dns_status(
+            worker_id=worker_id,
+            tasks_done=done,
+            total_tasks=total,
+            elapsed_time=elapsed_time,
+            remaining_time=remaining,
+            ip=ip,
+            dns=dns,
+            result=result,
+            status=status,
+            details=details
+        )
+
+
+class LiveDashboard(Dashboard):
+    """
+    rich.live dashboard redrawn `refresh_per_second` times per second from rich's refresh
+    thread: progress, throughput, ETA, per-result and per-zone counters and recent listings.
+    """
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        display_config = (config or {}).get("display", {})
+        self.refresh_per_second = display_config.get("refresh_per_second", 4)
+        self.top_zones = display_config.get("top_zones", 10)
+        self._live = None
+
+    def start(self, total_tasks):
+        super().start(total_tasks)
+        self._live = Live(self, console=console, refresh_per_second=self.refresh_per_second, transient=False)
+        self._live.start()
+
+    def stop(self):
+        if self._live is not None:
+            self._live.refresh()
+            self._live.stop()
+            self._live = None
+
+    def __rich__(self):
+        snapshot = self.state.snapshot()
+        total = snapshot["total_tasks"] or 1
+        eta = snapshot["eta_s"]
+        summary = (
+            f"[cyan]{snapshot['tasks_done']}/{snapshot['total_tasks']}[/cyan] "
+            f"({snapshot['tasks_done'] / total * 100:.1f}%)  "
+            f"[blue]Elapsed: {timedelta(seconds=int(snapshot['elapsed_s']))}[/blue]  "
+            f"[magenta]ETA: {timedelta(seconds=int(eta)) if eta is not None else '-'}[/magenta]  "
+            f"[bold]{snapshot['tasks_per_s']:.1f} tasks/s[/bold]"
+        )
+
+        results = Table(title="Results", expand=True)
+        results.add_column("Result")
+        results.add_column("Count", justify="right")
+        for result, count in sorted(snapshot["results"].items(), key=lambda item: -item[1]):
+            results.add_row(result, str(count))
+
+        zones = Table(title=f"Top {self.top_zones} zones by listings", expand=True)
+        zones.add_column("Zone")
+        zones.add_column("Listed", justify="right")
+        zones.add_column("Checked", justify="right")
+        ranked = sorted(snapshot["zones"].items(), key=lambda item: (-item[1].get("listed", 0), item[0]))
+        for zone, counts in ranked[:self.top_zones]:
+            zones.add_row(zone, str(counts.get("listed", 0)), str(sum(counts.values())))
+
+        recent = Table(title="Recent listings", expand=True)
+        recent.add_column("Time")
+        recent.add_column("IP")
+        recent.add_column("Zone")
+        for row in reversed(snapshot["recent_listings"]):
+            recent.add_row(*row)
+
+        return Panel(Group(summary, results, zones, recent), title="DNSBL check")
+
+
+class HeadlessDashboard(Dashboard):
+    """
+    For non-interactive runs: writes one JSON progress line every `progress_interval`
+    seconds (and a final one on stop) from a background thread.
+    """
+
+    def __init__(self, config=None, stream=None):
+        super().__init__(config)
+        self.interval = (config or {}).get("display", {}).get("progress_interval", 5)
+        self.stream = stream or sys.stdout
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self, total_tasks):
+        super().start(total_tasks)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="progress-reporter", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self._emit("progress")
+
+    def _emit(self, event):
+        snapshot = self.state.snapshot()
+        snapshot.pop("recent_listings")
+        self.stream.write(json.dumps({"event": event, **snapshot}) + "\n")
+        self.stream.flush()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+            self._emit("finished")
+
+
+def build_dashboard(config):
+    """
+    Creates the dashboard selected by DISPLAY_MODE: live, headless, tasks (per-task lines)
+    or auto (live on a terminal, headless otherwise).
+
+    Args:
+        config: Application configuration.
+
+    Returns:
+        Dashboard: The dashboard.
+    """
+    mode = config.get("display", {}).get("mode", "auto")
+    if mode == "auto":
+        mode = "live" if console.is_terminal else "headless"
+    if mode == "tasks":
+        return TaskPrinterDashboard(config)
+    if mode == "headless":
+        return HeadlessDashboard(config)
+    return LiveDashboard(config)
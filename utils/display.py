@@ -1,8 +1,8 @@
 import os
-from rich import print
-from rich.console import Console
+from rich import print, get_console
 
-console = Console()
+# rich.print ile aynı konsol; canlı panel (rich.live) diğer çıktıları bozmadan üstüne yazar
+console = get_console()
 
 class Display:
     """Ekran kontrolü ve renkli çıktı için yardımcı sınıf."""
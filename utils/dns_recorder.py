@@ -0,0 +1,178 @@
+import gzip
+import json
+import time
+import asyncio
+import itertools
+from collections import namedtuple, defaultdict
+import aiodns
+import pycares
+
+RECORDING_VERSION = 1
+
+ReplayedA = namedtuple("ReplayedA", ("host", "ttl"))
+ReplayedTXT = namedtuple("ReplayedTXT", ("text", "ttl"))
+
+# Kayıtta okunabilirlik için c-ares kodlarının DNS karşılıkları
+RESPONSE_CODES = {
+    0: "NOERROR",
+    pycares.errno.ARES_ENOTFOUND: "NXDOMAIN",
+    pycares.errno.ARES_ENODATA: "NODATA",
+    pycares.errno.ARES_ESERVFAIL: "SERVFAIL",
+    pycares.errno.ARES_EREFUSED: "REFUSED",
+    pycares.errno.ARES_ETIMEOUT: "TIMEOUT",
+    pycares.errno.ARES_ECONNREFUSED: "CONNREFUSED",
+}
+
+
+def _answer_values(qtype, answers):
+    values, ttl = [], None
+    for answer in answers or ():
+        value = getattr(answer, "text" if qtype == "TXT" else "host", answer)
+        values.append(value.decode(errors="replace") if isinstance(value, bytes) else str(value))
+        ttl = getattr(answer, "ttl", ttl)
+    return values, ttl
+
+
+class RecordingResolver:
+    """
+    Wraps an aiodns-compatible resolver and records every query to a gzip JSON-lines file:
+    query name, type, response code (c-ares code and DNS name), answers, TTL, latency and
+    the offset of the query from the start of the recording.
+
+    Records are buffered and compressed in batches; call close() to flush the tail.
+    """
+
+    def __init__(self, resolver, path, buffer_size=1000):
+        """
+        Args:
+            resolver: Resolver whose answers are recorded.
+            path (str): Output file (.jsonl.gz).
+            buffer_size (int): Records kept in memory between writes.
+        """
+        self.resolver = resolver
+        self.nameservers = getattr(resolver, "nameservers", None)
+        self.path = path
+        self.buffer_size = buffer_size
+        self.recorded = 0
+        self._buffer = []
+        self._started = time.perf_counter()
+        self._file = gzip.open(path, "wt", compresslevel=6)
+        self._file.write(json.dumps({"version": RECORDING_VERSION, "started": time.time()}) + "\n")
+
+    async def query(self, name, qtype):
+        offset = time.perf_counter()
+        try:
+            answers = await self.resolver.query(name, qtype)
+        except aiodns.error.DNSError as e:
+            code = e.args[0] if e.args else -1
+            self._record(name, qtype, code, [], None, offset, e.args[1] if len(e.args) > 1 else str(e))
+            raise
+        values, ttl = _answer_values(qtype, answers)
+        self._record(name, qtype, 0, values, ttl, offset)
+        return answers
+
+    def _record(self, name, qtype, code, values, ttl, offset, message=None):
+        now = time.perf_counter()
+        record = {
+            "t": round((offset - self._started) * 1000, 3),
+            "n": name,
+            "q": qtype,
+            "c": code,
+            "rc": RESPONSE_CODES.get(code, "ERROR"),
+            "d": round((now - offset) * 1000, 3)
+        }
+        if values:
+            record["a"] = values
+        if ttl is not None:
+            record["ttl"] = ttl
+        if message:
+            record["m"] = message
+        self._buffer.append(record)
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer and self._file is not None:
+            self._file.write("".join(json.dumps(record, separators=(",", ":")) + "\n" for record in self._buffer))
+            self.recorded += len(self._buffer)
+            self._buffer = []
+
+    def close(self):
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+
+def read_recording(path):
+    """
+    Returns:
+        tuple[dict, list[dict]]: Header and the query records in recorded order.
+    """
+    with gzip.open(path, "rt") as f:
+        header = json.loads(f.readline())
+        if header.get("version") != RECORDING_VERSION:
+            raise ValueError(f"Unsupported DNS recording version: {header.get('version')}")
+        return header, [json.loads(line) for line in f if line.strip()]
+
+
+class ReplayResolver:
+    """
+    aiodns-compatible resolver that answers from a recording.
+
+    Each answer is returned after the recorded latency multiplied by `time_scale`
+    (0 answers immediately). A name queried several times in the recording replays its
+    answers in order and then cycles. Names that were never recorded get `missing_code`
+    (NXDOMAIN by default).
+    """
+
+    def __init__(self, path, time_scale=1.0, missing_code=pycares.errno.ARES_ENOTFOUND):
+        """
+        Args:
+            path (str): Recording written by RecordingResolver.
+            time_scale (float): Latency multiplier; 1.0 keeps the original timing.
+            missing_code (int): c-ares error raised for unrecorded queries.
+        """
+        self.path = path
+        self.time_scale = time_scale
+        self.missing_code = missing_code
+        self.nameservers = [f"replay:{path}"]
+        self.header, self.records = read_recording(path)
+        answers = defaultdict(list)
+        for record in self.records:
+            answers[(record["n"].lower(), record["q"])].append(record)
+        self._answers = {key: itertools.cycle(records) for key, records in answers.items()}
+        self.replayed = 0
+        self.missing = 0
+
+    async def query(self, name, qtype):
+        answers = self._answers.get((name.lower(), qtype))
+        if answers is None:
+            self.missing += 1
+            raise aiodns.error.DNSError(self.missing_code, pycares.errno.strerror(self.missing_code))
+        record = next(answers)
+        self.replayed += 1
+        delay = record["d"] / 1000 * self.time_scale
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if record["c"]:
+            raise aiodns.error.DNSError(record["c"], record.get("m") or pycares.errno.strerror(record["c"]))
+        ttl = record.get("ttl", 0)
+        if qtype == "TXT":
+            return [ReplayedTXT(value, ttl) for value in record.get("a", [])]
+        return [ReplayedA(value, ttl) for value in record.get("a", [])]
+
+    def targets(self):
+        """
+        Returns:
+            list[tuple[str, str]]: (ip, zone) pairs of the recorded A queries in recorded order,
+            for driving a replay with the production query mix.
+        """
+        targets = []
+        for record in self.records:
+            if record["q"] != "A":
+                continue
+            labels = record["n"].rstrip(".").split(".")
+            if len(labels) > 4:
+                targets.append((".".join(reversed(labels[:4])), ".".join(labels[4:])))
+        return targets
@@ -0,0 +1,258 @@
+import json
+import random
+import asyncio
+import hashlib
+import argparse
+import ipaddress
+import dns.flags
+import dns.rcode
+import dns.message
+import dns.rdatatype
+import dns.rrset
+
+
+class LatencyDistribution:
+    """
+    Response delay generator.
+
+    Supported specs (milliseconds):
+        {"distribution": "fixed", "ms": 5}
+        {"distribution": "uniform", "min_ms": 1, "max_ms": 20}
+        {"distribution": "exponential", "mean_ms": 10}
+        {"distribution": "lognormal", "median_ms": 10, "sigma": 0.6}
+    """
+
+    def __init__(self, spec=None, rng=None):
+        self.spec = dict(spec or {"distribution": "fixed", "ms": 0})
+        self.rng = rng or random.Random()
+        kind = self.spec.get("distribution", "fixed")
+        if kind not in ("fixed", "uniform", "exponential", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        self.kind = kind
+
+    def sample(self):
+        """
+        Returns:
+            float: Delay in seconds.
+        """
+        spec = self.spec
+        if self.kind == "fixed":
+            ms = spec.get("ms", 0)
+        elif self.kind == "uniform":
+            ms = self.rng.uniform(spec.get("min_ms", 0), spec.get("max_ms", 0))
+        elif self.kind == "exponential":
+            mean = spec.get("mean_ms", 0)
+            ms = self.rng.expovariate(1 / mean) if mean > 0 else 0
+        else:
+            ms = self.rng.lognormvariate(0, spec.get("sigma", 0.5)) * spec.get("median_ms", 0)
+        return max(ms, 0) / 1000
+
+
+class StubZone:
+    """
+    One DNSBL zone served by StubDNSServer.
+
+    An address is listed when it is in `listed` or, for the rest, when a stable hash of
+    the address falls under `listed_rate`, so large generated address sets have a known
+    listing fraction without enumerating them.
+    """
+
+    def __init__(self, name, listed=(), listed_rate=0.0, latency=None, loss_rate=0.0, servfail_rate=0.0,
+                 answer="127.0.0.2", txt=None, ttl=300):
+        """
+        Args:
+            name (str): Zone, e.g. "zen.stub.test".
+            listed (iterable[str]): Addresses that are always listed.
+            listed_rate (float): Fraction of other addresses that are listed.
+            latency (dict): LatencyDistribution spec.
+            loss_rate (float): Fraction of queries that are silently dropped.
+            servfail_rate (float): Fraction of queries answered with SERVFAIL.
+            answer (str): A record returned for listed addresses.
+            txt (str): TXT reason for listed addresses; "" publishes no TXT record.
+            ttl (int): TTL of the answers.
+        """
+        self.name = name.rstrip(".").lower()
+        self.listed = set(listed)
+        self.listed_rate = listed_rate
+        self.latency_spec = latency
+        self.loss_rate = loss_rate
+        self.servfail_rate = servfail_rate
+        self.answer = answer
+        self.txt = f"Listed by {self.name}" if txt is None else txt
+        self.ttl = ttl
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def is_listed(self, ip):
+        if ip in self.listed:
+            return True
+        if self.listed_rate <= 0:
+            return False
+        digest = hashlib.blake2b(f"{self.name}/{ip}".encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big") / 2 ** 64 < self.listed_rate
+
+
+class _StubProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.server.handle(self.transport, data, addr)
+
+
+class StubDNSServer:
+    """
+    asyncio UDP DNS server answering DNSBL queries for configured zones.
+
+    Queries outside every zone get REFUSED. Per zone it can inject latency, packet loss
+    and SERVFAIL; answers are delayed with loop.call_later so one server handles many
+    concurrent queries. Counters of every outcome are kept in `stats`.
+    """
+
+    def __init__(self, zones, host="127.0.0.1", port=0, seed=None):
+        """
+        Args:
+            zones (list[StubZone]): Served zones.
+            host (str): Bind address.
+            port (int): UDP port; 0 picks a free one (see `port` after start).
+            seed (int): Seed for loss/SERVFAIL/latency randomness.
+        """
+        self.zones = {zone.name: zone for zone in zones}
+        self.host = host
+        self.port = port
+        self.rng = random.Random(seed)
+        self.latencies = {zone.name: LatencyDistribution(zone.latency_spec, self.rng) for zone in zones}
+        self.stats = {"queries": 0, "listed": 0, "nxdomain": 0, "servfail": 0, "dropped": 0, "refused": 0, "formerr": 0}
+        self._transport = None
+        self._loop = None
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._transport, _ = await self._loop.create_datagram_endpoint(
+            lambda: _StubProtocol(self), local_addr=(self.host, self.port)
+        )
+        self.port = self._transport.get_extra_info("sockname")[1]
+        return self
+
+    def close(self):
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _find_zone(self, qname):
+        # "2.0.0.127.zen.stub.test" -> (zone, "127.0.0.2")
+        labels = qname.rstrip(".").lower().split(".")
+        for split in range(1, len(labels)):
+            zone = self.zones.get(".".join(labels[split:]))
+            if zone is not None:
+                return zone, ".".join(reversed(labels[:split]))
+        return None, None
+
+    def handle(self, transport, data, addr):
+        self.stats["queries"] += 1
+        try:
+            query = dns.message.from_wire(data)
+            question = query.question[0]
+        except Exception:
+            self.stats["formerr"] += 1
+            return
+
+        response = dns.message.make_response(query)
+        response.flags |= dns.flags.AA
+        zone, ip = self._find_zone(question.name.to_text())
+        if zone is None:
+            self.stats["refused"] += 1
+            response.set_rcode(dns.rcode.REFUSED)
+            transport.sendto(response.to_wire(), addr)
+            return
+
+        if zone.loss_rate and self.rng.random() < zone.loss_rate:
+            self.stats["dropped"] += 1
+            return
+        if zone.servfail_rate and self.rng.random() < zone.servfail_rate:
+            self.stats["servfail"] += 1
+            response.set_rcode(dns.rcode.SERVFAIL)
+        elif not _is_ipv4(ip) or not zone.is_listed(ip):
+            self.stats["nxdomain"] += 1
+            response.set_rcode(dns.rcode.NXDOMAIN)
+        else:
+            self.stats["listed"] += 1
+            if question.rdtype == dns.rdatatype.A:
+                response.answer.append(dns.rrset.from_text(question.name, zone.ttl, "IN", "A", zone.answer))
+            elif question.rdtype == dns.rdatatype.TXT and zone.txt:
+                response.answer.append(dns.rrset.from_text(question.name, zone.ttl, "IN", "TXT", f'"{zone.txt}"'))
+
+        wire = response.to_wire()
+        delay = self.latencies[zone.name].sample()
+        if delay > 0:
+            self._loop.call_later(delay, transport.sendto, wire, addr)
+        else:
+            transport.sendto(wire, addr)
+
+
+def _is_ipv4(value):
+    try:
+        return isinstance(ipaddress.ip_address(value), ipaddress.IPv4Address)
+    except ValueError:
+        return False
+
+
+def load_zones(path):
+    """
+    Reads zone definitions from a JSON file: a list of StubZone keyword dicts.
+    """
+    with open(path) as f:
+        return [StubZone.from_dict(zone) for zone in json.load(f)]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Stub DNSBL server for offline resolver tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5353)
+    parser.add_argument("--zones-file", help="JSON list of zone definitions (StubZone arguments).")
+    parser.add_argument("--zone", action="append", default=[], help="Zone name (repeatable) using the options below.")
+    parser.add_argument("--listed-rate", type=float, default=0.05)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Median latency (lognormal).")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--loss-rate", type=float, default=0.0)
+    parser.add_argument("--servfail-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    return parser.parse_args(argv)
+
+
+def zones_from_args(args):
+    zones = load_zones(args.zones_file) if args.zones_file else []
+    latency = {"distribution": "lognormal", "median_ms": args.latency_ms, "sigma": args.latency_sigma}
+    for name in args.zone or ([] if zones else ["zen.stub.test"]):
+        zones.append(StubZone(name, listed=["127.0.0.2"], listed_rate=args.listed_rate, latency=latency,
+                              loss_rate=args.loss_rate, servfail_rate=args.servfail_rate))
+    return zones
+
+
+async def serve(args):
+    server = await StubDNSServer(zones_from_args(args), args.host, args.port, args.seed).start()
+    print(f"Stub DNS server listening on {server.host}:{server.port} (zones: {', '.join(server.zones)})")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        server.close()
+        print(json.dumps(server.stats))
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(serve(parse_args()))
+    except KeyboardInterrupt:
+        pass
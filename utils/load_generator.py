@@ -0,0 +1,158 @@
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import itertools
+from collections import Counter
+from utils import runtime
+from utils.resolver import rdns_check, resolver_flags
+from utils.run_statistics import LatencyHistogram
+from utils.dns_stub_server import StubDNSServer, StubZone
+from utils.dns_recorder import RecordingResolver, ReplayResolver
+
+
+def generate_targets(zones, count, seed=None):
+    """
+    Yields `count` (ip, zone) pairs with random public-looking IPv4 addresses, cycling the zones.
+    """
+    rng = random.Random(seed)
+    zone_cycle = itertools.cycle(zones)
+    for _ in range(count):
+        ip = f"{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+        yield ip, next(zone_cycle)
+
+
+async def run_load(check, targets, concurrency=100, duration=None):
+    """
+    Drives `check(ip, zone)` over the targets with a fixed number of concurrent lookups.
+
+    Args:
+        check: Coroutine function returning a result dict with a 'result' key, e.g.
+            ProcessManager.perform_rdns_check_async or functools.partial(rdns_check, resolver).
+        targets (iterable[tuple[str, str]]): (ip, zone) pairs.
+        concurrency (int): Lookups in flight.
+        duration (float): Optional time limit in seconds.
+
+    Returns:
+        dict: Lookups, elapsed seconds, qps, result counts and latency percentiles.
+    """
+    iterator = iter(targets)
+    results = Counter()
+    histogram = LatencyHistogram()
+    started = time.perf_counter()
+    deadline = started + duration if duration else None
+
+    async def runner():
+        for ip, zone in iterator:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            lookup_start = time.perf_counter()
+            try:
+                result = (await check(ip, zone)).get("result", "unknown")
+            except Exception:
+                result = "exception"
+            histogram.record((time.perf_counter() - lookup_start) * 1000)
+            results[result] += 1
+
+    # Aynı iterator paylaşıldığı için her runner sıradaki hedefi alır
+    await asyncio.gather(*(runner() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    total = sum(results.values())
+    return {
+        "lookups": total,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "qps": round(total / elapsed, 1) if elapsed > 0 else 0.0,
+        "results": dict(results),
+        "latency_ms": {
+            "mean": round(histogram.mean, 3),
+            "p50": histogram.percentile(50),
+            "p90": histogram.percentile(90),
+            "p99": histogram.percentile(99),
+            "p999": histogram.percentile(99.9),
+            "max": histogram.max_seen / 1000
+        }
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="DNSBL lookup load generator")
+    parser.add_argument("--server", help="host:port of the DNS server to query; omit to start an embedded stub server.")
+    parser.add_argument("--zones", default="zen.stub.test", help="Comma separated DNSBL zones.")
+    parser.add_argument("--count", type=int, default=10000, help="Number of lookups.")
+    parser.add_argument("--duration", type=float, help="Stop after this many seconds.")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=2.0, help="Resolver timeout in seconds.")
+    parser.add_argument("--tries", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--listed-rate", type=float, default=0.05, help="Embedded stub: listed fraction.")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Embedded stub: median latency (lognormal).")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Embedded stub: lognormal sigma.")
+    parser.add_argument("--loss-rate", type=float, default=0.0, help="Embedded stub: dropped query fraction.")
+    parser.add_argument("--servfail-rate", type=float, default=0.0, help="Embedded stub: SERVFAIL fraction.")
+    parser.add_argument("--record", help="Record the answers to this file (.jsonl.gz).")
+    parser.add_argument("--replay", help="Replay a recording (its query mix and latencies) instead of querying a server.")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="Replay latency multiplier.")
+    parser.add_argument("--loop", choices=runtime.LOOP_IMPLEMENTATIONS, default="auto", help="Event loop implementation.")
+    return parser.parse_args(argv)
+
+
+async def main(argv=None):
+    import aiodns
+
+    args = parse_args(argv)
+    zones = [zone.strip() for zone in args.zones.split(",") if zone.strip()]
+    server = None
+    if args.replay:
+        resolver = ReplayResolver(args.replay, args.time_scale)
+        targets = resolver.targets()
+        if args.count < len(targets):
+            targets = targets[:args.count]
+        report = await run_load(lambda ip, zone: rdns_check(resolver, ip, zone), targets,
+                                concurrency=args.concurrency, duration=args.duration)
+        report.update({"replay": args.replay, "time_scale": args.time_scale, "unrecorded_queries": resolver.missing})
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return report
+
+    if args.server:
+        host, _, port = args.server.rpartition(":")
+        host, port = host or "127.0.0.1", int(port)
+    else:
+        latency = {"distribution": "lognormal", "median_ms": args.latency_ms, "sigma": args.latency_sigma}
+        server = await StubDNSServer(
+            [StubZone(zone, listed_rate=args.listed_rate, latency=latency, loss_rate=args.loss_rate,
+                      servfail_rate=args.servfail_rate) for zone in zones],
+            seed=args.seed
+        ).start()
+        host, port = server.host, server.port
+
+    # Tek sunucu: SERVFAIL enjeksiyonu sonuçlarda servfail olarak görünür
+    resolver = aiodns.DNSResolver(nameservers=[host], udp_port=port, tcp_port=port, timeout=args.timeout,
+                                  tries=args.tries, flags=resolver_flags([host]))
+    if args.record:
+        resolver = RecordingResolver(resolver, args.record)
+    try:
+        report = await run_load(
+            lambda ip, zone: rdns_check(resolver, ip, zone),
+            generate_targets(zones, args.count, args.seed),
+            concurrency=args.concurrency,
+            duration=args.duration
+        )
+    finally:
+        if server is not None:
+            server.close()
+        if args.record:
+            resolver.close()
+    report["server"] = f"{host}:{port}"
+    if server is not None:
+        report["server_stats"] = server.stats
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return report
+
+
+if __name__ == "__main__":
+    runtime.run(main(), loop=parse_args().loop)
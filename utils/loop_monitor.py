@@ -0,0 +1,296 @@
+import os
+import re
+import sys
+import json
+import time
+import asyncio
+import logging
+import threading
+from rich.table import Table
+from logB.logger import Logger
+from utils.display import Display, console
+from utils.run_statistics import LatencyHistogram
+from utils import metrics
+
+LOOP_LAG_SECONDS = metrics.histogram(
+    "dnsbl_event_loop_lag_seconds", "Scheduling lag of the event loop heartbeat.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+LOOP_LAG_MAX = metrics.gauge("dnsbl_event_loop_lag_max_seconds", "Largest event loop lag seen so far.")
+LOOP_STALLS = metrics.counter("dnsbl_event_loop_stalls_total", "Loop stalls longer than the threshold, by call site.", ("call_site",))
+LOOP_STALL_SECONDS = metrics.counter("dnsbl_event_loop_stall_seconds_total", "Time the loop was blocked, by call site.", ("call_site",))
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_HANDLE_SITE = re.compile(r"coro=<(\S+) running at ([^>]+)>")
+
+
+def _call_site(frame):
+    """
+    Returns the innermost project frame of a stack as "path:line in function"; falls back to
+    the innermost frame when the loop is blocked entirely inside a library.
+    """
+    innermost = frame
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(PROJECT_ROOT) and "site-packages" not in filename:
+            return f"{os.path.relpath(filename, PROJECT_ROOT)}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    if innermost is None:
+        return "unknown"
+    return f"{os.path.basename(innermost.f_code.co_filename)}:{innermost.f_lineno} in {innermost.f_code.co_name}"
+
+
+class _Offender:
+    __slots__ = ("count", "total_s", "max_s", "stack")
+
+    def __init__(self):
+        self.count = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self.stack = None
+
+
+class _SlowCallbackHandler(logging.Handler):
+    """
+    Receives asyncio's debug-mode "Executing <handle> took N seconds" warnings.
+    """
+
+    def __init__(self, monitor):
+        super().__init__(logging.WARNING)
+        self.monitor = monitor
+
+    def emit(self, record):
+        if record.msg.startswith("Executing ") and record.args and len(record.args) == 2:
+            handle, duration = record.args
+            # Task repr'ı kısaltılır: "coroutine() running at dosya:satır"
+            match = _HANDLE_SITE.search(str(handle))
+            site = f"{match.group(1)} at {os.path.relpath(match.group(2), PROJECT_ROOT)}" if match else str(handle)
+            self.monitor.record_slow_callback(site, float(duration))
+
+
+class LoopMonitor:
+    """
+    Event loop health monitor.
+
+    A heartbeat task sleeps `interval` seconds and measures how late it wakes up; that lag
+    is how long every other coroutine (and every in-flight DNS query) was kept waiting.
+    A watchdog thread notices when the heartbeat is overdue by more than `threshold` and
+    captures the loop thread's stack with sys._current_frames, so the blocking call is
+    attributed to the call site that was actually running. With `debug`, asyncio's own
+    slow-callback detection (loop.slow_callback_duration) is enabled as well.
+    """
+
+    def __init__(self, config):
+        """
+        Args:
+            config: Application configuration ('loop_monitor' section).
+        """
+        monitor_config = config.get("loop_monitor", {})
+        self.interval = monitor_config.get("interval", 0.05)
+        self.threshold = monitor_config.get("threshold", 0.1)
+        self.debug = monitor_config.get("debug", False)
+        self.top = monitor_config.get("top", 10)
+        self.report_path = monitor_config.get("report_path", os.path.join("logs", "loop_monitor.json"))
+        self.logger = Logger(log_file_path=config['logging']['app_log_path'])
+        self.display = Display()
+        self.lag = LatencyHistogram()
+        self.max_lag = 0.0
+        self.offenders = {}
+        self.slow_callbacks = {}
+        self._lock = threading.Lock()
+        self._loop = None
+        self._loop_thread_id = None
+        self._heartbeat_task = None
+        self._watchdog = None
+        self._stop_event = threading.Event()
+        self._last_beat = None
+        self._stall_sites = []
+        self._debug_handler = None
+
+    def start(self):
+        """
+        Starts monitoring the running loop. Must be called from a coroutine.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._heartbeat_task = self._loop.create_task(self._heartbeat())
+        self._stop_event.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        if self.debug:
+            self._loop.set_debug(True)
+            self._loop.slow_callback_duration = self.threshold
+            self._debug_handler = _SlowCallbackHandler(self)
+            logging.getLogger("asyncio").addHandler(self._debug_handler)
+        self.logger.info(f"Loop monitor started (interval {self.interval}s, threshold {self.threshold}s, debug {self.debug}).")
+        return self
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(now - expected, 0.0)
+            self._last_beat = now
+            self.lag.record(lag * 1000)
+            LOOP_LAG_SECONDS.observe(lag)
+            if lag > self.max_lag:
+                self.max_lag = lag
+                LOOP_LAG_MAX.set(lag)
+            if lag >= self.threshold:
+                self._close_stall(lag)
+
+    def _watch(self):
+        # Heartbeat gecikince loop thread'inin o anki yığını yakalanır
+        poll = min(self.interval, self.threshold) / 2
+        captured_for = None
+        while not self._stop_event.wait(poll):
+            last_beat = self._last_beat
+            if time.monotonic() - last_beat < self.interval + self.threshold or captured_for == last_beat:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            captured_for = last_beat
+            site = _call_site(frame)
+            stack = _format_stack(frame)
+            with self._lock:
+                self._stall_sites.append((site, stack))
+
+    def _close_stall(self, lag):
+        with self._lock:
+            sites, self._stall_sites = self._stall_sites, []
+        if not sites:
+            sites = [("unattributed (stall shorter than watchdog poll)", None)]
+        # Aynı duraklamada birden çok yığın yakalandıysa süre en sonuncusuna yazılır
+        site, stack = sites[-1]
+        self._add_offender(self.offenders, site, lag, stack)
+        LOOP_STALLS.labels(site).inc()
+        LOOP_STALL_SECONDS.labels(site).inc(lag)
+
+    def record_slow_callback(self, handle, duration):
+        """
+        Records a callback reported by asyncio debug mode.
+        """
+        with self._lock:
+            self._add_offender(self.slow_callbacks, handle, duration, None)
+
+    @staticmethod
+    def _add_offender(table, site, duration, stack):
+        offender = table.get(site)
+        if offender is None:
+            offender = table[site] = _Offender()
+        offender.count += 1
+        offender.total_s += duration
+        if duration > offender.max_s:
+            offender.max_s = duration
+            offender.stack = stack or offender.stack
+
+    def worst_offenders(self, table=None):
+        """
+        Returns:
+            list[dict]: Call sites ordered by total blocked time, at most `top` entries.
+        """
+        table = self.offenders if table is None else table
+        with self._lock:
+            items = list(table.items())
+        items.sort(key=lambda item: -item[1].total_s)
+        return [
+            {
+                "call_site": site,
+                "stalls": offender.count,
+                "total_ms": round(offender.total_s * 1000, 1),
+                "max_ms": round(offender.max_s * 1000, 1),
+                "stack": offender.stack
+            }
+            for site, offender in items[:self.top]
+        ]
+
+    def summary(self):
+        return {
+            "interval_s": self.interval,
+            "threshold_s": self.threshold,
+            "lag": {
+                "samples": self.lag.total_count,
+                "p50_ms": self.lag.percentile(50),
+                "p99_ms": self.lag.percentile(99),
+                "max_ms": self.lag.max_seen / 1000
+            },
+            "worst_offenders": self.worst_offenders(),
+            "slow_callbacks": self.worst_offenders(self.slow_callbacks)
+        }
+
+    async def stop(self):
+        """
+        Stops the heartbeat and watchdog, restores asyncio debug settings and writes the report.
+        """
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat_task = None
+        if self._watchdog is not None:
+            self._stop_event.set()
+            self._watchdog.join()
+            self._watchdog = None
+        if self._debug_handler is not None:
+            logging.getLogger("asyncio").removeHandler(self._debug_handler)
+            self._loop.set_debug(False)
+            self._debug_handler = None
+        self.write_report()
+
+    def write_report(self):
+        summary = self.summary()
+        os.makedirs(os.path.dirname(os.path.abspath(self.report_path)), exist_ok=True)
+        with open(self.report_path, "w") as f:
+            json.dump(summary, f, indent=2)
+        self.logger.info(f"Loop monitor report written to {self.report_path}.", details=summary["lag"])
+        return summary
+
+    def render(self):
+        """
+        Prints the lag percentiles and the worst blocking call sites.
+        """
+        summary = self.summary()
+        lag = summary["lag"]
+        self.display.print_section_header("Event Loop Health")
+        self.display.print_info(
+            f"Loop lag p50 {lag['p50_ms']:.1f} ms, p99 {lag['p99_ms']:.1f} ms, max {lag['max_ms']:.1f} ms "
+            f"({lag['samples']} heartbeats)"
+        )
+        for title, rows in (("Blocking call sites", summary["worst_offenders"]),
+                            ("Slow callbacks (asyncio debug)", summary["slow_callbacks"])):
+            if not rows:
+                continue
+            table = Table(title=title)
+            table.add_column("Call site", justify="left")
+            for column in ("Stalls", "Total ms", "Max ms"):
+                table.add_column(column, justify="right")
+            for row in rows:
+                table.add_row(row["call_site"], str(row["stalls"]), f"{row['total_ms']:.1f}", f"{row['max_ms']:.1f}")
+            console.print(table)
+
+
+def _format_stack(frame, limit=20):
+    lines = []
+    while frame is not None and len(lines) < limit:
+        code = frame.f_code
+        lines.append(f"{code.co_filename}:{frame.f_lineno} in {code.co_name}")
+        frame = frame.f_back
+    return lines
+
+
+def start_loop_monitor(config):
+    """
+    Starts the loop monitor on the running loop when LOOP_MONITOR_ENABLED is set.
+
+    Returns:
+        LoopMonitor | None: The running monitor, or None when disabled.
+    """
+    if not config.get("loop_monitor", {}).get("enabled", False):
+        return None
+    return LoopMonitor(config).start()
@@ -0,0 +1,416 @@
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logB.logger import Logger
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """
+    A metric family; children per label value combination are created on first use.
+    """
+
+    type_name = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self._new_child()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        """
+        Returns the child for the label values (positional, in labelnames order).
+        """
+        values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _samples(self):
+        if not self.labelnames:
+            yield (), self._default
+        else:
+            yield from list(self._children.items())
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for values, child in self._samples():
+            lines.extend(child.render(self.name, self.labelnames, values))
+        return lines
+
+
+class _CounterChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def render(self, name, labelnames, values):
+        return [f"{name}{_format_labels(labelnames, values)} {_format_value(self.value)}"]
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+
+class _GaugeChild:
+    def __init__(self):
+        self.value = 0.0
+        self._function = None
+        self._lock = threading.Lock()
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def set_function(self, function):
+        """
+        Computes the value at scrape time instead of on every change.
+        """
+        self._function = function
+
+    def get(self):
+        if self._function is not None:
+            try:
+                return self._function()
+            except Exception:
+                return float("nan")
+        return self.value
+
+    def render(self, name, labelnames, values):
+        return [f"{name}{_format_labels(labelnames, values)} {_format_value(self.get())}"]
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value):
+        self._default.set(value)
+
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+    def dec(self, amount=1):
+        self._default.dec(amount)
+
+    def set_function(self, function):
+        self._default.set_function(function)
+
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def merge(self, counts, total_sum):
+        """
+        Adds bucket counts and a sum observed elsewhere (another process).
+        """
+        with self._lock:
+            for index, count in enumerate(counts):
+                self.counts[index] += count
+            self.sum += total_sum
+
+    def render(self, name, labelnames, values):
+        with self._lock:
+            counts, total_sum = list(self.counts), self.sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{name}_bucket{_format_labels(labelnames, values, le)} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labelnames, values)} {_format_value(total_sum)}")
+        lines.append(f"{name}_count{_format_labels(labelnames, values)} {cumulative}")
+        return lines
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._default.observe(value)
+
+    def time(self):
+        return self._default.time()
+
+
+class MetricsRegistry:
+    """
+    Holds metric families and renders them in the text exposition format.
+
+    Registering a name twice returns the existing family, so modules can declare their
+    metrics at import time without coordinating.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} is already registered with a different type or labels.")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def snapshot(self):
+        """
+        Cumulative values of the counters and histograms, with what another process needs
+        to register the family. Gauges are left out: they describe the process that sets
+        them (queue depth, in-flight work) and do not add up across processes.
+
+        Returns:
+            dict: {name: {"type", "documentation", "labelnames", "buckets", "samples"}},
+            samples keyed by label values; a counter sample is its value, a histogram
+            sample is (bucket counts, sum).
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        snapshot = {}
+        for metric in metrics:
+            if isinstance(metric, Counter):
+                samples = {values: child.value for values, child in metric._samples()}
+            elif isinstance(metric, Histogram):
+                samples = {}
+                for values, child in metric._samples():
+                    with child._lock:
+                        samples[values] = (list(child.counts), child.sum)
+            else:
+                continue
+            snapshot[metric.name] = {
+                "type": metric.type_name,
+                "documentation": metric.documentation,
+                "labelnames": metric.labelnames,
+                "buckets": getattr(metric, "buckets", None),
+                "samples": samples
+            }
+        return snapshot
+
+    def merge(self, delta):
+        """
+        Adds a snapshot_delta of another process's registry to this one, registering the
+        families this process has not declared.
+        """
+        for name, family in delta.items():
+            if family["type"] == "counter":
+                metric = self.counter(name, family["documentation"], family["labelnames"])
+            else:
+                metric = self.histogram(name, family["documentation"], family["labelnames"], family["buckets"])
+            for values, sample in family["samples"].items():
+                child = metric.labels(*values) if metric.labelnames else metric._default
+                if family["type"] == "counter":
+                    child.inc(sample)
+                else:
+                    child.merge(*sample)
+
+    def render(self):
+        """
+        Returns:
+            str: All metrics in the text exposition format.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def counter(name, documentation, labelnames=()):
+    return REGISTRY.counter(name, documentation, labelnames)
+
+
+def gauge(name, documentation, labelnames=()):
+    return REGISTRY.gauge(name, documentation, labelnames)
+
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+    return REGISTRY.histogram(name, documentation, labelnames, buckets)
+
+
+def snapshot_delta(current, previous):
+    """
+    Returns:
+        dict: The increments between two MetricsRegistry.snapshot() results; families
+        and samples that did not change are left out.
+    """
+    delta = {}
+    for name, family in current.items():
+        before = previous.get(name, {}).get("samples", {})
+        samples = {}
+        for values, sample in family["samples"].items():
+            if family["type"] == "counter":
+                change = sample - before.get(values, 0.0)
+                if change:
+                    samples[values] = change
+            else:
+                counts, total_sum = sample
+                old_counts, old_sum = before.get(values, ([0] * len(counts), 0.0))
+                if counts != old_counts:
+                    samples[values] = ([new - old for new, old in zip(counts, old_counts)], total_sum - old_sum)
+        if samples:
+            delta[name] = dict(family, samples=samples)
+    return delta
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Her scrape için stderr'e satır yazılmasın
+        pass
+
+
+class MetricsServer:
+    """
+    Serves GET /metrics from a ThreadingHTTPServer in a daemon thread.
+    """
+
+    def __init__(self, config, registry=REGISTRY):
+        """
+        Args:
+            config: Application configuration ('metrics' section: host, port).
+            registry (MetricsRegistry): Registry to expose.
+        """
+        metrics_config = config.get("metrics", {})
+        self.host = metrics_config.get("host", "0.0.0.0")
+        self.port = metrics_config.get("port", 9108)
+        self.registry = registry
+        self.logger = Logger(log_file_path=config['logging']['app_log_path'])
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        handler = type("MetricsHandler", (_MetricsHandler,), {"registry": self.registry})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Metrics endpoint listening on http://{self.host}:{self.server_port}/metrics")
+        return self
+
+    @property
+    def server_port(self):
+        return self._server.server_address[1] if self._server else self.port
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def start_metrics_server(config):
+    """
+    Starts the /metrics endpoint when METRICS_ENABLED is set.
+
+    Returns:
+        MetricsServer | None: The running server, or None when disabled.
+    """
+    if not config.get("metrics", {}).get("enabled", False):
+        return None
+    return MetricsServer(config).start()
+
+
+# Families shared by the database layers
+DB_WRITE_SECONDS = histogram("dnsbl_db_write_duration_seconds", "Duration of batched database writes.", ("backend", "operation"))
+DB_ROWS_WRITTEN = counter("dnsbl_db_rows_written_total", "Rows written by batched database writes.", ("backend",))
+DB_WRITE_ERRORS = counter("dnsbl_db_write_errors_total", "Failed batched database writes.", ("backend", "operation"))
@@ -0,0 +1,118 @@
+import time
+import asyncio
+from database.postgre import PostgreSQL, SYNC_WATERMARK_NAME
+from logB.logger import Logger
+from utils.display import Display
+
+
+async def export_since_watermark(postgres, sqlite_manager, batch_size):
+    """
+    Async counterpart of PostgreSQL.export_results_since_watermark: SQLite is read on the
+    event loop thread (the connection belongs to it) and every PostgreSQL upsert runs in
+    the default executor.
+
+    Returns:
+        int: Number of exported rows.
+    """
+    loop = asyncio.get_running_loop()
+    last_updated, last_id = sqlite_manager.get_sync_watermark(SYNC_WATERMARK_NAME)
+    cutoff = sqlite_manager.settled_cutoff()
+    exported = 0
+    while True:
+        batch = sqlite_manager.fetch_tasks_updated_since(last_updated, last_id, batch_size, before=cutoff)
+        if not batch:
+            break
+        await loop.run_in_executor(None, postgres.upsert_results, batch)
+        last_updated, last_id = batch[-1]["last_updated"], batch[-1]["id"]
+        sqlite_manager.set_sync_watermark(SYNC_WATERMARK_NAME, last_updated, last_id)
+        exported += len(batch)
+        if len(batch) < batch_size:
+            break
+    return exported
+
+
+class PostgresSynchronizer:
+    """
+    Ships finished SQLite tasks to PostgreSQL in the background while tasks are being processed.
+
+    Rows are selected by a (last_updated, id) watermark that is persisted in SQLite,
+    so an interrupted run continues where the previous one stopped. Only rows whose
+    last_updated second has passed are exported, so a row finishing later in the same
+    second with a lower id is never skipped.
+    """
+
+    def __init__(self, sqlite_manager, config):
+        """
+        Initializes the PostgresSynchronizer.
+
+        Args:
+            sqlite_manager: SQLite TaskManager instance (source of truth and watermark store).
+            config: Configuration dictionary.
+        """
+        self.sqlite_manager = sqlite_manager
+        self.config = config
+        self.postgres = PostgreSQL(config)
+        self.interval = config["postgresql"].get("sync_interval", 5)
+        self.batch_size = config["postgresql"].get("sync_batch_size", 1000)
+        self.logger = Logger(log_file_path=config['logging']['app_log_path'])
+        self.display = Display()
+        self.exported_count = 0
+        self._stop_event = None
+        self._task = None
+
+    async def start(self):
+        """
+        Connects to PostgreSQL and starts the periodic sync loop.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.postgres.connect)
+        await loop.run_in_executor(None, self.postgres.ensure_blacklisted_tasks_table_exists)
+        self._stop_event = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        self.logger.info(f"PostgreSQL live sync started (interval: {self.interval}s, batch size: {self.batch_size}).")
+        self.display.print_success(f"✔️ PostgreSQL live sync started (every {self.interval}s).")
+
+    async def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                await self.sync_once()
+            except Exception as e:
+                error_message = f"PostgreSQL live sync failed, retrying in {self.interval}s: {e}"
+                self.logger.error(error_message, extra={"function": "_run", "file": "postgres_synchronizer.py"})
+                self.display.print_error(f"❌ {error_message}")
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def sync_once(self):
+        """
+        Exports every row past the watermark. SQLite is read on the event loop thread
+        (the connection belongs to it) and the PostgreSQL upsert runs in the default executor.
+
+        Returns:
+            int: Number of exported rows.
+        """
+        exported = await export_since_watermark(self.postgres, self.sqlite_manager, self.batch_size)
+        if exported:
+            self.exported_count += exported
+            self.logger.info(f"PostgreSQL live sync exported {exported} rows (total: {self.exported_count}).")
+        return exported
+
+    async def stop(self):
+        """
+        Stops the sync loop, exports what is left and closes the PostgreSQL connection.
+        """
+        if self._task is None:
+            return
+        self._stop_event.set()
+        await self._task
+        self._task = None
+        try:
+            # Son saniyede biten satırlar da yerleşsin
+            await asyncio.sleep(1.0 - time.time() % 1.0)
+            await self.sync_once()
+            self.logger.info(f"PostgreSQL live sync stopped, {self.exported_count} rows exported.")
+            self.display.print_success(f"✔️ PostgreSQL live sync stopped, {self.exported_count} rows exported.")
+        finally:
+            await asyncio.get_running_loop().run_in_executor(None, self.postgres.close_connection)
@@ -1,16 +1,26 @@
 import json
 import time
 import signal
-import aiodns
 import asyncio
 import aio_pika
-import ipaddress
-from aiodns import DNSResolver
 from functools import partial
 from logB.logger import Logger
 from utils.display import Display
-from datetime import datetime, timedelta
-from dns.resolver import NXDOMAIN, Timeout, NoAnswer, NoNameservers
+from utils.dashboard import build_dashboard
+from utils.run_statistics import RunStatistics
+from utils import metrics, profiler
+from utils.tracing import get_tracer, SPAN_KIND_CONSUMER
+from database.result_sink import ResultFanout, SQLiteResultSink
+from datetime import datetime, timedelta, timezone
+from utils.resolver import build_resolver, resolver_label, rdns_check
+from utils.work_queue import MemoryMessage
+
+TASKS_PROCESSED = metrics.counter("dnsbl_tasks_processed_total", "Processed DNSBL lookups by zone and result.", ("zone", "result"))
+TASKS_REMAINING = metrics.gauge("dnsbl_tasks_remaining", "Tasks of the current run that are not processed yet.")
+LOOKUPS_IN_FLIGHT = metrics.gauge("dnsbl_lookups_in_flight", "DNSBL lookups currently awaiting an answer.")
+LOOKUP_SECONDS = metrics.histogram("dnsbl_lookup_duration_seconds", "DNSBL lookup latency by result.", ("result",))
+QUEUE_MESSAGES = metrics.gauge("dnsbl_rabbitmq_queue_messages", "Messages in the task queue when last declared.", ("queue",))
+MESSAGES_CONSUMED = metrics.counter("dnsbl_rabbitmq_messages_consumed_total", "Task messages consumed from RabbitMQ.", ("queue",))
 
 class AsyncRabbitMQ:
     """
@@ -55,6 +65,19 @@ class AsyncRabbitMQ:
             self.display.print_error(f"RabbitMQ bağlantı hatası: {e}")  # Log yerine display.print_error
             raise
 
+    async def message_count(self, queue_name):
+        """
+        Kuyruktaki bekleyen mesaj sayısını döndürür (pasif declare).
+        """
+        queue_state = await self.channel.declare_queue(name=queue_name, passive=True)
+        return queue_state.declaration_result.message_count
+
+    async def open_queue(self, queue_name):
+        """
+        İşçilerin tüketeceği kuyruğu döndürür.
+        """
+        return await self.channel.declare_queue(name=queue_name, durable=False)
+
     async def close_connection(self):
         """
         RabbitMQ bağlantısını asenkron olarak kapatır.
@@ -68,9 +91,9 @@ class AsyncRabbitMQ:
             raise
 
 class Worker:
-    def __init__(self, worker_id, rabbitmq, process_task, task_tracker_lock):
+    def __init__(self, worker_id, work_queue, process_task, task_tracker_lock):
         self.worker_id = worker_id
-        self.rabbitmq = rabbitmq
+        self.work_queue = work_queue
         self.process_task = process_task
         self.running = True
         self.last_task_time = datetime.now()
@@ -82,28 +105,30 @@ class Worker:
         """
         self.running = False
 
+    @profiler.profiled("worker.run")
     async def run(self, queue_name, task_tracker):
         try:
-            self.rabbitmq.display.print_info(f"Worker {self.worker_id} başlatıldı ve kuyruğa bağlandı: {queue_name}")
-            queue = await self.rabbitmq.channel.declare_queue(name=queue_name, durable=False)
+            self.work_queue.display.print_info(f"Worker {self.worker_id} başlatıldı ve kuyruğa bağlandı: {queue_name}")
+            queue = await self.work_queue.open_queue(queue_name)
 
             async with queue.iterator() as queue_iter:
                 async for message in queue_iter:
                     if not self.running:
-                        self.rabbitmq.display.print_info(f"Worker {self.worker_id}: Durduruldu.")
+                        self.work_queue.display.print_info(f"Worker {self.worker_id}: Durduruldu.")
                         break
 
                     task_processed = False
+                    MESSAGES_CONSUMED.labels(queue_name).inc()
                     async with message.process():
                         self.last_task_time = datetime.now()
                         try:
                             await asyncio.wait_for(self.process_task(message), timeout=60)
                             task_processed = True
                         except asyncio.TimeoutError:
-                            self.rabbitmq.display.print_info(f"Worker {self.worker_id}: Görev zaman aşımına uğradı.")
+                            self.work_queue.display.print_info(f"Worker {self.worker_id}: Görev zaman aşımına uğradı.")
                             continue
                         except Exception as e:
-                            self.rabbitmq.display.print_error(f"Worker {self.worker_id}: Görev işlenirken hata oluştu: {e}")
+                            self.work_queue.display.print_error(f"Worker {self.worker_id}: Görev işlenirken hata oluştu: {e}")
                             continue
 
                     if task_processed:
@@ -111,53 +136,52 @@ class Worker:
                             is_last_task = task_tracker["tasks_done"] >= task_tracker["total_tasks"]  # Kilidi erken bırakmak için
 
                         if is_last_task:  # Kilit dışında kontrol et
-                            self.rabbitmq.display.print_info(f"Worker {self.worker_id}: Tüm işler tamamlandı. Diğer worker'lar durduruluyor.")
-                            await self.rabbitmq.process_manager.stop_workers()
+                            self.work_queue.display.print_info(f"Worker {self.worker_id}: Tüm işler tamamlandı. Diğer worker'lar durduruluyor.")
+                            await self.work_queue.process_manager.stop_workers()
                             break
 
-            self.rabbitmq.display.print_info(f"Worker {self.worker_id}: Kuyrukta iş kalmadı veya tüm görevler tamamlandı.")
+            self.work_queue.display.print_info(f"Worker {self.worker_id}: Kuyrukta iş kalmadı veya tüm görevler tamamlandı.")
         except asyncio.CancelledError:
-            self.rabbitmq.display.print_info(f"Worker {self.worker_id} iptal edildi.")
+            self.work_queue.display.print_info(f"Worker {self.worker_id} iptal edildi.")
         except Exception as e:
             error_message = f"Worker {self.worker_id} başlatılırken bir hata oluştu: {e}"
-            self.rabbitmq.display.print_error(error_message)  # Log yerine display.print_error
+            self.work_queue.display.print_error(error_message)  # Log yerine display.print_error
 
 class ProcessManager:
-    def __init__(self, sqlite_manager, config):
-        self.rabbitmq = AsyncRabbitMQ(config)
+    def __init__(self, sqlite_manager, config, result_sinks=None, resolver=None, work_queue=None):
+        # Varsayılan RabbitMQ tüketicisi; tek düğümde süreç içi kuyruk verilebilir
+        self.work_queue = work_queue or AsyncRabbitMQ(config)
         self.sqlite_manager = sqlite_manager
+        # Sonuçlar tek seferde yayınlanır, her sink kendi kuyruğundan eşzamanlı tüketir
+        self.result_fanout = ResultFanout(
+            result_sinks or [SQLiteResultSink(sqlite_manager, buffer_size=config["sqlite"].get("bulk_update_count", 500))],
+            config
+        )
         self.config = config
         self.logger = Logger(log_file_path=config["logging"]["error_log_path"])
         self.display = Display()
-        self.processed_tasks = []
+        self.dashboard = build_dashboard(config)
         self.workers = []
         self.worker_tasks = []  # Worker görevlerini saklamak için
         self.start_time = datetime.now()
         self.concurrency_limit = config["rabbitmq"].get("RABBITMQ_CONCURRENCY_LIMIT", 50)
         self.sqlite_bulk_update_count = config["sqlite"].get("bulk_update_count", 500)
         self.tasks_to_update = []
-        self.resolver = aiodns.DNSResolver()
+        # Çözümleyici dışarıdan verilebilir (stub sunucu, kayıt/tekrar oynatma)
+        self.resolver = resolver or build_resolver(config)
+        self.resolver_name = resolver_label(self.resolver)
         self.task_tracker_lock = asyncio.Lock()
 
-        # RabbitMQ'ya ProcessManager referansını ekle
-        self.rabbitmq.process_manager = self
-
-        # Event loop'u al
-        self.loop = asyncio.get_event_loop()
+        # Kuyruğa ProcessManager referansını ekle
+        self.work_queue.process_manager = self
 
         # Sinyal işleyicilerini event loop'una ekle# Sinyal işleyicilerini tanımla
         signal.signal(signal.SIGINT, self.handle_stop_signal)
         signal.signal(signal.SIGTERM, self.handle_stop_signal)
 
-        self.stats = {
-            "not_listed": 0,
-            "listed": 0,
-            "timed_out": 0,
-            "no_answer": 0,
-            "no_nameservers": 0,
-            "dns_error": 0,
-            "exception": 0
-        }
+        # Sabit boyutlu sayaçlar ve gecikme histogramları (bölge, çözümleyici, sonuç sınıfı)
+        self.run_stats = RunStatistics()
+        self.tracer = get_tracer(config)
 
     def handle_stop_signal(self, signum, frame):
         """
@@ -225,27 +249,10 @@ class ProcessManager:
             self.display.print_info("stop_workers iptal edildi.")
 
     def display_statistics(self):
-        elapsed_time = datetime.now() - self.start_time
-        total_tasks = len(self.processed_tasks)
-
-        self.display.print_info("=== Task Processing Statistics ===")
-        self.display.print_info(f"Total Tasks Processed: {total_tasks}")
-        self.display.print_info(f"Elapsed Time: {elapsed_time}")
-
-        self.display.print_info("--- Task Results ---")
-        for result, count in self.stats.items():
-            ratio = (count / total_tasks) * 100 if total_tasks > 0 else 0
-            self.display.print_info(f"{result.capitalize()}: {count} ({ratio:.2f}%)")
-
-        if total_tasks > 0:
-            avg_time_per_task = elapsed_time / total_tasks
-            self.display.print_info(f"Average Time per Task: {avg_time_per_task}")
-            self.display.print_info(f"Tasks per Second: {total_tasks / elapsed_time.total_seconds():.2f}")
-        else:
-            self.display.print_info("No tasks were processed.")
-
-        self.display.print_info("=== End of Statistics ===")
+        self.run_stats.finish()
+        self.run_stats.render(self.display)
 
+    @profiler.profiled("dns.lookup")
     async def perform_rdns_check_async(self, ip, dns):
         """
         Asenkron olarak ters DNS araması gerçekleştirir.
@@ -258,135 +265,134 @@ class ProcessManager:
             dict: Aramasonuçlarını içeren bir sözlük.
         """
         try:
-            # IP adresini doğrula
-            try:
-                ipaddress.ip_address(ip)
-            except ValueError:
-                return {"status": "invalid_ip", "result": "invalid_ip", "details": f"Invalid IP: {ip}"}
-
-            # PTR sorgusu için ters IP
-            query = f"{'.'.join(reversed(ip.split('.')))}.{dns}"
-            start_time = time.time()
-
-            try:
-                # 'A' ve 'TXT' kayıtları için asenkron sorgular
-                answers = await self.resolver.query(query, "A")
-                answer_txt = await self.resolver.query(query, "TXT")
-
-                end_time = time.time()
-                duration_ms = (end_time - start_time) * 1000
-                return {
-                    "status": "completed",
-                    "result": "listed",
-                    "details": f"{answers[0]}: {answer_txt[0]} ({duration_ms:.3f} ms)"
-                }
-
-            except (NXDOMAIN, Timeout, NoAnswer, NoNameservers, Exception) as e:
-                end_time = time.time()
-                duration_ms = (end_time - start_time) * 1000
-
-                if isinstance(e, NXDOMAIN):
-                    result = "not_listed"
-                    details = f"Query completed in {duration_ms:.3f} ms"
-                elif isinstance(e, Timeout):
-                    result = "timed_out"
-                    details = f"Query timed out in {duration_ms:.3f} ms"
-                elif isinstance(e, NoAnswer):
-                    result = "no_answer"
-                    details = f"No answer in {duration_ms:.3f} ms"
-                elif isinstance(e, NoNameservers):
-                    result = "no_nameservers"
-                    details = f"No nameservers in {duration_ms:.3f} ms"
-                else:
-                    result = "dns_error"
-                    details = f"DNS error in {duration_ms:.3f} ms: {str(e)}"
-
-                return {"status": "completed", "result": result, "details": details}
-
+            return await rdns_check(self.resolver, ip, dns)
         except Exception as e:
             error_message = f"Failed to perform RDNS check: {e}"
             self.display.print_error(error_message)  # Log yerine display.print_error
             return {"status": "exception", "result": "exception", "details": f"Exception: {str(e)}"}
 
-    async def fetch_and_process_tasks(self, queue_name):
+    async def flush_results_periodically(self):
+        """
+        Daemon modu: toplu güncelleme sınırına ulaşılmasa da biriken sonuçları her
+        flush_interval'da sink'lere gönderir; aksi halde son grup bir sonraki tura kadar bekler.
+        """
+        while True:
+            await asyncio.sleep(self.result_fanout.flush_interval)
+            if self.tasks_to_update:
+                batch, self.tasks_to_update = self.tasks_to_update, []
+                # İptal edilse bile grup tüm sink'lere ulaşsın
+                await asyncio.shield(self.result_fanout.publish(batch))
+
+    async def fetch_and_process_tasks(self, queue_name, continuous=False):
         """
         Görevleri RabbitMQ'dan alır ve işler.
+
+        Args:
+            queue_name (str): Tüketilecek kuyruk.
+            continuous (bool): Daemon modu; kuyruk hiç bitmez, işçiler yalnızca sinyal ile durur.
         """
+        flusher = None
         try:
-            await self.rabbitmq.connect(prefetch_count=min(self.concurrency_limit * 2, 100))
-            queue_state = await self.rabbitmq.channel.declare_queue(name=queue_name, passive=True)
-            total_tasks = max(queue_state.declaration_result.message_count, 1) 
+            await self.work_queue.connect(prefetch_count=min(self.concurrency_limit * 2, 100))
+            message_count = await self.work_queue.message_count(queue_name)
+            total_tasks = max(message_count, 1)
+            QUEUE_MESSAGES.labels(queue_name).set(message_count)
+            TASKS_REMAINING.set(total_tasks)
             self.display.print_success(f"Total tasks in the queue: {total_tasks}")
 
             # Görev sayısını kontrol et
-            if total_tasks <= 1:
+            if total_tasks <= 1 and not continuous:
                 self.display.print_info(f"Kuyrukta yalnızca {total_tasks} görev bulundu. İşçiler çalıştırılmadan işlem tamamlanacak.")
                 
-                # RabbitMQ bağlantısını kapat
-                await self.rabbitmq.close_connection()
+                # Kuyruk bağlantısını kapat
+                await self.work_queue.close_connection()
 
                 # Fonksiyondan çık
                 return
 
+            await self.result_fanout.start()
+            if continuous:
+                # Toplam, kuyruk dağıttıkça artar; son görev kontrolü hiç tetiklenmez
+                TASKS_REMAINING.set(0)
+                self.dashboard.start(0)
+                total_tasks = float("inf")
+                flusher = asyncio.create_task(self.flush_results_periodically())
+            else:
+                self.dashboard.start(total_tasks)
+
             # Görev takipçi
             task_tracker = {"tasks_done": 0, "total_tasks": total_tasks}  # tasks_done başlangıçta 0 olmalı
 
+            @profiler.profiled("process_task")
             async def process_task(message, worker_id):
                 try:
                     # Mesajı çöz
-                    task = json.loads(message.body)
+                    with profiler.span("process_task.decode"):
+                        task = message.task if isinstance(message, MemoryMessage) else json.loads(message.body)
                     ip = task["ip"]
                     dns = task["dns"]
 
+                    # Yalnızca örneklenmiş mesajlar trace başlığı taşır
+                    trace = self.tracer.extract(message.headers)
+                    if trace is not None:
+                        resolve_start = time.time_ns()
+                        self.tracer.record(trace, "queue_wait", trace.published_at_ns, resolve_start,
+                                           {"messaging.destination": message.routing_key or ""}, kind=SPAN_KIND_CONSUMER)
+
                     # Ters DNS kontrolünü gerçekleştir
-                    result = await self.perform_rdns_check_async(ip, dns)
+                    LOOKUPS_IN_FLIGHT.inc()
+                    try:
+                        result = await self.perform_rdns_check_async(ip, dns)
+                    finally:
+                        LOOKUPS_IN_FLIGHT.dec()
+
+                    if trace is not None:
+                        trace.enqueued_at_ns = time.time_ns()
+                        self.tracer.record(trace, "resolve", resolve_start, trace.enqueued_at_ns,
+                                           {"dns.zone": dns, "dnsbl.result": result["result"]})
+                        # buffer_wait ve persist span'leri sink yazımında kaydedilir
+                        task["_trace"] = trace
 
                     # Görevi güncelle
                     task.update({
                         "result": result["result"],
                         "status": result["status"],
-                        "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                        # SQLite'ın CURRENT_TIMESTAMP'i gibi UTC; doğrudan ve watermark yazımları aynı saati kullanır
+                        "last_updated": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
                     })
 
                     # İşlenen görevi güncelleme kuyruğuna ekle
-                    self.processed_tasks.append(task)
                     self.tasks_to_update.append(task)
-                    self.stats[result["result"]] += 1
+                    self.run_stats.record(dns, self.resolver_name, result["result"], result.get("duration_ms"))
+                    TASKS_PROCESSED.labels(dns, result["result"]).inc()
+                    TASKS_REMAINING.dec()
+                    if result.get("duration_ms") is not None:
+                        LOOKUP_SECONDS.labels(result["result"]).observe(result["duration_ms"] / 1000)
 
                     # Güncelleme sınırına ulaşıldıysa veritabanını güncelle
                     if len(self.tasks_to_update) >= self.sqlite_bulk_update_count:
-                        self.display.print_info("Kilit alınmaya çalışılıyor...")  # Kilit almadan önce log ekle
-                        async with self.task_tracker_lock:  # Güncellemeyi güvence altına alın
-                            self.display.print_info("Kilit başarıyla alındı.")  # Kilit aldıktan sonra log ekle
-                            batch = self.tasks_to_update[:self.sqlite_bulk_update_count]
-                            try:
-                                self.sqlite_manager.bulk_update_tasks(batch)
-                                del self.tasks_to_update[:self.sqlite_bulk_update_count]
-                                self.display.print_info(f"{len(batch)} görev güncellendi.")
-                            except Exception as e:
-                                self.display.print_error(f"SQLite güncelleme sırasında hata: {e}")  # Log yerine display.print_error
+                        # Listeyi await'ten önce devral; grup yalnızca bir kez yayınlanır
+                        batch, self.tasks_to_update = self.tasks_to_update, []
+                        # Worker iptal edilse bile grup tüm sink'lere ulaşsın
+                        with profiler.span("process_task.publish_results"):
+                            await asyncio.shield(self.result_fanout.publish(batch))
+                        self.logger.debug("%d görev sonuç sink'lerine gönderildi.", args=(len(batch),))
 
                     # İşlenmiş görev sayacını artır
                     async with self.task_tracker_lock:  # task_tracker güncellemesi kilit altında
                         task_tracker["tasks_done"] += 1
                         is_last_task = task_tracker["tasks_done"] >= task_tracker["total_tasks"]  # Kilidi erken bırakmak için
 
-                    elapsed_time = datetime.now() - self.start_time
-                    tasks_done = task_tracker["tasks_done"]  # Güncel tasks_done değerini kullan
-                    remaining_time = (elapsed_time / tasks_done) * (total_tasks - tasks_done) if tasks_done > 0 else timedelta(seconds=0)
-
-                    self.display.print_dns_status(
-                        worker_id=worker_id,
-                        tasks_done=tasks_done,  # Güncel tasks_done değerini kullan
-                        total_tasks=total_tasks, 
-                        elapsed_time=elapsed_time,
-                        remaining_time=remaining_time,
-                        ip=ip,
-                        dns=dns,
-                        result=result["result"],
-                        status=result["status"],
-                        details=result.get("details", None)
-                    )
+                    # Yalnızca sayaçlar güncellenir; ekran sabit aralıklarla çizilir (DISPLAY_MODE)
+                    with profiler.span("process_task.display"):
+                        self.dashboard.record(
+                            worker_id=worker_id,
+                            ip=ip,
+                            dns=dns,
+                            result=result["result"],
+                            status=result["status"],
+                            details=result.get("details", None)
+                        )
 
                     if is_last_task:  # Kilit dışında kontrol et
                         self.display.print_info(f"Worker {worker_id}: Tüm işler tamamlandı. Diğer worker'lar durduruluyor.")
@@ -401,7 +407,7 @@ class ProcessManager:
             self.workers = [
                 Worker(
                     worker_id=i + 1,
-                    rabbitmq=self.rabbitmq,
+                    work_queue=self.work_queue,
                     process_task=partial(process_task, worker_id=i + 1),  # worker_id'yi sabitle
                     task_tracker_lock=self.task_tracker_lock
                 )
@@ -423,25 +429,30 @@ class ProcessManager:
 
             # Tüm işçilerin durduğundan emin ol
             await self.ensure_stopped_workers()
+            if flusher is not None:
+                flusher.cancel()
 
-            # RabbitMQ kuyruğunda iş kalmadığından emin ol
-            queue_state = await self.rabbitmq.channel.declare_queue(name=self.rabbitmq.queue_name, passive=True)
-            if queue_state.declaration_result.message_count > 0:
+            # Kuyrukta iş kalmadığından emin ol
+            message_count = await self.work_queue.message_count(queue_name)
+            QUEUE_MESSAGES.labels(queue_name).set(message_count)
+            if message_count > 0:
                 self.display.print_warning("Kuyrukta hala bekleyen işler var, ancak tüm işçiler durduruldu.")  # Log yerine display.print_warning
 
-            # Kalan görevleri güncelle
+            # Kalan görevleri yayınla
             self.display.print_info(f"Güncelleme için bekleyen görev sayısı: {len(self.tasks_to_update)}")
-            if self.tasks_to_update:
-                try:
-                    while self.tasks_to_update:
-                        batch = self.tasks_to_update[:self.sqlite_bulk_update_count]
-                        self.display.print_info(f"Güncellenen görev sayısı: {len(batch)}")
-                        self.sqlite_manager.bulk_update_tasks(batch)
-                        self.tasks_to_update = self.tasks_to_update[self.sqlite_bulk_update_count:]
-                except Exception as e:
-                    error_message = f"Toplu güncelleme başarısız oldu: {e}"
-                    self.display.print_error(error_message)  # Log yerine display.print_error
+            batch, self.tasks_to_update = self.tasks_to_update, []
+            await self.result_fanout.publish(batch)
 
+            self.dashboard.stop()
             self.display_statistics()
         finally:  # Her zaman bağlantıyı kapat
-            await self.rabbitmq.close_connection()  # RabbitMQ bağlantısını kapat
\ No newline at end of file
+            if flusher is not None:
+                flusher.cancel()
+            self.dashboard.stop()
+            try:
+                await self.result_fanout.close()  # Sink kuyruklarını boşalt ve kapat
+            except Exception as e:
+                self.display.print_error(f"Sonuç sink'leri kapatılırken hata: {e}")
+            await self.work_queue.close_connection()  # Kuyruk bağlantısını kapat
+            if hasattr(self.resolver, "close"):
+                self.resolver.close()  # DNS kaydını diske yaz
\ No newline at end of file
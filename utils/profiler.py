@@ -0,0 +1,215 @@
+import os
+import sys
+import json
+import time
+import atexit
+import asyncio
+import functools
+import threading
+from collections import Counter
+from contextlib import nullcontext
+
+_NULL_SPAN = nullcontext()
+
+_enabled = False
+_stages = {}
+_stages_lock = threading.Lock()
+_started_ns = None
+_sampler = None
+_output_dir = None
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _record(self.name, time.perf_counter_ns() - self.start)
+        return False
+
+
+def _record(name, elapsed_ns):
+    with _stages_lock:
+        stage = _stages.get(name)
+        if stage is None:
+            _stages[name] = [1, elapsed_ns, elapsed_ns]
+        else:
+            stage[0] += 1
+            stage[1] += elapsed_ns
+            if elapsed_ns > stage[2]:
+                stage[2] = elapsed_ns
+
+
+def span(name):
+    """
+    Times a block under `name` when profiling is enabled; otherwise returns a shared no-op context.
+
+    Usage:
+        with profiler.span("sqlite.flush"):
+            ...
+    """
+    return _Span(name) if _enabled else _NULL_SPAN
+
+
+def profiled(name):
+    """
+    Decorator that wraps a function or coroutine function in a span.
+    The enabled check happens per call, so decorated code costs one global lookup when off.
+    """
+    def decorator(function):
+        if asyncio.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                if not _enabled:
+                    return await function(*args, **kwargs)
+                start = time.perf_counter_ns()
+                try:
+                    return await function(*args, **kwargs)
+                finally:
+                    _record(name, time.perf_counter_ns() - start)
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                _record(name, time.perf_counter_ns() - start)
+        return wrapper
+    return decorator
+
+
+class StackSampler:
+    """
+    Statistical sampler: every `interval` seconds it reads every thread's current frame
+    (sys._current_frames) and counts the collapsed stack. Output is the collapsed-stack
+    format understood by flamegraph.pl / speedscope ("frame;frame;frame count").
+    """
+
+    def __init__(self, interval=0.005, max_depth=64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        own_id = threading.get_ident()
+        thread_names = {}
+        while not self._stop_event.wait(self.interval):
+            if len(thread_names) != threading.active_count():
+                thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                frames = []
+                while frame is not None and len(frames) < self.max_depth:
+                    code = frame.f_code
+                    frames.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                frames.append(thread_names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(frames))] += 1
+            self.samples += 1
+
+    def write_collapsed(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def enable(sample=False, interval=0.005, output_dir="logs/profile"):
+    """
+    Turns on span timing (and optionally the stack sampler) for the rest of the process;
+    the report is written at exit.
+
+    Args:
+        sample (bool): Also run the statistical stack sampler.
+        interval (float): Sampling interval in seconds.
+        output_dir (str): Directory for the report files.
+    """
+    global _enabled, _started_ns, _sampler, _output_dir
+    if _enabled:
+        return
+    _enabled = True
+    _started_ns = time.perf_counter_ns()
+    _output_dir = output_dir
+    if sample:
+        _sampler = StackSampler(interval).start()
+    atexit.register(write_report)
+
+
+def is_enabled():
+    return _enabled
+
+
+def stage_breakdown():
+    """
+    Returns:
+        list[dict]: Per-stage call count, total/mean/max milliseconds and share of wall time,
+        ordered by total time. Stages nest (process_task contains the lookup) and concurrent
+        coroutines overlap, so shares do not add up to 100% and may exceed it.
+    """
+    wall_ns = max(time.perf_counter_ns() - (_started_ns or time.perf_counter_ns()), 1)
+    with _stages_lock:
+        stages = {name: list(values) for name, values in _stages.items()}
+    rows = []
+    for name, (count, total_ns, max_ns) in stages.items():
+        rows.append({
+            "stage": name,
+            "calls": count,
+            "total_ms": round(total_ns / 1e6, 3),
+            "mean_ms": round(total_ns / count / 1e6, 3),
+            "max_ms": round(max_ns / 1e6, 3),
+            "wall_share": round(total_ns / wall_ns, 4)
+        })
+    rows.sort(key=lambda row: -row["total_ms"])
+    return rows
+
+
+def write_report():
+    """
+    Writes stages.json, stages.txt and (with sampling) stacks.collapsed into the output directory.
+
+    Returns:
+        str | None: The output directory, or None when profiling was never enabled.
+    """
+    global _sampler
+    if not _enabled:
+        return None
+    os.makedirs(_output_dir, exist_ok=True)
+    rows = stage_breakdown()
+    wall_s = (time.perf_counter_ns() - _started_ns) / 1e9
+    with open(os.path.join(_output_dir, "stages.json"), "w") as f:
+        json.dump({"wall_s": round(wall_s, 3), "stages": rows}, f, indent=2)
+    with open(os.path.join(_output_dir, "stages.txt"), "w") as f:
+        f.write(f"Wall time: {wall_s:.3f}s\n")
+        f.write(f"{'stage':<40}{'calls':>10}{'total ms':>14}{'mean ms':>12}{'max ms':>12}{'wall %':>9}\n")
+        for row in rows:
+            f.write(f"{row['stage']:<40}{row['calls']:>10}{row['total_ms']:>14.1f}{row['mean_ms']:>12.3f}"
+                    f"{row['max_ms']:>12.1f}{row['wall_share'] * 100:>8.1f}%\n")
+    if _sampler is not None:
+        _sampler.stop()
+        _sampler.write_collapsed(os.path.join(_output_dir, "stacks.collapsed"))
+        _sampler = None
+    return _output_dir
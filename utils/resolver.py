@@ -0,0 +1,153 @@
+import time
+import aiodns
+import pycares
+import ipaddress
+from dns.resolver import NXDOMAIN, Timeout, NoAnswer, NoNameservers
+from utils.dns_recorder import RecordingResolver, ReplayResolver
+
+# c-ares hata kodlarının sonuç sınıflarına karşılığı. c-ares varsayılan olarak SERVFAIL ve
+# REFUSED yanıtlarını sunucu hatası sayıp sıradaki sunucuyu dener; hepsi tükenince
+# ARES_ECONNREFUSED (11) döner ve sonuç no_nameservers olur. servfail/refused yalnızca
+# ARES_FLAG_NOCHECKRESP ile (tek sunucu yapılandırıldığında, bkz. resolver_flags) görülür.
+ARES_RESULTS = {
+    pycares.errno.ARES_ENOTFOUND: "not_listed",
+    pycares.errno.ARES_ENODATA: "no_answer",
+    pycares.errno.ARES_ETIMEOUT: "timed_out",
+    pycares.errno.ARES_ECONNREFUSED: "no_nameservers",
+    pycares.errno.ARES_ESERVFAIL: "servfail",
+    pycares.errno.ARES_EREFUSED: "refused",
+}
+
+
+def resolver_flags(nameservers):
+    """
+    Returns the c-ares channel flags for a nameserver list.
+
+    With a single nameserver there is nothing to fail over to, so ARES_FLAG_NOCHECKRESP
+    hands SERVFAIL and REFUSED answers back as such (results servfail/refused) instead
+    of reporting them as ARES_ECONNREFUSED (no_nameservers). With several servers (or
+    resolv.conf) c-ares keeps failing over to the next server.
+
+    Args:
+        nameservers (list[str] | None): Configured nameservers.
+
+    Returns:
+        int: Flags for aiodns.DNSResolver(flags=...).
+    """
+    return pycares.ARES_FLAG_NOCHECKRESP if nameservers and len(nameservers) == 1 else 0
+
+
+def build_resolver(config):
+    """
+    Creates the resolver described by the 'resolver' config section. Without
+    RESOLVER_NAMESERVERS the system resolv.conf servers are used. RESOLVER_REPLAY_PATH
+    answers from a recording instead, and RESOLVER_RECORD_PATH records live answers.
+
+    Args:
+        config: Application configuration.
+
+    Returns:
+        aiodns.DNSResolver | RecordingResolver | ReplayResolver: The resolver.
+    """
+    resolver_config = config.get("resolver", {})
+    if resolver_config.get("replay_path"):
+        return ReplayResolver(resolver_config["replay_path"], resolver_config.get("replay_time_scale", 1.0))
+    options = {}
+    if resolver_config.get("port"):
+        options["udp_port"] = options["tcp_port"] = resolver_config["port"]
+    if resolver_config.get("timeout"):
+        options["timeout"] = resolver_config["timeout"]
+    if resolver_config.get("tries"):
+        options["tries"] = resolver_config["tries"]
+    nameservers = resolver_config.get("nameservers") or None
+    resolver = aiodns.DNSResolver(nameservers=nameservers, flags=resolver_flags(nameservers), **options)
+    if resolver_config.get("record_path"):
+        return RecordingResolver(resolver, resolver_config["record_path"])
+    return resolver
+
+
+def resolver_label(resolver):
+    """
+    Returns a short label of a resolver for statistics ("ns1,ns2" or the class name).
+    """
+    nameservers = getattr(resolver, "nameservers", None)
+    if nameservers:
+        return ",".join(nameservers)
+    return "system" if isinstance(resolver, aiodns.DNSResolver) else type(resolver).__name__
+
+
+def classify_dns_error(error):
+    """
+    Maps a lookup exception to a result class.
+
+    aiodns raises aiodns.error.DNSError(code, message) with c-ares codes; dnspython
+    based resolvers raise the dns.resolver exceptions. Both are understood.
+
+    Returns:
+        str: not_listed, no_answer, timed_out, no_nameservers, servfail, refused or dns_error.
+    """
+    if isinstance(error, aiodns.error.DNSError):
+        code = error.args[0] if error.args else None
+        return ARES_RESULTS.get(code, "dns_error")
+    if isinstance(error, NXDOMAIN):
+        return "not_listed"
+    if isinstance(error, Timeout):
+        return "timed_out"
+    if isinstance(error, NoAnswer):
+        return "no_answer"
+    if isinstance(error, NoNameservers):
+        return "no_nameservers"
+    return "dns_error"
+
+
+def _first_value(answers, attribute):
+    if not answers:
+        return ""
+    value = getattr(answers[0], attribute, answers[0])
+    return value.decode(errors="replace") if isinstance(value, bytes) else str(value)
+
+
+async def rdns_check(resolver, ip, dns):
+    """
+    Looks an IPv4 address up in a DNSBL zone.
+
+    The A query decides the listing; the TXT reason is optional, so a listed address
+    whose zone publishes no TXT record is still reported as listed.
+
+    Args:
+        resolver: Object with an aiodns-compatible `async query(name, qtype)`.
+        ip (str): IP address.
+        dns (str): DNSBL zone.
+
+    Returns:
+        dict: status, result, details and (for lookups) duration_ms.
+    """
+    try:
+        ipaddress.ip_address(ip)
+    except ValueError:
+        return {"status": "invalid_ip", "result": "invalid_ip", "details": f"Invalid IP: {ip}"}
+
+    query = f"{'.'.join(reversed(ip.split('.')))}.{dns}"
+    start_time = time.perf_counter()
+    try:
+        answers = await resolver.query(query, "A")
+    except Exception as e:
+        duration_ms = (time.perf_counter() - start_time) * 1000
+        result = classify_dns_error(e)
+        if result == "not_listed":
+            details = f"Query completed in {duration_ms:.3f} ms"
+        else:
+            details = f"{result.replace('_', ' ').capitalize()} in {duration_ms:.3f} ms: {e}"
+        return {"status": "completed", "result": result, "details": details, "duration_ms": duration_ms}
+
+    try:
+        reason = _first_value(await resolver.query(query, "TXT"), "text")
+    except Exception:
+        reason = ""
+    duration_ms = (time.perf_counter() - start_time) * 1000
+    return {
+        "status": "completed",
+        "result": "listed",
+        "details": f"{_first_value(answers, 'host')}: {reason} ({duration_ms:.3f} ms)",
+        "duration_ms": duration_ms
+    }
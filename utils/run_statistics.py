@@ -0,0 +1,272 @@
+import time
+from array import array
+from collections import Counter
+from rich.table import Table
+from utils.display import Display, console
+
+
+class LatencyHistogram:
+    """
+    Fixed-size log-linear latency histogram in the style of HdrHistogram.
+
+    Values are recorded in microseconds. Each power-of-two range is split into
+    `2 ** (sub_bucket_bits - 1)` linear sub-buckets, so the relative error of any
+    reported percentile is below 2 ** -(sub_bucket_bits - 1) (under 1.6% with the default
+    7 bits). Memory does not grow with the number of samples, and two histograms with the
+    same layout merge by adding their counts.
+    """
+
+    def __init__(self, max_value_ms=60000, sub_bucket_bits=7):
+        self.max_value_ms = max_value_ms
+        self.sub_bucket_bits = sub_bucket_bits
+        self.sub_bucket_count = 1 << sub_bucket_bits
+        self.sub_bucket_half = self.sub_bucket_count >> 1
+        self.max_value = int(max_value_ms * 1000)
+        self.counts = array("Q", [0]) * (self._index(self.max_value) + 1)
+        self.total_count = 0
+        self.total_sum = 0
+        self.min_value = None
+        self.max_seen = 0
+
+    def _index(self, value):
+        if value < self.sub_bucket_count:
+            return value
+        shift = value.bit_length() - self.sub_bucket_bits
+        sub_bucket = value >> shift
+        return self.sub_bucket_count + (shift - 1) * self.sub_bucket_half + (sub_bucket - self.sub_bucket_half)
+
+    def _value(self, index):
+        # Kovanın orta noktası döndürülür
+        if index < self.sub_bucket_count:
+            return index
+        offset = index - self.sub_bucket_count
+        shift = offset // self.sub_bucket_half + 1
+        sub_bucket = offset % self.sub_bucket_half + self.sub_bucket_half
+        return (sub_bucket << shift) + ((1 << shift) >> 1)
+
+    def record(self, value_ms, count=1):
+        """
+        Records a latency.
+
+        Args:
+            value_ms (float): Latency in milliseconds; values above max_value_ms are clamped.
+            count (int): Number of occurrences.
+        """
+        value = min(max(int(value_ms * 1000), 0), self.max_value)
+        self.counts[self._index(value)] += count
+        self.total_count += count
+        self.total_sum += value * count
+        self.min_value = value if self.min_value is None else min(self.min_value, value)
+        self.max_seen = max(self.max_seen, value)
+
+    def merge(self, other):
+        """
+        Adds the counts of a histogram with the same layout.
+        """
+        if (other.max_value, other.sub_bucket_bits) != (self.max_value, self.sub_bucket_bits):
+            raise ValueError("Histograms with different layouts cannot be merged.")
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.total_count += other.total_count
+        self.total_sum += other.total_sum
+        if other.min_value is not None:
+            self.min_value = other.min_value if self.min_value is None else min(self.min_value, other.min_value)
+        self.max_seen = max(self.max_seen, other.max_seen)
+        return self
+
+    def percentile(self, percentile):
+        """
+        Args:
+            percentile (float): 0-100.
+
+        Returns:
+            float: Latency in milliseconds at the percentile (0.0 when empty).
+        """
+        if not self.total_count:
+            return 0.0
+        target = max(1, -(-self.total_count * percentile // 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self._value(index), self.max_seen) / 1000
+        return self.max_seen / 1000
+
+    @property
+    def mean(self):
+        return self.total_sum / self.total_count / 1000 if self.total_count else 0.0
+
+    def to_dict(self):
+        """
+        Sparse, JSON-serializable form for shipping the histogram to another process.
+        """
+        return {
+            "max_value_ms": self.max_value_ms,
+            "sub_bucket_bits": self.sub_bucket_bits,
+            "counts": {index: count for index, count in enumerate(self.counts) if count},
+            "total_sum": self.total_sum,
+            "min_value": self.min_value,
+            "max_seen": self.max_seen
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data["max_value_ms"], data["sub_bucket_bits"])
+        for index, count in data["counts"].items():
+            histogram.counts[int(index)] = count
+            histogram.total_count += count
+        histogram.total_sum = data["total_sum"]
+        histogram.min_value = data["min_value"]
+        histogram.max_seen = data["max_seen"]
+        return histogram
+
+
+class RunStatistics:
+    """
+    Result counters and latency histograms of a run: overall, per DNSBL zone, per resolver
+    and per result class. Mergeable across workers and processes via merge/to_dict/from_dict.
+    """
+
+    DIMENSIONS = ("zone", "resolver", "result")
+
+    def __init__(self, max_value_ms=60000):
+        self.max_value_ms = max_value_ms
+        self.started = time.time()
+        self.finished = None
+        self.results = Counter()
+        self.overall = LatencyHistogram(max_value_ms)
+        self.histograms = {dimension: {} for dimension in self.DIMENSIONS}
+
+    def _histogram(self, dimension, key):
+        histograms = self.histograms[dimension]
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = LatencyHistogram(self.max_value_ms)
+        return histogram
+
+    def record(self, zone, resolver, result, duration_ms):
+        """
+        Records one processed task.
+
+        Args:
+            zone (str): DNSBL zone.
+            resolver (str): Resolver label.
+            result (str): Result class (listed, not_listed, timed_out, ...).
+            duration_ms (float | None): Lookup latency; None when no lookup was made.
+        """
+        self.results[result] += 1
+        if duration_ms is None:
+            return
+        self.overall.record(duration_ms)
+        self._histogram("zone", zone).record(duration_ms)
+        self._histogram("resolver", resolver).record(duration_ms)
+        self._histogram("result", result).record(duration_ms)
+
+    @property
+    def total_tasks(self):
+        return sum(self.results.values())
+
+    def finish(self):
+        self.finished = time.time()
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.time()) - self.started
+
+    def merge(self, other):
+        """
+        Adds another RunStatistics (e.g. from another worker process) into this one.
+        """
+        self.started = min(self.started, other.started)
+        if other.finished is not None:
+            self.finished = max(self.finished or other.finished, other.finished)
+        self.results.update(other.results)
+        self.overall.merge(other.overall)
+        for dimension in self.DIMENSIONS:
+            for key, histogram in other.histograms[dimension].items():
+                self._histogram(dimension, key).merge(histogram)
+        return self
+
+    def to_dict(self):
+        return {
+            "started": self.started,
+            "finished": self.finished,
+            "results": dict(self.results),
+            "overall": self.overall.to_dict(),
+            "histograms": {
+                dimension: {key: histogram.to_dict() for key, histogram in histograms.items()}
+                for dimension, histograms in self.histograms.items()
+            }
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls(data["overall"]["max_value_ms"])
+        stats.started = data["started"]
+        stats.finished = data["finished"]
+        stats.results.update(data["results"])
+        stats.overall = LatencyHistogram.from_dict(data["overall"])
+        for dimension, histograms in data["histograms"].items():
+            for key, histogram in histograms.items():
+                stats.histograms[dimension][key] = LatencyHistogram.from_dict(histogram)
+        return stats
+
+    def summary(self):
+        """
+        Returns:
+            dict: Totals, throughput and p50/p95/p99 per dimension, JSON-serializable.
+        """
+        def describe(histogram):
+            return {
+                "count": histogram.total_count,
+                "mean_ms": round(histogram.mean, 3),
+                "p50_ms": histogram.percentile(50),
+                "p95_ms": histogram.percentile(95),
+                "p99_ms": histogram.percentile(99),
+                "max_ms": histogram.max_seen / 1000
+            }
+
+        elapsed = self.elapsed
+        return {
+            "total_tasks": self.total_tasks,
+            "elapsed_s": round(elapsed, 3),
+            "tasks_per_s": round(self.total_tasks / elapsed, 2) if elapsed > 0 else 0.0,
+            "results": dict(self.results),
+            "latency": describe(self.overall),
+            **{
+                f"by_{dimension}": {key: describe(histogram) for key, histogram in sorted(histograms.items())}
+                for dimension, histograms in self.histograms.items()
+            }
+        }
+
+    def render(self, display=None):
+        """
+        Prints the end-of-run report.
+        """
+        display = display or Display()
+        summary = self.summary()
+        total_tasks = summary["total_tasks"]
+        display.print_section_header("Task Processing Statistics")
+        display.print_info(f"Total Tasks Processed: {total_tasks}")
+        display.print_info(f"Elapsed Time: {summary['elapsed_s']:.1f}s ({summary['tasks_per_s']:.2f} tasks/s)")
+        if not total_tasks:
+            display.print_info("No tasks were processed.")
+            return
+
+        for result, count in sorted(summary["results"].items(), key=lambda item: -item[1]):
+            display.print_info(f"{result.capitalize()}: {count} ({count / total_tasks * 100:.2f}%)")
+
+        table = Table(title="Lookup latency (ms)")
+        for column in ("Dimension", "Key", "Count", "p50", "p95", "p99", "Max"):
+            table.add_column(column, justify="left" if column in ("Dimension", "Key") else "right")
+
+        def add_row(dimension, key, row):
+            table.add_row(dimension, key, str(row["count"]), f"{row['p50_ms']:.1f}", f"{row['p95_ms']:.1f}",
+                          f"{row['p99_ms']:.1f}", f"{row['max_ms']:.1f}")
+
+        add_row("all", "-", summary["latency"])
+        for dimension in self.DIMENSIONS:
+            for key, row in summary[f"by_{dimension}"].items():
+                add_row(dimension, key, row)
+        console.print(table)
@@ -0,0 +1,87 @@
+import gc
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from utils.display import Display
+
+try:
+    import uvloop  # Opsiyonel: kuruluysa libuv tabanlı event loop kullanılır
+except ImportError:
+    uvloop = None
+
+LOOP_IMPLEMENTATIONS = ("auto", "uvloop", "asyncio")
+
+
+def loop_factory(name="auto"):
+    """
+    Resolves a RUNTIME_LOOP value to an event loop factory.
+
+    Args:
+        name (str): auto (uvloop when installed), uvloop or asyncio.
+
+    Returns:
+        tuple[str, callable]: Implementation name and a factory returning a new loop.
+    """
+    if name not in LOOP_IMPLEMENTATIONS:
+        raise ValueError(f"Unknown event loop implementation '{name}', expected one of {', '.join(LOOP_IMPLEMENTATIONS)}")
+    if name != "asyncio" and uvloop is not None:
+        return "uvloop", uvloop.new_event_loop
+    if name == "uvloop":
+        Display.print_warning("uvloop is not installed; falling back to the asyncio event loop.")
+    return "asyncio", asyncio.new_event_loop
+
+
+def available_loops():
+    """
+    Returns:
+        list[str]: Event loop implementations that can be used here.
+    """
+    return ["asyncio", "uvloop"] if uvloop is not None else ["asyncio"]
+
+
+def loop_name(loop=None):
+    """
+    Returns:
+        str: "uvloop" or "asyncio" for the given (default: running) loop.
+    """
+    loop = loop or asyncio.get_running_loop()
+    return "uvloop" if type(loop).__module__.startswith("uvloop") else "asyncio"
+
+
+async def _run_tuned(main, runtime_config):
+    executor_workers = runtime_config.get("executor_workers")
+    if executor_workers:
+        # Sink yazımları gibi bloklayan işler varsayılan executor'da çalışır
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=executor_workers, thread_name_prefix="dnsbl-executor")
+        )
+    return await main
+
+
+def run(main, config=None, loop=None):
+    """
+    asyncio.run() with the runtime profile of the 'runtime' config section: event loop
+    implementation (RUNTIME_LOOP), default executor size (RUNTIME_EXECUTOR_WORKERS) and
+    the generation-0 GC threshold (RUNTIME_GC_THRESHOLD).
+
+    Args:
+        main: Coroutine to run.
+        config: Application configuration (optional).
+        loop (str, optional): Overrides RUNTIME_LOOP.
+
+    Returns:
+        The coroutine's result.
+    """
+    runtime_config = (config or {}).get("runtime", {})
+    name, factory = loop_factory(loop or runtime_config.get("loop", "auto"))
+    gc_threshold = runtime_config.get("gc_threshold")
+    if gc_threshold:
+        # Çok sayıda kısa ömürlü küçük nesne: genç nesil taramalarını seyrekleştir
+        gc.set_threshold(gc_threshold, *gc.get_threshold()[1:])
+
+    if hasattr(asyncio, "Runner"):
+        with asyncio.Runner(loop_factory=factory) as runner:
+            return runner.run(_run_tuned(main, runtime_config))
+    # Python 3.10: loop_factory yok, uvloop politika ile kurulur
+    if name == "uvloop":
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return asyncio.run(_run_tuned(main, runtime_config))
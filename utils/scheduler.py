@@ -0,0 +1,251 @@
+"""
+Daemon mode: a long-running process that re-checks every IP x zone pair on its
+blacklist's interval instead of a cron-triggered one-shot run.
+
+CheckScheduler keeps the pairs in a heap keyed by next-due time. ScheduledWorkQueue
+exposes it through the consumer interface of utils.work_queue, so one ProcessManager
+(with its resolver, result sinks and database connections) consumes it for the lifetime
+of the process: due pairs are dispatched in batches, and every pair is put back into
+the heap when its lookup finishes, due again one interval later.
+"""
+import time
+import heapq
+import asyncio
+from datetime import date
+from collections import deque
+from contextlib import asynccontextmanager
+from logB.logger import Logger
+from utils.display import Display
+from utils.tracing import get_tracer
+from utils.work_queue import MemoryMessage
+from utils import metrics
+
+PAIRS_SCHEDULED = metrics.gauge("dnsbl_daemon_scheduled_pairs", "IP x zone pairs waiting in the daemon schedule.")
+SCHEDULE_LAG = metrics.gauge("dnsbl_daemon_schedule_lag_seconds", "How overdue the earliest scheduled pair was after the last dispatch.")
+PAIRS_DISPATCHED = metrics.counter("dnsbl_daemon_dispatched_total", "IP x zone pairs dispatched to the workers by the daemon.", ("zone",))
+DISPATCH_LAG = metrics.histogram("dnsbl_daemon_dispatch_lag_seconds", "Delay between a pair's due time and its dispatch.",
+                                 buckets=(0.1, 1, 5, 15, 60, 300, 900, 3600))
+
+
+class CheckScheduler:
+    """
+    Next-due priority queue of IP x zone pairs. Heap entries are
+    (due, sequence, ip, dns); the sequence keeps pairs that fall due at the same time
+    in insertion order.
+    """
+
+    def __init__(self, tasks, intervals, default_interval):
+        """
+        Args:
+            tasks (list of dict): Generated tasks (ip, dns, blacklist_name, removal_*).
+            intervals (dict): Check interval in seconds per zone.
+            default_interval (float): Interval of zones without their own.
+        """
+        self.tasks = {(task["ip"], task["dns"]): task for task in tasks}
+        self.intervals = intervals
+        self.default_interval = default_interval
+        self._heap = []
+        self._sequence = 0
+        now = time.time()
+        for ip, dns in self.tasks:
+            self.schedule(ip, dns, now)
+
+    def __len__(self):
+        return len(self._heap)
+
+    def interval(self, dns):
+        return self.intervals.get(dns, self.default_interval)
+
+    def schedule(self, ip, dns, due):
+        self._sequence += 1
+        heapq.heappush(self._heap, (due, self._sequence, ip, dns))
+        PAIRS_SCHEDULED.set(len(self._heap))
+
+    def reschedule(self, ip, dns, now=None):
+        """
+        Puts a finished pair back, due one interval of its zone from now.
+        """
+        self.schedule(ip, dns, (now or time.time()) + self.interval(dns))
+
+    def next_due(self):
+        """
+        Returns:
+            float | None: Due time of the earliest pair, None when every pair is in flight.
+        """
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now, limit):
+        """
+        Takes up to `limit` pairs whose due time has passed, earliest first.
+
+        Returns:
+            list[tuple]: (due, ip, dns) of the popped pairs.
+        """
+        due = []
+        while self._heap and self._heap[0][0] <= now and len(due) < limit:
+            due_at, _, ip, dns = heapq.heappop(self._heap)
+            due.append((due_at, ip, dns))
+        PAIRS_SCHEDULED.set(len(self._heap))
+        return due
+
+
+class ScheduledMessage(MemoryMessage):
+    """
+    A dispatched pair; leaving process() puts the pair back into the schedule, whether
+    the lookup succeeded or failed.
+    """
+
+    __slots__ = ()
+
+    @asynccontextmanager
+    async def process(self):
+        try:
+            async with super().process():
+                yield self
+        finally:
+            self._queue.work_queue.scheduler.reschedule(self.task["ip"], self.task["dns"])
+
+
+class ScheduleQueue:
+    """
+    The consumer view of the schedule: workers share a buffer of dispatched pairs and
+    the first worker that finds it empty refills it (waiting for the next due time when
+    nothing is due). Iteration only ends when the workers are stopped.
+    """
+
+    def __init__(self, work_queue, name):
+        self.work_queue = work_queue
+        self.name = name
+        self.buffer = deque()
+        self.refill_lock = asyncio.Lock()
+        self.acked = 0
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def iterator(self):
+        yield self._iterate()
+
+    async def _iterate(self):
+        while True:
+            if not self.buffer:
+                async with self.refill_lock:
+                    while not self.buffer:
+                        self.buffer.extend(await self.work_queue.dispatch())
+            task, headers = self.buffer.popleft()
+            yield ScheduledMessage(task, headers or {}, self)
+
+
+class ScheduledWorkQueue:
+    """
+    Work queue of daemon mode, fed by a CheckScheduler.
+
+    Each dispatched pair is bound to its `ip_check` row of the current day (created on
+    the first dispatch of the day), so the result sinks update that row by id and a pair
+    checked several times a day keeps its latest result. The SQLite connection, resolver
+    and sinks of the ProcessManager stay open between dispatches.
+    """
+
+    def __init__(self, scheduler, sqlite_manager, config):
+        """
+        Args:
+            scheduler (CheckScheduler): The pairs and their due times.
+            sqlite_manager (TaskManager): Task table the rows are created in.
+            config: Application configuration; uses daemon.poll_seconds.
+        """
+        self.scheduler = scheduler
+        self.sqlite_manager = sqlite_manager
+        self.config = config
+        self.poll_seconds = config.get("daemon", {}).get("poll_seconds", 1.0)
+        self.batch_size = 100
+        self.tracer = get_tracer(config)
+        self.logger = Logger(log_file_path=config['logging']['app_log_path'])
+        self.display = Display()
+        self.process_manager = None
+        self.check_date = None
+        self.task_ids = {}
+        self._queues = {}
+
+    def _bind_rows(self, pairs):
+        check_date = date.today().strftime("%Y-%m-%d")
+        if check_date != self.check_date:
+            # Gün değişti: yeni günün satırları ilk dağıtımda oluşturulur
+            self.check_date = check_date
+            self.task_ids = self.sqlite_manager.fetch_task_ids(check_date)
+        missing = [pair for pair in pairs if pair not in self.task_ids]
+        if missing:
+            self.task_ids.update(self.sqlite_manager.create_tasks(missing, check_date))
+        return self.task_ids
+
+    async def dispatch(self):
+        """
+        Waits until pairs are due and returns up to one batch of them.
+
+        Returns:
+            list[tuple]: (task, headers) of the dispatched pairs; empty after an idle poll.
+        """
+        now = time.time()
+        due = self.scheduler.pop_due(now, self.batch_size)
+        if not due:
+            next_due = self.scheduler.next_due()
+            delay = self.poll_seconds if next_due is None else min(max(next_due - now, 0), self.poll_seconds)
+            await asyncio.sleep(delay)
+            return []
+
+        task_ids = self._bind_rows([(ip, dns) for _, ip, dns in due])
+        batch = []
+        for due_at, ip, dns in due:
+            task = dict(self.scheduler.tasks[(ip, dns)], id=task_ids.get((ip, dns)), check_date=self.check_date)
+            headers = None
+            if self.tracer.enabled:
+                headers = self.tracer.inject({"messaging.destination": "daemon", "dns.zone": dns})
+            batch.append((task, headers))
+            DISPATCH_LAG.observe(now - due_at)
+            PAIRS_DISPATCHED.labels(dns).inc()
+        # Sıradaki çift de gecikmişse işçiler aralıklara yetişemiyor
+        next_due = self.scheduler.next_due()
+        SCHEDULE_LAG.set(max(now - next_due, 0) if next_due is not None else 0)
+        if self.process_manager is not None:
+            # Gösterge "işlenen / dağıtılan" olarak ilerler
+            self.process_manager.dashboard.state.total_tasks += len(batch)
+        return batch
+
+    # Tüketici tarafı (ProcessManager, Worker)
+
+    async def connect(self, prefetch_count=None):
+        if prefetch_count:
+            self.batch_size = prefetch_count
+        self.display.print_success(f"✔️ Daemon schedule ready: {len(self.scheduler)} pairs.")
+
+    async def message_count(self, queue_name):
+        """
+        Returns:
+            int: Pairs in the schedule (due or not).
+        """
+        return len(self.scheduler)
+
+    async def open_queue(self, queue_name):
+        if queue_name not in self._queues:
+            self._queues[queue_name] = ScheduleQueue(self, queue_name)
+        return self._queues[queue_name]
+
+    async def close_connection(self):
+        self._queues = {}
+
+
+def build_scheduler(config, tasks):
+    """
+    Creates the daemon schedule of the generated tasks. A blacklist's `check_interval`
+    (seconds, blacklist.yml) overrides DAEMON_INTERVAL.
+
+    Returns:
+        CheckScheduler: Every pair due immediately.
+    """
+    default_interval = config.get("daemon", {}).get("interval", 86400)
+    intervals = {}
+    for blacklist in config.get("blacklists", []):
+        interval = blacklist.get("check_interval")
+        if interval is not None:
+            if float(interval) <= 0:
+                raise ValueError(f"check_interval of {blacklist['name']} must be positive, got {interval}")
+            intervals[blacklist["dns"]] = float(interval)
+    return CheckScheduler(tasks, intervals, default_interval)
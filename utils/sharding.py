@@ -0,0 +1,163 @@
+"""
+Splitting the IP x blacklist task space across nodes.
+
+Every (ip, zone) pair is hashed with a stable hash (BLAKE2b, not Python's randomized
+hash()), so all nodes agree on the owner without talking to each other. Two schemes:
+
+- modulo: SHARD_INDEX / SHARD_COUNT. Even and cheap, but changing the count moves
+  almost every pair.
+- ring: consistent hashing over SHARD_NODES with SHARD_VNODES virtual nodes each. Adding
+  or removing one of N nodes moves only about 1/N of the pairs.
+
+Each node publishes to and consumes from its own queue (`<queue>.<shard>`) so one
+node's purge never touches another node's tasks.
+"""
+import sys
+import socket
+import bisect
+import hashlib
+import argparse
+
+SHARD_MODES = ("none", "modulo", "ring")
+
+
+def stable_hash(key):
+    """
+    Returns:
+        int: 64-bit BLAKE2b hash of the key, identical on every host and Python run.
+    """
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+def task_key(ip, dns):
+    return f"{ip}|{dns}"
+
+
+class ModuloSharding:
+    """
+    Owner = stable_hash(ip|zone) mod count.
+    """
+
+    def __init__(self, index, count):
+        if count < 1 or not 0 <= index < count:
+            raise ValueError(f"Invalid shard {index}/{count}: the index must be in [0, count).")
+        self.index = index
+        self.count = count
+        self.name = f"shard{index}"
+
+    def owner(self, ip, dns):
+        return stable_hash(task_key(ip, dns)) % self.count
+
+    def owns(self, ip, dns):
+        return self.owner(ip, dns) == self.index
+
+    def describe(self):
+        return f"shard {self.index + 1}/{self.count} (modulo)"
+
+
+class HashRing:
+    """
+    Consistent hash ring: each node gets `vnodes` points on a 64-bit ring and a pair
+    belongs to the first point clockwise from its hash.
+    """
+
+    def __init__(self, nodes, node, vnodes=128):
+        """
+        Args:
+            nodes (list[str]): All node names of the cluster.
+            node (str): This node's name; must be one of `nodes`.
+            vnodes (int): Virtual nodes per node (more = more even split).
+        """
+        nodes = sorted(set(nodes))
+        if node not in nodes:
+            raise ValueError(f"Node '{node}' is not in the ring ({', '.join(nodes)}).")
+        self.nodes = nodes
+        self.node = node
+        self.vnodes = vnodes
+        self.name = node
+        points = sorted((stable_hash(f"{name}#{replica}"), name) for name in nodes for replica in range(vnodes))
+        self._hashes = [point for point, _ in points]
+        self._owners = [name for _, name in points]
+
+    def owner(self, ip, dns):
+        position = bisect.bisect(self._hashes, stable_hash(task_key(ip, dns)))
+        return self._owners[position % len(self._owners)]
+
+    def owns(self, ip, dns):
+        return self.owner(ip, dns) == self.node
+
+    def describe(self):
+        return f"node {self.node} of {len(self.nodes)} (consistent hash ring, {self.vnodes} vnodes)"
+
+
+def build_sharding(config):
+    """
+    Creates the shard assignment of the 'sharding' config section.
+
+    Returns:
+        ModuloSharding | HashRing | None: None when sharding is off.
+    """
+    sharding_config = config.get("sharding", {})
+    mode = sharding_config.get("mode", "none")
+    if mode == "modulo":
+        return ModuloSharding(sharding_config.get("index", 0), sharding_config.get("count", 1))
+    if mode == "ring":
+        return HashRing(sharding_config.get("nodes") or [], sharding_config.get("node") or socket.gethostname(),
+                        sharding_config.get("vnodes", 128))
+    return None
+
+
+def apply_shard_queue(config):
+    """
+    Points the task queue at this node's shard queue (`<default_queue>.<shard>`).
+    """
+    sharding = build_sharding(config)
+    if sharding is not None:
+        base = config["rabbitmq"].get("default_queue", "default_queue")
+        config["rabbitmq"]["default_queue"] = f"{base}.{sharding.name}"
+    return config
+
+
+def moved_fraction(before, after, keys):
+    """
+    Returns:
+        float: Share of the (ip, dns) keys whose owner differs between two assignments.
+    """
+    moved = total = 0
+    for ip, dns in keys:
+        total += 1
+        moved += before.owner(ip, dns) != after.owner(ip, dns)
+    return moved / total if total else 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m utils.sharding",
+                                     description="Shows how a node change reassigns the task space.")
+    parser.add_argument("--nodes", required=True, help="Comma separated current nodes.")
+    parser.add_argument("--new-nodes", required=True, help="Comma separated nodes after the change.")
+    parser.add_argument("--vnodes", type=int, default=128)
+    parser.add_argument("--samples", type=int, default=100000, help="Sampled (ip, zone) pairs.")
+    args = parser.parse_args(argv)
+
+    nodes = [node.strip() for node in args.nodes.split(",") if node.strip()]
+    new_nodes = [node.strip() for node in args.new_nodes.split(",") if node.strip()]
+    keys = [(f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}", f"zone{i % 7}.test") for i in range(args.samples)]
+    before = HashRing(nodes, nodes[0], args.vnodes)
+    after = HashRing(new_nodes, new_nodes[0], args.vnodes)
+    share = {node: 0 for node in new_nodes}
+    for ip, dns in keys:
+        share[after.owner(ip, dns)] += 1
+    print(f"ring: {moved_fraction(before, after, keys) * 100:.1f}% of pairs move")
+    if len(nodes) != len(new_nodes):
+        modulo_moved = sum(
+            stable_hash(task_key(ip, dns)) % len(nodes) != stable_hash(task_key(ip, dns)) % len(new_nodes)
+            for ip, dns in keys
+        ) / len(keys)
+        print(f"modulo: {modulo_moved * 100:.1f}% of pairs move")
+    for node, count in sorted(share.items()):
+        print(f"  {node}: {count / len(keys) * 100:.1f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+import os
+import queue
+import signal
+import sqlite3
+import asyncio
+import multiprocessing
+from logB.logger import Logger
+from utils.display import Display, console
+from utils.dashboard import Dashboard, build_dashboard
+from utils.run_statistics import RunStatistics
+from utils.work_queue import build_work_queue
+from utils.loop_monitor import start_loop_monitor
+from utils import runtime
+from utils import metrics
+from database.result_sink import ResultSink, ResultFanout
+
+WORKER_PROCESSES = metrics.gauge("dnsbl_supervisor_worker_processes", "Worker processes still running under the supervisor.")
+IPC_BATCHES = metrics.counter("dnsbl_supervisor_result_batches_total", "Result batches received from worker processes.")
+
+# İşçi süreçlerin sayaç/histogram artışlarını ebeveyne gönderme aralığı (saniye)
+METRICS_SHIP_INTERVAL = 1.0
+
+# İşçi süreçten ebeveyne giden mesaj türleri
+MSG_READY = "ready"
+MSG_RESULTS = "results"
+MSG_STATS = "stats"
+MSG_METRICS = "metrics"
+MSG_ERROR = "error"
+MSG_EXIT = "exit"
+
+
+class PipeResultSink(ResultSink):
+    """
+    Worker-process side of the result path: ships each batch to the supervisor, which
+    writes it through the real sinks. Trace contexts travel along, so the supervisor's
+    sinks record their own persist spans.
+    """
+
+    name = "IPC"
+
+    def __init__(self, channel, index, buffer_size=200, queue_size=8):
+        super().__init__(buffer_size, queue_size)
+        self.channel = channel
+        self.index = index
+
+    async def write_batch(self, batch):
+        self.channel.put((MSG_RESULTS, self.index, batch))
+
+
+def worker_path(path, index):
+    """
+    Returns:
+        str: `path` with `.worker<index>` before its extension; two-part extensions
+        (traces.otlp.json, dns.jsonl.gz) are kept together.
+    """
+    root, ext = os.path.splitext(path)
+    inner_root, inner_ext = os.path.splitext(root)
+    if inner_ext in (".otlp", ".jsonl"):
+        root, ext = inner_root, inner_ext + ext
+    return f"{root}.worker{index}{ext}"
+
+
+def worker_process_config(config, index):
+    """
+    Returns:
+        dict: The configuration of worker process `index`; trace spans, recorded DNS
+        answers and the loop monitor report go to files of their own so processes never
+        interleave writes (a gzip stream written by two processes is unreadable).
+    """
+    child_config = dict(config)
+    tracing = dict(config.get("tracing", {}))
+    if tracing.get("export_path"):
+        tracing["export_path"] = worker_path(tracing["export_path"], index)
+    child_config["tracing"] = tracing
+    loop_monitor = dict(config.get("loop_monitor", {}))
+    if loop_monitor.get("report_path"):
+        loop_monitor["report_path"] = worker_path(loop_monitor["report_path"], index)
+    child_config["loop_monitor"] = loop_monitor
+    resolver = dict(config.get("resolver", {}))
+    if resolver.get("record_path"):
+        resolver["record_path"] = worker_path(resolver["record_path"], index)
+    child_config["resolver"] = resolver
+    return child_config
+
+
+def run_worker_process(index, config, channel, stop_event):
+    """
+    Entry point of a worker process: its own event loop, queue consumer, resolver and
+    ProcessManager; results and final statistics go to the supervisor over `channel`.
+    """
+    # Çıktıyı ebeveyn üretir; SIGINT süreç grubuna gider, durdurmayı ebeveyn yönetir
+    console.quiet = True
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        runtime.run(_worker_process(index, config, channel, stop_event), config)
+    except Exception as e:
+        channel.put((MSG_ERROR, index, str(e)))
+    finally:
+        channel.put((MSG_EXIT, index, None))
+
+
+async def _worker_process(index, config, channel, stop_event):
+    from utils.process_manager import ProcessManager
+
+    sqlite_manager = None
+    if config.get("queue", {}).get("backend") == "sqlite":
+        from database.task_manager import TaskManager
+        sqlite_manager = TaskManager(sqlite3.connect(config["sqlite"]["db_path"]), config)
+
+    process_manager = ProcessManager(
+        sqlite_manager=sqlite_manager,
+        config=config,
+        result_sinks=[PipeResultSink(channel, index)],
+        work_queue=build_work_queue(config, sqlite_manager)
+    )
+    process_manager.dashboard = Dashboard(config)
+    # ProcessManager SIGINT/SIGTERM'e bağlanır; işçi süreçte yalnızca ebeveynin sinyali geçerli
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    async def watch_stop():
+        while not stop_event.is_set():
+            await asyncio.sleep(0.2)
+        await process_manager.stop_workers()
+
+    shipped = {}
+
+    def ship_metrics():
+        # Yalnızca son gönderimden beri artan sayaç/histogram değerleri gider
+        nonlocal shipped
+        snapshot = metrics.REGISTRY.snapshot()
+        delta = metrics.snapshot_delta(snapshot, shipped)
+        if delta:
+            channel.put((MSG_METRICS, index, delta))
+        shipped = snapshot
+
+    async def ship_metrics_periodically():
+        while True:
+            await asyncio.sleep(METRICS_SHIP_INTERVAL)
+            ship_metrics()
+
+    metrics_enabled = config.get("metrics", {}).get("enabled", False)
+    loop_monitor = start_loop_monitor(config)
+    watcher = asyncio.create_task(watch_stop())
+    shipper = asyncio.create_task(ship_metrics_periodically()) if metrics_enabled else None
+    channel.put((MSG_READY, index, os.getpid()))
+    try:
+        await process_manager.fetch_and_process_tasks(config["rabbitmq"]["default_queue"])
+    finally:
+        watcher.cancel()
+        if loop_monitor:
+            await loop_monitor.stop()
+        if shipper is not None:
+            shipper.cancel()
+            ship_metrics()
+        process_manager.run_stats.finish()
+        channel.put((MSG_STATS, index, process_manager.run_stats.to_dict()))
+        if sqlite_manager is not None:
+            sqlite_manager.conn.close()
+
+
+class Supervisor:
+    """
+    Runs ProcessManager in N worker processes and aggregates them.
+
+    Every worker process consumes the shared queue (RabbitMQ or the SQLite lease queue)
+    with its own event loop, broker channel and resolver. The supervisor receives result
+    batches over one multiprocessing queue and writes them through the configured sinks,
+    so SQLite keeps a single writer; it drives the combined dashboard, stops all workers
+    once the queue count seen at start is processed (or on SIGINT), and merges the
+    per-process RunStatistics into one report. With METRICS_ENABLED the workers ship
+    their counter and histogram increments every METRICS_SHIP_INTERVAL seconds and the
+    supervisor adds them to its own /metrics; gauges stay per process.
+    """
+
+    def __init__(self, sqlite_manager, config, result_sinks, processes):
+        """
+        Args:
+            sqlite_manager: SQLite TaskManager of the supervisor (queue count for the sqlite backend).
+            config: Application configuration.
+            result_sinks (list[ResultSink]): Sinks written by the supervisor.
+            processes (int): Number of worker processes.
+        """
+        self.sqlite_manager = sqlite_manager
+        self.config = config
+        self.processes = processes
+        self.result_fanout = ResultFanout(result_sinks, config)
+        self.dashboard = build_dashboard(config)
+        self.run_stats = RunStatistics()
+        self.logger = Logger(log_file_path=config['logging']['app_log_path'])
+        self.display = Display()
+        self.context = multiprocessing.get_context("spawn")
+        self.channel = None
+        self.stop_event = None
+        self.workers = []
+
+    async def _queue_size(self, queue_name):
+        work_queue = build_work_queue(self.config, self.sqlite_manager)
+        if work_queue is None:
+            from utils.process_manager import AsyncRabbitMQ
+            work_queue = AsyncRabbitMQ(self.config)
+            await work_queue.connect(prefetch_count=1)
+            try:
+                return await work_queue.message_count(queue_name)
+            finally:
+                await work_queue.close_connection()
+        return await work_queue.message_count(queue_name)
+
+    def handle_stop_signal(self, signum, frame):
+        self.display.print_info(f"Sinyal alındı: {signum}. Tüm işçi süreçler durdurulacak.")
+        if self.stop_event is not None:
+            self.stop_event.set()
+
+    async def run(self, queue_name):
+        """
+        Starts the worker processes and returns when all of them have exited.
+        """
+        if self.config.get("queue", {}).get("backend") == "memory":
+            raise ValueError("QUEUE_BACKEND=memory is process-local and cannot feed worker processes.")
+
+        total_tasks = await self._queue_size(queue_name)
+        self.display.print_success(f"Total tasks in the queue: {total_tasks}")
+        if total_tasks < 1:
+            self.display.print_info("Kuyrukta görev yok. İşçi süreçler başlatılmadan işlem tamamlanacak.")
+            return
+
+        self.channel = self.context.Queue()
+        self.stop_event = self.context.Event()
+        signal.signal(signal.SIGINT, self.handle_stop_signal)
+        signal.signal(signal.SIGTERM, self.handle_stop_signal)
+
+        for index in range(1, self.processes + 1):
+            worker = self.context.Process(
+                target=run_worker_process,
+                args=(index, worker_process_config(self.config, index), self.channel, self.stop_event),
+                name=f"dnsbl-worker-{index}"
+            )
+            worker.start()
+            self.workers.append(worker)
+        WORKER_PROCESSES.set(len(self.workers))
+        self.display.print_info(f"{self.processes} işçi süreç başlatıldı.")
+
+        await self.result_fanout.start()
+        self.dashboard.start(total_tasks)
+        try:
+            await self._collect(total_tasks)
+        finally:
+            self.stop_event.set()
+            for worker in self.workers:
+                await asyncio.get_running_loop().run_in_executor(None, worker.join, 10)
+                if worker.is_alive():
+                    self.display.print_warning(f"{worker.name} durmadı, sonlandırılıyor.")
+                    worker.terminate()
+            WORKER_PROCESSES.set(0)
+            self.dashboard.stop()
+            await self.result_fanout.close()
+        self.display_statistics()
+
+    async def _collect(self, total_tasks):
+        loop = asyncio.get_running_loop()
+        running = {index + 1 for index in range(len(self.workers))}
+        tasks_done = 0
+        while running:
+            try:
+                kind, index, payload = await loop.run_in_executor(None, self.channel.get, True, 0.5)
+            except queue.Empty:
+                # Mesaj göndermeden ölen süreçler (ör. SIGKILL)
+                for worker_index in list(running):
+                    worker = self.workers[worker_index - 1]
+                    if not worker.is_alive() and worker.exitcode not in (None, 0):
+                        self.display.print_error(f"{worker.name} beklenmedik şekilde sonlandı (exit code {worker.exitcode}).")
+                        running.discard(worker_index)
+                        self.stop_event.set()
+                continue
+
+            if kind == MSG_RESULTS:
+                IPC_BATCHES.inc()
+                for task in payload:
+                    self.dashboard.record(worker_id=index, ip=task["ip"], dns=task["dns"],
+                                          result=task["result"], status=task["status"])
+                await self.result_fanout.publish(payload)
+                tasks_done += len(payload)
+                if tasks_done >= total_tasks and not self.stop_event.is_set():
+                    self.display.print_info("Tüm işler tamamlandı. İşçi süreçler durduruluyor.")
+                    self.stop_event.set()
+            elif kind == MSG_STATS:
+                self.run_stats.merge(RunStatistics.from_dict(payload))
+            elif kind == MSG_METRICS:
+                metrics.REGISTRY.merge(payload)
+            elif kind == MSG_READY:
+                self.logger.info(f"Worker process {index} started (pid {payload}).")
+            elif kind == MSG_ERROR:
+                self.logger.error(f"Worker process {index} failed: {payload}", extra={"function": "_collect", "file": "supervisor.py"})
+                self.display.print_error(f"❌ Worker process {index} failed: {payload}")
+            elif kind == MSG_EXIT:
+                running.discard(index)
+                WORKER_PROCESSES.set(len(running))
+
+    def display_statistics(self):
+        self.run_stats.finish()
+        self.run_stats.render(self.display)
@@ -3,6 +3,7 @@ import yaml
 from utils.config_manager import load_config
 from logB.logger import Logger
 from utils.display import Display
+from utils.sharding import build_sharding
 
 
 class TaskGenerator:
@@ -10,12 +11,14 @@ class TaskGenerator:
     A utility class for generating task lists from IP/CIDR blocks and blacklist configurations.
     """
 
-    def __init__(self):
+    def __init__(self, config=None):
         # Initialize logger and display
-        config = load_config()
+        config = config or load_config()
+        self.config = config
         self.logger = Logger(log_file_path=config['logging']['app_log_path'])
         self.error_logger = Logger(log_file_path=config['logging']['error_log_path'])
         self.display = Display()
+        self.sharding = build_sharding(config)
 
     def parse_ip_list(self, file_path):
         """
@@ -62,7 +65,7 @@ class TaskGenerator:
             list: A list of blacklist configurations.
         """
         try:
-            config = load_config()
+            config = self.config
             if "blacklists" not in config:
                 raise KeyError("Blacklist configuration is missing in the config file.")
             self.logger.info("Blacklist configuration loaded successfully.")
@@ -78,9 +81,35 @@ class TaskGenerator:
             self.display.print_error(f"\u274c {error_message}")
             return []
 
+    def iter_tasks(self, ip_list, blacklist_list):
+        """
+        Yields the tasks of generate_task_list one at a time, so callers that only need
+        part of a large IP x blacklist product never build the whole list.
+
+        Args:
+            ip_list (iterable): /32 IP addresses.
+            blacklist_list (list): List of blacklist configurations.
+
+        Yields:
+            dict: Task of one (ip, blacklist) pair owned by this node.
+        """
+        owns = self.sharding.owns if self.sharding else None
+        for ip in ip_list:
+            for blacklist in blacklist_list:
+                if owns is not None and not owns(ip, blacklist["dns"]):
+                    continue
+                yield {
+                    "ip": ip,
+                    "blacklist_name": blacklist["name"],
+                    "dns": blacklist["dns"],
+                    "removal_link": blacklist["removal_link"],
+                    "removal_method": blacklist["removal_method"]
+                }
+
     def generate_task_list(self, ip_list, blacklist_list):
         """
-        Generates all possible tasks for given IPs and blacklists.
+        Generates all possible tasks for given IPs and blacklists; with sharding enabled
+        only the pairs owned by this node.
 
         Args:
             ip_list (list): List of /32 IP addresses.
@@ -90,16 +119,11 @@ class TaskGenerator:
             list: A list of dictionaries representing tasks.
         """
         try:
-            task_list = []
-            for ip in ip_list:
-                for blacklist in blacklist_list:
-                    task_list.append({
-                        "ip": ip,
-                        "blacklist_name": blacklist["name"],
-                        "dns": blacklist["dns"],
-                        "removal_link": blacklist["removal_link"],
-                        "removal_method": blacklist["removal_method"]
-                    })
+            task_list = list(self.iter_tasks(ip_list, blacklist_list))
+            if self.sharding:
+                total = len(ip_list) * len(blacklist_list)
+                self.logger.info(f"Sharding {self.sharding.describe()}: {len(task_list)} of {total} tasks belong to this node.")
+                self.display.print_info(f"Sharding {self.sharding.describe()}: {len(task_list)} of {total} tasks belong to this node.")
             self.logger.info(f"Generated {len(task_list)} tasks.")
             self.display.print_success(f"\u2714\ufe0f Generated {len(task_list)} tasks.")
             return task_list
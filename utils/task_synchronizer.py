@@ -1,41 +1,76 @@
+import time
 from datetime import datetime
 from utils.display import Display
 from logB.logger import Logger
+from utils import metrics
+from utils.tracing import get_tracer
+from utils.sharding import build_sharding
+
+PENDING_TASKS = metrics.gauge("dnsbl_task_sync_pending_tasks", "Pending tasks found in SQLite by the last synchronization.")
+PUBLISHED_TASKS = metrics.gauge("dnsbl_task_sync_published_tasks", "Tasks published to RabbitMQ by the last synchronization.")
+HANDED_OVER_TASKS = metrics.counter("dnsbl_task_sync_handed_over_tasks_total", "Pending tasks dropped from SQLite because another shard owns them.")
+PUBLISH_ERRORS = metrics.counter("dnsbl_task_sync_publish_errors_total", "Task batches that failed to publish during synchronization.")
+SYNC_SECONDS = metrics.histogram("dnsbl_task_sync_duration_seconds", "Duration of a full task synchronization.", buckets=(1, 5, 15, 30, 60, 120, 300, 600))
 
 
 class TaskSynchronizer:
     """
-    Synchronizes tasks between in-memory tasks, SQLite, and RabbitMQ.
+    Synchronizes tasks between in-memory tasks, SQLite, and the task queue.
     """
 
-    def __init__(self, sqlite_manager, rabbitmq, in_memory_tasks, config, active_db_manager):
+    def __init__(self, sqlite_manager, work_queue, in_memory_tasks, config, active_db_manager):
         """
         Initializes the TaskSynchronizer.
 
         Args:
             sqlite_manager: SQLite manager instance.
-            rabbitmq: RabbitMQ manager instance.
+            work_queue: Task queue publisher (RabbitMQ or the in-process MemoryWorkQueue).
             in_memory_tasks: List of in-memory tasks (combinations).
             config: Configuration dictionary.
             active_db_manager: Active database manager instance for cross-checking.
         """
         self.sqlite_manager = sqlite_manager
-        self.rabbitmq = rabbitmq
+        self.work_queue = work_queue
         self.in_memory_tasks = in_memory_tasks
         self.config = config
         self.active_db_manager = active_db_manager
         self.logger = Logger(log_file_path=config['logging']['app_log_path'])
         self.error_logger = Logger(log_file_path=config['logging']['error_log_path'])
         self.display = Display()
+        self.tracer = get_tracer(config)
+        self.sharding = build_sharding(config)
+
+    def drop_foreign_tasks(self, sqlite_tasks):
+        """
+        Removes today's pending rows that another shard owns (after a membership
+        change), so this node neither publishes nor counts them.
+
+        Returns:
+            list[dict]: The tasks of this node's shard.
+        """
+        owned, foreign = [], []
+        for task in sqlite_tasks:
+            if self.sharding.owns(task["ip"], task["dns"]):
+                owned.append(task)
+            elif task["status"] == "pending":
+                foreign.append((task["ip"], task["dns"]))
+        if foreign:
+            self.sqlite_manager.delete_pending_tasks(foreign)
+            HANDED_OVER_TASKS.inc(len(foreign))
+            self.display.print_info(f"ℹ️ Sharding: dropped {len(foreign)} pending tasks now owned by other nodes.")
+            self.logger.info(f"Sharding: dropped {len(foreign)} pending tasks now owned by other nodes.")
+        return owned
 
     async def synchronize(self):
         """
-        Synchronizes tasks between SQLite and RabbitMQ.
+        Synchronizes tasks between SQLite and the task queue.
         """
         today_date = datetime.now().strftime("%Y-%m-%d")
         queue_name = self.config["rabbitmq"].get("default_queue", "default_queue")
         total_tasks_count = len(self.in_memory_tasks)
 
+        started = time.perf_counter()
+
         # Step 1: Display and log total tasks generated
         self.display.print_success(f"✔️ Total tasks generated: {total_tasks_count}")
         self.logger.info(f"✔️ Total tasks generated: {total_tasks_count}")
@@ -43,6 +78,8 @@ class TaskSynchronizer:
         try:
             # Step 2: Fetch tasks for today from SQLite
             sqlite_tasks = self.sqlite_manager.fetch_tasks_by_date(today_date)
+            if self.sharding:
+                sqlite_tasks = self.drop_foreign_tasks(sqlite_tasks)
             sqlite_task_set = set((task["ip"], task["dns"]) for task in sqlite_tasks)
 
             # Step 3: Compare SQLite tasks with in-memory tasks
@@ -60,6 +97,8 @@ class TaskSynchronizer:
 
                 # Verify insertion
                 sqlite_tasks = self.sqlite_manager.fetch_tasks_by_date(today_date)  # Yeniden sorgula
+                if self.sharding:
+                    sqlite_tasks = [task for task in sqlite_tasks if self.sharding.owns(task["ip"], task["dns"])]
                 pending_tasks_in_sqlite = [
                     task for task in sqlite_tasks if task["status"] == "pending"
                 ]
@@ -69,22 +108,23 @@ class TaskSynchronizer:
                 self.display.print_info("ℹ️ SQLite: No missing tasks found.")
                 self.logger.info("ℹ️ SQLite: No missing tasks found.")
 
-            # Step 4: Clear RabbitMQ queue
-            self.logger.info("ℹ️ Clearing RabbitMQ queue...")
-            self.rabbitmq.clear_queue(queue_name)
-            self.logger.info(f"✔️ RabbitMQ queue '{queue_name}' cleared successfully.")
+            # Step 4: Clear the task queue
+            self.logger.info("ℹ️ Clearing task queue...")
+            self.work_queue.clear_queue(queue_name)
+            self.logger.info(f"✔️ Task queue '{queue_name}' cleared successfully.")
 
 
-            # Step 5: Add tasks to RabbitMQ in batches
+            # Step 5: Add tasks to the queue in batches
             pending_tasks_in_sqlite = [
                 task for task in sqlite_tasks if task["status"] == "pending"
             ]
             pending_tasks_count = len(pending_tasks_in_sqlite)  # Pending task sayısını al
+            PENDING_TASKS.set(pending_tasks_count)
             self.display.print_info(f"ℹ️ SQLite: Found {pending_tasks_count} pending tasks.")
             self.logger.info(f"ℹ️ SQLite: Found {pending_tasks_count} pending tasks.")
 
 
-            batch_size = 10000  # Batch size for publishing tasks to RabbitMQ
+            batch_size = 10000  # Batch size for publishing tasks to the queue
             total_batches = (len(pending_tasks_in_sqlite) + batch_size - 1) // batch_size
             published_tasks_count = 0
 
@@ -93,7 +133,7 @@ class TaskSynchronizer:
                     start_idx = i * batch_size
                     end_idx = min(start_idx + batch_size, len(pending_tasks_in_sqlite))
                     batch = pending_tasks_in_sqlite[start_idx:end_idx]
-                    self.rabbitmq.publish_task(queue_name, batch)
+                    self.work_queue.publish_task(queue_name, batch, tracer=self.tracer)
 
                     # Log batch progress
                     batch_count = len(batch)
@@ -101,9 +141,11 @@ class TaskSynchronizer:
                     self.display.print_info(f"✔️ Batch {i + 1}/{total_batches}: {batch_count} tasks added.")
                     published_tasks_count += batch_count
                 except Exception as batch_error:
+                    PUBLISH_ERRORS.inc()
                     error_message = f"Error in batch {i + 1}/{total_batches}: {batch_error}"
                     self.error_logger.error(error_message, extra={"function": "synchronize", "file": "task_synchronizer.py", "batch": i+1})  # extra bilgisi eklendi
                     self.display.print_error(f"❌ {error_message}")
+            PUBLISHED_TASKS.set(published_tasks_count)
             self.display.print_success("✔️ Task Synchronization Completed")
 
             # Compare total published tasks with expected count (pending task sayısı ile karşılaştır)
@@ -124,5 +166,6 @@ class TaskSynchronizer:
             self.error_logger.error(error_message, extra={"function": "synchronize", "file": "task_synchronizer.py"})
             self.display.print_error(error_message)
 
+        SYNC_SECONDS.observe(time.perf_counter() - started)
         self.display.print_section_header("✔️ All checks Completed")
         self.logger.info("✔️ All checks Completed")
@@ -0,0 +1,206 @@
+import os
+import json
+import time
+import queue
+import random
+import atexit
+import threading
+from logB.logger import Logger
+
+_STOP = object()
+_tracers = {}
+_tracers_lock = threading.Lock()
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_PRODUCER = 4
+SPAN_KIND_CONSUMER = 5
+
+
+class TraceContext:
+    """
+    W3C trace context carried by one sampled task from publish to persist.
+    """
+
+    __slots__ = ("trace_id", "parent_span_id", "published_at_ns", "enqueued_at_ns")
+
+    def __init__(self, trace_id, parent_span_id, published_at_ns=None):
+        self.trace_id = trace_id
+        self.parent_span_id = parent_span_id
+        self.published_at_ns = published_at_ns
+        self.enqueued_at_ns = None
+
+
+def _attributes(attributes):
+    result = []
+    for key, value in (attributes or {}).items():
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        result.append({"key": key, "value": typed})
+    return result
+
+
+class FileSpanExporter:
+    """
+    Writes spans as OTLP/JSON ExportTraceServiceRequest objects, one request per line,
+    from a background thread. The file can be replayed into an OpenTelemetry collector
+    (otlpjsonfile receiver) or read directly.
+    """
+
+    def __init__(self, path, service_name, batch_size=512, flush_interval=1.0):
+        self.path = path
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.exported_spans = 0
+        self._queue = queue.SimpleQueue()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, span):
+        self._queue.put(span)
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                span = self._queue.get(timeout=max(deadline - time.monotonic(), 0.01))
+            except queue.Empty:
+                span = None
+            if span is _STOP:
+                self._write(batch)
+                return
+            if span is not None:
+                batch.append(span)
+            if len(batch) >= self.batch_size or (batch and time.monotonic() >= deadline):
+                self._write(batch)
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+
+    def _write(self, spans):
+        if not spans:
+            return
+        request = {
+            "resourceSpans": [{
+                "resource": {"attributes": _attributes({"service.name": self.service_name})},
+                "scopeSpans": [{"scope": {"name": "dnsbl.tracing"}, "spans": spans}]
+            }]
+        }
+        with open(self.path, "a") as f:
+            f.write(json.dumps(request) + "\n")
+        self.exported_spans += len(spans)
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+
+class Tracer:
+    """
+    Minimal tracer for the task pipeline.
+
+    The publisher samples a task with `sample_rate`, records a producer span and stamps a
+    W3C `traceparent` plus `published_at` into the message headers. Consumers extract the
+    context and record queue_wait, resolve, buffer_wait and persist spans as its children.
+    Unsampled messages carry no headers and cost nothing downstream.
+    """
+
+    def __init__(self, config):
+        """
+        Args:
+            config: Application configuration ('tracing' section).
+        """
+        tracing_config = config.get("tracing", {})
+        self.enabled = tracing_config.get("enabled", False)
+        self.sample_rate = tracing_config.get("sample_rate", 0.01)
+        self.exporter = None
+        if self.enabled:
+            self.exporter = FileSpanExporter(
+                tracing_config.get("export_path", os.path.join("logs", "traces.otlp.jsonl")),
+                tracing_config.get("service_name", "dnsbl-checker")
+            )
+            Logger(log_file_path=config['logging']['app_log_path']).info(
+                f"Tracing enabled (sample rate {self.sample_rate}), exporting to {self.exporter.path}"
+            )
+
+    def inject(self, attributes=None):
+        """
+        Decides sampling for a task about to be published.
+
+        Returns:
+            dict | None: AMQP headers for sampled tasks, None otherwise.
+        """
+        if not self.enabled or random.random() >= self.sample_rate:
+            return None
+        trace_id = os.urandom(16).hex()
+        span_id = os.urandom(8).hex()
+        now = time.time_ns()
+        self._export(trace_id, span_id, None, "publish", now, now, SPAN_KIND_PRODUCER, attributes)
+        return {"traceparent": f"00-{trace_id}-{span_id}-01", "published_at": now}
+
+    def extract(self, headers):
+        """
+        Returns:
+            TraceContext | None: Context of a sampled message, None when untraced.
+        """
+        if not self.enabled or not headers:
+            return None
+        traceparent = headers.get("traceparent")
+        if isinstance(traceparent, bytes):
+            traceparent = traceparent.decode()
+        if not traceparent:
+            return None
+        parts = traceparent.split("-")
+        if len(parts) != 4 or not int(parts[3], 16) & 1:
+            return None
+        published_at = headers.get("published_at")
+        return TraceContext(parts[1], parts[2], int(published_at) if published_at is not None else None)
+
+    def record(self, context, name, start_ns, end_ns, attributes=None, kind=SPAN_KIND_INTERNAL):
+        """
+        Records a child span of the task's publish span.
+        """
+        if context is None or self.exporter is None or start_ns is None:
+            return
+        self._export(context.trace_id, os.urandom(8).hex(), context.parent_span_id, name, start_ns, end_ns, kind, attributes)
+
+    def _export(self, trace_id, span_id, parent_span_id, name, start_ns, end_ns, kind, attributes):
+        span = {
+            "traceId": trace_id,
+            "spanId": span_id,
+            "name": name,
+            "kind": kind,
+            "startTimeUnixNano": str(start_ns),
+            "endTimeUnixNano": str(end_ns),
+            "attributes": _attributes(attributes)
+        }
+        if parent_span_id:
+            span["parentSpanId"] = parent_span_id
+        self.exporter.export(span)
+
+    def close(self):
+        if self.exporter is not None:
+            self.exporter.close()
+
+
+def get_tracer(config):
+    """
+    Returns the process-wide tracer for the configured export path, creating it on first use.
+    """
+    tracing_config = config.get("tracing", {})
+    key = (tracing_config.get("enabled", False), tracing_config.get("export_path"))
+    with _tracers_lock:
+        tracer = _tracers.get(key)
+        if tracer is None:
+            tracer = _tracers[key] = Tracer(config)
+            atexit.register(tracer.close)
+        return tracer
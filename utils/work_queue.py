@@ -0,0 +1,331 @@
+"""
+Task queue backends.
+
+TaskSynchronizer publishes through `clear_queue(queue_name)` and
+`publish_task(queue_name, tasks, tracer=None)`; ProcessManager and its workers consume
+through `connect(prefetch_count)`, `message_count(queue_name)`, `open_queue(queue_name)`
+(an object whose `iterator()` yields messages with `body`, `headers` and `process()`)
+and `close_connection()`.
+
+With QUEUE_BACKEND=rabbitmq (default) the publisher is the pika `RabbitMQ` client and
+the consumer is `AsyncRabbitMQ`. With QUEUE_BACKEND=memory a single MemoryWorkQueue
+plays both roles inside the process: published task dicts are handed to the workers
+through a bounded asyncio.Queue without serialisation or a broker. With
+QUEUE_BACKEND=sqlite the pending `ip_check` rows themselves are the queue: workers lease
+them (SQLiteLeaseQueue), so a crashed run leaves nothing but expiring leases behind.
+"""
+import os
+import json
+import uuid
+import socket
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from logB.logger import Logger
+from utils.display import Display
+from utils import metrics
+
+MEMORY_QUEUE_DEPTH = metrics.gauge("dnsbl_memory_queue_depth", "Messages waiting in the in-process task queue.")
+LEASES_CLAIMED = metrics.counter("dnsbl_lease_queue_claimed_total", "Task rows leased from the SQLite work queue.")
+LEASES_RECLAIMED = metrics.counter("dnsbl_lease_queue_reclaimed_total", "Expired task leases reclaimed from stopped or crashed workers.")
+LEASES_RELEASED = metrics.counter("dnsbl_lease_queue_released_total", "Unfinished task leases released on shutdown.")
+
+_END = object()
+
+
+def build_work_queue(config, sqlite_manager=None):
+    """
+    Args:
+        config: Application configuration.
+        sqlite_manager (TaskManager, optional): Task table of the SQLite backend.
+
+    Returns:
+        MemoryWorkQueue | SQLiteLeaseQueue | None: The queue of QUEUE_BACKEND=memory or
+        sqlite, None when the RabbitMQ publisher/consumer pair is used.
+    """
+    backend = config.get("queue", {}).get("backend", "rabbitmq")
+    if backend == "memory":
+        return MemoryWorkQueue(config)
+    if backend == "sqlite":
+        return SQLiteLeaseQueue(sqlite_manager, config)
+    return None
+
+
+class MemoryMessage:
+    """
+    A task handed over in-process; process() acknowledges it on exit like aio-pika's
+    IncomingMessage.
+    """
+
+    __slots__ = ("task", "headers", "routing_key", "_queue")
+
+    def __init__(self, task, headers, queue):
+        self.task = task
+        self.headers = headers
+        self.routing_key = queue.name
+        self._queue = queue
+
+    @property
+    def body(self):
+        # Yalnızca JSON bekleyen tüketiciler için; işçiler doğrudan task kullanır
+        return json.dumps(self.task).encode()
+
+    @asynccontextmanager
+    async def process(self):
+        try:
+            yield self
+        except Exception:
+            self._queue.rejected += 1
+            raise
+        else:
+            self._queue.acked += 1
+
+
+class MemoryQueue:
+    """
+    One named queue: the published batches and the bounded asyncio.Queue the feeder
+    moves them into. Iteration ends once every published task has been delivered.
+    """
+
+    def __init__(self, name, maxsize):
+        self.name = name
+        self.batches = []
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.remaining = 0
+        self.acked = 0
+        self.rejected = 0
+
+    async def feed(self):
+        index = 0
+        while index < len(self.batches):  # Tüketim sırasında eklenen partiler de beslenir
+            tasks, headers = self.batches[index]
+            for position, task in enumerate(tasks):
+                await self.queue.put(MemoryMessage(task, (headers[position] if headers else None) or {}, self))
+                MEMORY_QUEUE_DEPTH.set(self.queue.qsize())
+            index += 1
+        self.batches = []
+        await self.queue.put(_END)
+
+    @asynccontextmanager
+    async def iterator(self):
+        yield self._iterate()
+
+    async def _iterate(self):
+        while True:
+            message = await self.queue.get()
+            if message is _END:
+                # Diğer tüketiciler de bitişi görsün; az önce bir yer boşaldı
+                self.queue.put_nowait(_END)
+                return
+            self.remaining -= 1
+            MEMORY_QUEUE_DEPTH.set(self.queue.qsize())
+            yield message
+
+
+class MemoryWorkQueue:
+    """
+    In-process replacement for the RabbitMQ publisher and consumer of a single-node run.
+
+    publish_task only keeps references to the task batches. connect() starts a feeder
+    per queue that moves them into a bounded asyncio.Queue, so at most `maxsize`
+    messages are materialised ahead of the workers and a slow resolver back-pressures
+    the feeder. Tasks left unprocessed when the run stops stay pending in SQLite, as
+    with a purged RabbitMQ queue.
+    """
+
+    def __init__(self, config):
+        """
+        Args:
+            config: Application configuration; uses queue.memory_maxsize and the default queue name.
+        """
+        self.config = config
+        self.queue_name = config["rabbitmq"].get("default_queue", "default_queue")
+        self.maxsize = config.get("queue", {}).get("memory_maxsize", 10000)
+        self.logger = Logger(log_file_path=config['logging']['app_log_path'])
+        self.display = Display()
+        self.process_manager = None
+        self._queues = {}
+        self._feeders = {}
+
+    def _queue(self, queue_name):
+        if queue_name not in self._queues:
+            self._queues[queue_name] = MemoryQueue(queue_name, self.maxsize)
+        return self._queues[queue_name]
+
+    # Yayıncı tarafı (TaskSynchronizer)
+
+    def clear_queue(self, queue_name=None):
+        queue_name = queue_name or self.queue_name
+        self._queues[queue_name] = MemoryQueue(queue_name, self.maxsize)
+        self.display.print_success(f"✔️ In-process queue '{queue_name}' cleared.")
+
+    def publish_task(self, queue_name, tasks, tracer=None):
+        """
+        Queues task dicts for the workers; sampled tasks carry trace headers as over RabbitMQ.
+
+        Args:
+            queue_name (str): Queue the tasks belong to.
+            tasks (list of dict): The tasks; kept by reference.
+            tracer (Tracer, optional): Stamps trace context headers into sampled messages.
+        """
+        headers = None
+        if tracer is not None and tracer.enabled:
+            headers = [
+                tracer.inject({"messaging.destination": queue_name, "dns.zone": task.get("dns", "")})
+                for task in tasks
+            ]
+        queue = self._queue(queue_name)
+        queue.batches.append((tasks, headers))
+        queue.remaining += len(tasks)
+        self.logger.info(f"Queued {len(tasks)} tasks in memory for '{queue_name}'.")
+
+    # Tüketici tarafı (ProcessManager, Worker)
+
+    async def connect(self, prefetch_count=None):
+        for queue_name in self._queues:
+            self._start_feeder(queue_name)
+        self.display.print_success("✔️ In-process task queue started.")
+
+    def _start_feeder(self, queue_name):
+        if queue_name not in self._feeders:
+            self._feeders[queue_name] = asyncio.create_task(self._queue(queue_name).feed())
+
+    async def message_count(self, queue_name):
+        """
+        Returns:
+            int: Published tasks that no worker has taken yet.
+        """
+        queue = self._queues.get(queue_name)
+        return queue.remaining if queue else 0
+
+    async def open_queue(self, queue_name):
+        self._start_feeder(queue_name)
+        return self._queue(queue_name)
+
+    async def close_connection(self):
+        for feeder in self._feeders.values():
+            feeder.cancel()
+        await asyncio.gather(*self._feeders.values(), return_exceptions=True)
+        self._feeders = {}
+        self._queues = {}
+
+
+class LeaseQueue:
+    """
+    The consumer view of the SQLite work queue. Workers share a buffer of leased tasks
+    that is refilled with one claim when it runs dry; iteration ends when nothing is
+    left to claim.
+    """
+
+    def __init__(self, work_queue, name):
+        self.work_queue = work_queue
+        self.name = name
+        self.buffer = deque()
+        self.acked = 0
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def iterator(self):
+        yield self._iterate()
+
+    async def _iterate(self):
+        while True:
+            if not self.buffer:
+                self.buffer.extend(self.work_queue.claim())
+                if not self.buffer:
+                    return
+            yield MemoryMessage(self.buffer.popleft(), {}, self)
+            # Talep tek bir senkron UPDATE; diğer işçilere sıra ver
+            await asyncio.sleep(0)
+
+
+class SQLiteLeaseQueue:
+    """
+    Work queue backed by the `ip_check` task rows.
+
+    The synchronizer's SQLite insert is the publish step, so clear_queue and
+    publish_task only reclaim expired leases and report. Workers lease pending rows of
+    today in batches of the prefetch count with UPDATE ... RETURNING; the result sink
+    completes them by row id, which also drops the lease. Leases of a crashed run
+    expire after QUEUE_LEASE_SECONDS and are claimed again, and a clean shutdown
+    releases the leases of tasks it did not finish.
+
+    Claims continue after the highest id claimed so far, so rows still leased (in flight
+    or waiting for the sink) are not scanned again on every claim; once the tail is
+    exhausted the next claim starts over from the first row and picks up expired or
+    released leases.
+    """
+
+    def __init__(self, sqlite_manager, config):
+        """
+        Args:
+            sqlite_manager (TaskManager): Task table; its connection belongs to the event loop thread.
+            config: Application configuration; uses queue.lease_seconds and the default queue name.
+        """
+        self.sqlite_manager = sqlite_manager
+        self.config = config
+        self.queue_name = config["rabbitmq"].get("default_queue", "default_queue")
+        self.lease_seconds = config.get("queue", {}).get("lease_seconds", 300)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.batch_size = 100
+        self.logger = Logger(log_file_path=config['logging']['app_log_path'])
+        self.display = Display()
+        self.process_manager = None
+        self._queues = {}
+        self._claimed_up_to = 0
+
+    def claim(self):
+        tasks = self.sqlite_manager.claim_tasks(self.owner, self.batch_size, self.lease_seconds,
+                                                after_id=self._claimed_up_to)
+        if not tasks and self._claimed_up_to:
+            # Kuyruğun sonu: süresi dolan ya da bırakılan kiralar için baştan tara
+            self._claimed_up_to = 0
+            tasks = self.sqlite_manager.claim_tasks(self.owner, self.batch_size, self.lease_seconds)
+        if tasks:
+            self._claimed_up_to = max(task["id"] for task in tasks)
+        LEASES_CLAIMED.inc(len(tasks))
+        return tasks
+
+    def reclaim_expired(self):
+        reclaimed = self.sqlite_manager.reclaim_expired_leases()
+        if reclaimed:
+            LEASES_RECLAIMED.inc(reclaimed)
+            self.logger.info(f"Reclaimed {reclaimed} expired task leases.")
+            self.display.print_warning(f"⚠️ Reclaimed {reclaimed} expired task leases.")
+        return reclaimed
+
+    # Yayıncı tarafı (TaskSynchronizer)
+
+    def clear_queue(self, queue_name=None):
+        self.reclaim_expired()
+
+    def publish_task(self, queue_name, tasks, tracer=None):
+        # Satırlar zaten SQLite'ta; yayınlanacak ayrı bir kopya yok
+        self.logger.info(f"{len(tasks)} pending tasks are claimable from SQLite for '{queue_name}'.")
+
+    # Tüketici tarafı (ProcessManager, Worker)
+
+    async def connect(self, prefetch_count=None):
+        if prefetch_count:
+            self.batch_size = prefetch_count
+        self.reclaim_expired()
+        self.display.print_success(f"✔️ SQLite work queue ready (lease owner {self.owner}).")
+
+    async def message_count(self, queue_name):
+        """
+        Returns:
+            int: Pending tasks of today that are not leased by a live owner.
+        """
+        return self.sqlite_manager.count_claimable_tasks()
+
+    async def open_queue(self, queue_name):
+        if queue_name not in self._queues:
+            self._queues[queue_name] = LeaseQueue(self, queue_name)
+        return self._queues[queue_name]
+
+    async def close_connection(self):
+        self._queues = {}
+        released = self.sqlite_manager.release_leases(self.owner)
+        if released:
+            LEASES_RELEASED.inc(released)
+            self.logger.info(f"Released {released} unfinished task leases.")